@@ -0,0 +1,38 @@
+"""check-in feed indexes
+
+Revision ID: 3c7e91a0d2f4
+Revises: b5991295a694
+Create Date: 2026-10-19 11:40:08.215634
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c7e91a0d2f4'
+down_revision: Union[str, Sequence[str], None] = 'b5991295a694'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_check_ins_created_at'), 'check_ins', ['created_at'], unique=False)
+    op.create_index(op.f('ix_check_ins_objective_id'), 'check_ins', ['objective_id'], unique=False)
+    op.create_index(op.f('ix_check_ins_user_id'), 'check_ins', ['user_id'], unique=False)
+    op.create_index(op.f('ix_objectives_cycle_id'), 'objectives', ['cycle_id'], unique=False)
+    op.create_index(op.f('ix_users_department_id'), 'users', ['department_id'], unique=False)
+    op.create_index(op.f('ix_users_manager_id'), 'users', ['manager_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_users_manager_id'), table_name='users')
+    op.drop_index(op.f('ix_users_department_id'), table_name='users')
+    op.drop_index(op.f('ix_objectives_cycle_id'), table_name='objectives')
+    op.drop_index(op.f('ix_check_ins_user_id'), table_name='check_ins')
+    op.drop_index(op.f('ix_check_ins_objective_id'), table_name='check_ins')
+    op.drop_index(op.f('ix_check_ins_created_at'), table_name='check_ins')
@@ -0,0 +1,42 @@
+"""cycle snapshots
+
+Revision ID: 5f1c8d3e7a20
+Revises: e2b84f1d9a63
+Create Date: 2026-10-19 18:04:12.318846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f1c8d3e7a20'
+down_revision: Union[str, Sequence[str], None] = 'e2b84f1d9a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('cycles', sa.Column('closed_at', sa.DateTime(), nullable=True))
+    op.create_table('cycle_snapshots',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('cycle_id', sa.String(length=36), nullable=False),
+    sa.Column('kind', sa.String(length=100), nullable=False),
+    sa.Column('data', sa.JSON().with_variant(sa.CLOB(), 'oracle'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['cycle_id'], ['cycles.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('cycle_id', 'kind')
+    )
+    table_versions = sa.table('table_versions', sa.column('table_name', sa.String), sa.column('version', sa.Integer))
+    op.bulk_insert(table_versions, [{'table_name': 'cycle_snapshots', 'version': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM table_versions WHERE table_name = 'cycle_snapshots'")
+    op.drop_table('cycle_snapshots')
+    op.drop_column('cycles', 'closed_at')
@@ -0,0 +1,38 @@
+"""evaluation indexes
+
+Revision ID: 7d2a6c4f1e83
+Revises: 5f1c8d3e7a20
+Create Date: 2026-10-19 19:12:46.530217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2a6c4f1e83'
+down_revision: Union[str, Sequence[str], None] = '5f1c8d3e7a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_evaluations_created_at'), 'evaluations', ['created_at'], unique=False)
+    op.create_index(op.f('ix_evaluations_cycle_id'), 'evaluations', ['cycle_id'], unique=False)
+    op.create_index(op.f('ix_evaluations_phase'), 'evaluations', ['phase'], unique=False)
+    op.create_index(op.f('ix_evaluations_user_id'), 'evaluations', ['user_id'], unique=False)
+    op.create_index(op.f('ix_evaluation_competencies_evaluation_id'), 'evaluation_competencies', ['evaluation_id'], unique=False)
+    op.create_index(op.f('ix_evaluation_objectives_evaluation_id'), 'evaluation_objectives', ['evaluation_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_evaluation_objectives_evaluation_id'), table_name='evaluation_objectives')
+    op.drop_index(op.f('ix_evaluation_competencies_evaluation_id'), table_name='evaluation_competencies')
+    op.drop_index(op.f('ix_evaluations_user_id'), table_name='evaluations')
+    op.drop_index(op.f('ix_evaluations_phase'), table_name='evaluations')
+    op.drop_index(op.f('ix_evaluations_cycle_id'), table_name='evaluations')
+    op.drop_index(op.f('ix_evaluations_created_at'), table_name='evaluations')
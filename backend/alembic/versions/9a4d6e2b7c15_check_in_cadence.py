@@ -0,0 +1,77 @@
+"""check-in cadence
+
+Revision ID: 9a4d6e2b7c15
+Revises: 3c7e91a0d2f4
+Create Date: 2026-10-19 13:05:47.918203
+
+"""
+from datetime import timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4d6e2b7c15'
+down_revision: Union[str, Sequence[str], None] = '3c7e91a0d2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('cycles', sa.Column('check_in_cadence_days', sa.Integer(), nullable=False, server_default='7'))
+    op.add_column('objectives', sa.Column('check_in_cadence_days', sa.Integer(), nullable=True))
+    op.add_column('objectives', sa.Column('next_check_in_due', sa.Date(), nullable=True))
+    op.create_index(op.f('ix_objectives_next_check_in_due'), 'objectives', ['next_check_in_due'], unique=False)
+
+    # Due date of existing objectives: last check-in (or start date) plus the default 7 day cadence
+    objectives = sa.table(
+        'objectives',
+        sa.column('id', sa.String),
+        sa.column('progress', sa.Numeric),
+        sa.column('start_date', sa.Date),
+        sa.column('is_deleted', sa.Boolean),
+        sa.column('next_check_in_due', sa.Date),
+    )
+    check_ins = sa.table(
+        'check_ins',
+        sa.column('objective_id', sa.String),
+        sa.column('created_at', sa.DateTime),
+    )
+    last_check_in = sa.select(
+        check_ins.c.objective_id,
+        sa.func.max(check_ins.c.created_at).label('last_check_in_at')
+    ).group_by(check_ins.c.objective_id).subquery()
+
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(objectives.c.id, objectives.c.progress, objectives.c.start_date, last_check_in.c.last_check_in_at)
+        .outerjoin(last_check_in, last_check_in.c.objective_id == objectives.c.id)
+        .where(sa.or_(objectives.c.is_deleted == sa.false(), objectives.c.is_deleted.is_(None)))
+        .where(sa.func.coalesce(objectives.c.progress, 0) < 100)
+    ).all()
+    values = [
+        {
+            'objective_id': row.id,
+            'due': (row.last_check_in_at.date() if row.last_check_in_at else row.start_date) + timedelta(days=7),
+        }
+        for row in rows
+        if row.last_check_in_at or row.start_date
+    ]
+    if values:
+        connection.execute(
+            objectives.update()
+            .where(objectives.c.id == sa.bindparam('objective_id'))
+            .values(next_check_in_due=sa.bindparam('due')),
+            values
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_objectives_next_check_in_due'), table_name='objectives')
+    op.drop_column('objectives', 'next_check_in_due')
+    op.drop_column('objectives', 'check_in_cadence_days')
+    op.drop_column('cycles', 'check_in_cadence_days')
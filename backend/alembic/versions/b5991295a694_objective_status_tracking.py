@@ -0,0 +1,37 @@
+"""objective status tracking
+
+Revision ID: b5991295a694
+Revises: f8e0464c7a8b
+Create Date: 2026-10-19 09:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5991295a694'
+down_revision: Union[str, Sequence[str], None] = 'f8e0464c7a8b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('objectives', sa.Column('status_dirty', sa.Boolean(), nullable=False, server_default='0'))
+    op.add_column('objectives', sa.Column('next_status_check', sa.Date(), nullable=True))
+    op.create_index(op.f('ix_objectives_status_dirty'), 'objectives', ['status_dirty'], unique=False)
+    op.create_index(op.f('ix_objectives_next_status_check'), 'objectives', ['next_status_check'], unique=False)
+
+    # Existing objectives have no next check date yet: let the first scheduler pass compute it
+    op.execute("UPDATE objectives SET status_dirty = 1")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_objectives_next_status_check'), table_name='objectives')
+    op.drop_index(op.f('ix_objectives_status_dirty'), table_name='objectives')
+    op.drop_column('objectives', 'next_status_check')
+    op.drop_column('objectives', 'status_dirty')
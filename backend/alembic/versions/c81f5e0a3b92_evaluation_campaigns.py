@@ -0,0 +1,53 @@
+"""evaluation campaigns
+
+Revision ID: c81f5e0a3b92
+Revises: 7d2a6c4f1e83
+Create Date: 2026-10-19 20:31:05.647120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81f5e0a3b92'
+down_revision: Union[str, Sequence[str], None] = '7d2a6c4f1e83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('evaluation_campaigns',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('cycle_id', sa.String(length=36), nullable=False),
+    sa.Column('phase', sa.String(length=50), nullable=False),
+    sa.Column('expected_level', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('last_user_id', sa.String(length=36), nullable=True),
+    sa.Column('evaluations_created', sa.Integer(), nullable=False),
+    sa.Column('objectives_created', sa.Integer(), nullable=False),
+    sa.Column('competencies_created', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['cycle_id'], ['cycles.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('cycle_id')
+    )
+    # Batch mode: SQLite cannot add a constraint to an existing table
+    with op.batch_alter_table('evaluations') as batch_op:
+        batch_op.create_unique_constraint('uq_evaluations_user_cycle', ['user_id', 'cycle_id'])
+    table_versions = sa.table('table_versions', sa.column('table_name', sa.String), sa.column('version', sa.Integer))
+    op.bulk_insert(table_versions, [{'table_name': 'evaluation_campaigns', 'version': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM table_versions WHERE table_name = 'evaluation_campaigns'")
+    with op.batch_alter_table('evaluations') as batch_op:
+        batch_op.drop_constraint('uq_evaluations_user_cycle', type_='unique')
+    op.drop_table('evaluation_campaigns')
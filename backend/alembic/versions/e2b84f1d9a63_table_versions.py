@@ -0,0 +1,38 @@
+"""table versions
+
+Revision ID: e2b84f1d9a63
+Revises: 9a4d6e2b7c15
+Create Date: 2026-10-19 15:21:36.507194
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b84f1d9a63'
+down_revision: Union[str, Sequence[str], None] = '9a4d6e2b7c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VERSIONED_TABLES = [
+    'organizations', 'users', 'departments', 'cycles', 'objectives', 'key_results', 'check_ins',
+    'competencies', 'evaluations', 'evaluation_competencies', 'evaluation_objectives', 'pdis', 'pdi_actions',
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    table_versions = op.create_table('table_versions',
+    sa.Column('table_name', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    op.bulk_insert(table_versions, [{'table_name': name, 'version': 0} for name in VERSIONED_TABLES])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('table_versions')
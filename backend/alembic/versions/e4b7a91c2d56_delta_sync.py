@@ -0,0 +1,69 @@
+"""delta sync
+
+Revision ID: e4b7a91c2d56
+Revises: c81f5e0a3b92
+Create Date: 2026-10-19 22:04:17.318540
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7a91c2d56'
+down_revision: Union[str, Sequence[str], None] = 'c81f5e0a3b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.add_column('departments', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.add_column('cycles', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.add_column('check_ins', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    # Existing rows count as changed when they were created (now when unknown)
+    op.execute("UPDATE users SET updated_at = CURRENT_TIMESTAMP")
+    op.execute("UPDATE departments SET updated_at = CURRENT_TIMESTAMP")
+    op.execute("UPDATE cycles SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
+    op.execute("UPDATE check_ins SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
+
+    op.create_index(op.f('ix_users_updated_at'), 'users', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_departments_updated_at'), 'departments', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_cycles_updated_at'), 'cycles', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_check_ins_updated_at'), 'check_ins', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_objectives_updated_at'), 'objectives', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_key_results_updated_at'), 'key_results', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_pdis_updated_at'), 'pdis', ['updated_at'], unique=False)
+
+    op.create_table('sync_tombstones',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('table_name', sa.String(length=64), nullable=False),
+    sa.Column('row_id', sa.String(length=36), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_sync_tombstones_deleted_at'), 'sync_tombstones', ['deleted_at'], unique=False)
+    table_versions = sa.table('table_versions', sa.column('table_name', sa.String), sa.column('version', sa.Integer))
+    op.bulk_insert(table_versions, [{'table_name': 'sync_tombstones', 'version': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM table_versions WHERE table_name = 'sync_tombstones'")
+    op.drop_index(op.f('ix_sync_tombstones_deleted_at'), table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
+
+    op.drop_index(op.f('ix_pdis_updated_at'), table_name='pdis')
+    op.drop_index(op.f('ix_key_results_updated_at'), table_name='key_results')
+    op.drop_index(op.f('ix_objectives_updated_at'), table_name='objectives')
+    op.drop_index(op.f('ix_check_ins_updated_at'), table_name='check_ins')
+    op.drop_index(op.f('ix_cycles_updated_at'), table_name='cycles')
+    op.drop_index(op.f('ix_departments_updated_at'), table_name='departments')
+    op.drop_index(op.f('ix_users_updated_at'), table_name='users')
+    op.drop_column('check_ins', 'updated_at')
+    op.drop_column('cycles', 'updated_at')
+    op.drop_column('departments', 'updated_at')
+    op.drop_column('users', 'updated_at')
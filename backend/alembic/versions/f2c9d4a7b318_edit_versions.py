@@ -0,0 +1,32 @@
+"""edit versions
+
+Revision ID: f2c9d4a7b318
+Revises: e4b7a91c2d56
+Create Date: 2026-10-19 23:10:52.904613
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c9d4a7b318'
+down_revision: Union[str, Sequence[str], None] = 'e4b7a91c2d56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('objectives', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('check_ins', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('pdis', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('pdis', 'version')
+    op.drop_column('check_ins', 'version')
+    op.drop_column('objectives', 'version')
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+"""
+Benchmark of response compression (services/compression.py): response
+size and latency of representative endpoints without compression, with
+gzip and, when the zstandard package is installed, with zstd.
+
+It seeds the same temporary SQLite database as serialization_benchmark.py
+and also measures a streamed NDJSON response. Every compressed body is
+decompressed and compared with the uncompressed one, and conditional
+requests are checked to still answer an empty 304; the script exits with
+1 when a check fails.
+
+Usage (from backend/):
+    python benchmarks/compression_benchmark.py [--objectives 100] [--rounds 50] [--gzip-level 6] [--zstd-level 3]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import zlib
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objectives", type=int, default=100, help="Objectives to seed (each with 3 key results and a check-in)")
+    parser.add_argument("--rounds", type=int, default=50, help="Requests per endpoint and encoding")
+    parser.add_argument("--gzip-level", type=int, default=6)
+    parser.add_argument("--zstd-level", type=int, default=3)
+    return parser.parse_args()
+
+
+args = parse_args()
+# Read by config/config.py when the app is imported
+os.environ["COMPRESSION_ENABLED"] = "true"
+os.environ["COMPRESSION_MIN_SIZE"] = "1024"
+os.environ["COMPRESSION_GZIP_LEVEL"] = str(args.gzip_level)
+os.environ["COMPRESSION_ZSTD_LEVEL"] = str(args.zstd_level)
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from serialization_benchmark import seed, engine, app
+from services.compression import CompressionMiddleware, zstandard
+
+
+ENDPOINTS = [
+    "/api/objectives/?limit=100",
+    "/api/check-ins/feed?limit=50",
+    "/api/cycles/",
+    "/health",
+]
+STREAM_URL = "/stream/objectives.ndjson"
+
+ENCODINGS = ["identity", "gzip"] + (["zstd"] if zstandard is not None else [])
+
+
+def decompress(encoding: str, body: bytes) -> bytes:
+    if encoding == "gzip":
+        return zlib.decompress(body, 31)
+    if encoding == "zstd":
+        return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    return body
+
+
+def streaming_app(lines: list) -> CompressionMiddleware:
+    """NDJSON stream of the objectives payload, one chunk per line"""
+    stream_app = FastAPI()
+
+    @stream_app.get(STREAM_URL)
+    async def stream_objectives():
+        async def generate():
+            for line in lines:
+                yield line
+                await asyncio.sleep(0)
+        return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+    return CompressionMiddleware(
+        stream_app, gzip_level=args.gzip_level, zstd_level=args.zstd_level,
+        content_types=["application/json", "application/x-ndjson"]
+    )
+
+
+async def fetch(client: httpx.AsyncClient, url: str, encoding: str, headers: dict = None) -> tuple:
+    """Response and raw (still encoded) body"""
+    headers = {"Accept-Encoding": encoding, **(headers or {})}
+    async with client.stream("GET", url, headers=headers) as response:
+        return response, b"".join([chunk async for chunk in response.aiter_raw()])
+
+
+async def measure(client: httpx.AsyncClient, url: str, encoding: str, rounds: int) -> tuple:
+    response, body = await fetch(client, url, encoding)
+    response.raise_for_status()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await fetch(client, url, encoding)
+    return (time.perf_counter() - start) / rounds * 1000, response, body
+
+
+async def body_messages(asgi_app, url: str, encoding: str) -> list:
+    """
+    Body messages sent by the app (httpx's ASGI transport joins them), to
+    check that a compressed stream is still sent chunk by chunk
+    """
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": url, "raw_path": url.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"accept-encoding", encoding.encode())], "client": None, "server": ("benchmark", 80)
+    }
+    messages = []
+    requested = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            messages.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    await asgi_app(scope, receive, send)
+    return messages
+
+
+async def main(n_objectives: int, rounds: int) -> bool:
+    engine.echo = False
+    await seed(n_objectives)
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark")
+    all_ok = True
+    try:
+        async with client:
+            objectives = (await client.get("/api/objectives/?limit=100", headers={"Accept-Encoding": "identity"})).json()
+            lines = [json.dumps(item, ensure_ascii=False).encode("utf-8") + b"\n" for item in objectives]
+            stream_app = streaming_app(lines)
+            stream_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stream_app), base_url="http://benchmark")
+
+            print(f"{'endpoint':32} {'encoding':9} {'bytes':>8} {'ratio':>6} {'ms':>8}  ok")
+            async with stream_client:
+                for url in ENDPOINTS + [STREAM_URL]:
+                    target = stream_client if url == STREAM_URL else client
+                    identity_body = None
+                    for encoding in ENCODINGS:
+                        ms, response, body = await measure(target, url, encoding, rounds)
+                        applied = response.headers.get("content-encoding", "identity")
+                        decoded = decompress(applied, body)
+                        if identity_body is None:
+                            identity_body = decoded
+                        ok = decoded == identity_body
+                        all_ok = all_ok and ok
+                        print(
+                            f"{url:32} {applied:9} {len(body):8} {len(identity_body) / len(body):5.1f}x {ms:8.2f}  {ok}"
+                        )
+
+                # Streamed responses keep one compressed chunk per chunk of the app
+                for encoding in ENCODINGS[1:]:
+                    chunks = [chunk for chunk in await body_messages(stream_app, STREAM_URL, encoding) if chunk]
+                    ok = len(chunks) >= len(lines)
+                    all_ok = all_ok and ok
+                    print(f"{STREAM_URL:32} {encoding:9} {len(chunks):8} chunks for {len(lines)} lines  {ok}")
+
+                # Conditional requests still get an empty, uncompressed 304
+                for url in ENDPOINTS[:3]:
+                    response, _ = await fetch(client, url, "gzip")
+                    not_modified, body = await fetch(client, url, "gzip", {"If-None-Match": response.headers["etag"]})
+                    ok = (
+                        not_modified.status_code == 304 and body == b""
+                        and "content-encoding" not in not_modified.headers
+                    )
+                    all_ok = all_ok and ok
+                    print(f"{url:32} {'304':9} {len(body):8} {'':6} {'':8}  {ok}")
+    finally:
+        await engine.dispose()
+    return all_ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(main(args.objectives, args.rounds)) else 1)
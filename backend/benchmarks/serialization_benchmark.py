@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+"""
+Benchmark of the list endpoints that serialize straight from rows
+(services/serialization.py) against their previous response_model versions.
+
+Each endpoint is called through the ASGI app on a temporary SQLite database;
+the previous version of each handler is mounted on a separate app so both
+are measured the same way. The script also checks that both responses are
+byte-for-byte identical.
+
+Usage (from backend/):
+    python benchmarks/serialization_benchmark.py [--objectives 100] [--rounds 50]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Base de datos SQLite temporal (DATABASE_URL es relativa al directorio actual)
+os.environ["USE_SQLITE"] = "true"
+os.environ["STATUS_SCHEDULER_ENABLED"] = "false"
+os.environ["CHECK_IN_WRITE_BUFFER_ENABLED"] = "false"
+os.environ.setdefault("COMPRESSION_ENABLED", "false")
+os.chdir(tempfile.mkdtemp(prefix="oks-benchmark-"))
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import select, desc, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from database.database import engine, get_db, AsyncSessionLocal
+from main import app
+from models.models import Base, Organization, Department, User, Cycle, Objective, KeyResult, CheckIn
+from schemas.schemas import ObjectiveRead, CheckInSummary, CheckInFeed, CycleRead
+
+
+# --- Versiones anteriores de los endpoints (response_model sobre objetos ORM) ---
+
+legacy_app = FastAPI()
+
+
+@legacy_app.get("/api/objectives/", response_model=List[ObjectiveRead])
+async def legacy_objectives(limit: int = 100, db: AsyncSession = Depends(get_db)):
+    query = select(Objective).where(Objective.is_deleted == False).order_by(
+        Objective.updated_at.desc()
+    ).limit(limit).options(
+        selectinload(Objective.key_results),
+        selectinload(Objective.owner)
+    )
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+def joined_check_ins_query(*columns):
+    return select(
+        *CheckIn.__table__.columns,
+        Objective.title.label("objective_title"),
+        *columns
+    ).join(Objective, CheckIn.objective_id == Objective.id).join(User, CheckIn.user_id == User.id)
+
+
+@legacy_app.get("/api/check-ins/", response_model=List[CheckInSummary])
+async def legacy_check_ins(limit: int = 100, db: AsyncSession = Depends(get_db)):
+    query = joined_check_ins_query(User.full_name.label("user_name")).order_by(
+        desc(CheckIn.created_at)
+    ).limit(limit)
+    result = await db.execute(query)
+    return [
+        {
+            **row,
+            "objective": {"id": row["objective_id"], "title": row["objective_title"]},
+            "user": {"id": row["user_id"], "full_name": row["user_name"]}
+        }
+        for row in result.mappings()
+    ]
+
+
+@legacy_app.get("/api/check-ins/feed", response_model=CheckInFeed)
+async def legacy_feed(limit: int = 50, db: AsyncSession = Depends(get_db)):
+    query = joined_check_ins_query(
+        Objective.status.label("objective_status"),
+        User.full_name.label("user_name"),
+        func.count().over().label("total")
+    ).where(Objective.is_deleted == False).order_by(desc(CheckIn.created_at), CheckIn.id).limit(limit)
+    result = await db.execute(query)
+    rows = result.mappings().all()
+    return {"items": rows, "total": rows[0]["total"] if rows else 0}
+
+
+@legacy_app.get("/api/cycles/", response_model=List[CycleRead])
+async def legacy_cycles(db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(Cycle).limit(100))
+    return result.scalars().all()
+
+
+ENDPOINTS = [
+    "/api/objectives/?limit=100",
+    "/api/check-ins/?limit=100",
+    "/api/check-ins/feed?limit=50",
+    "/api/cycles/",
+]
+
+
+# --- Datos de prueba ---
+
+async def seed(n_objectives: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    today = date.today()
+    async with AsyncSessionLocal() as db:
+        org = Organization(name="Benchmark", settings={})
+        db.add(org)
+        await db.flush()
+        department = Department(organization_id=org.id, name="Operaciones")
+        db.add(department)
+        cycles = [
+            Cycle(name=f"Q{i} ñ", start_date=today - timedelta(days=90 * i), end_date=today + timedelta(days=90 - 90 * i), is_active=i == 0)
+            for i in range(4)
+        ]
+        db.add_all(cycles)
+        await db.flush()
+        users = [
+            User(department_id=department.id, email=f"user{i}@example.com", full_name=f"Usuario «{i}»", role="Analista")
+            for i in range(20)
+        ]
+        db.add_all(users)
+        await db.flush()
+
+        for i in range(n_objectives):
+            objective = Objective(
+                id=str(uuid.uuid4()), cycle_id=cycles[0].id, owner_id=users[i % len(users)].id,
+                title=f"Objetivo {i} — crecimiento", description="Descripción\nlarga", type="strategic",
+                progress=Decimal("12.50"), weight=Decimal("33.33"), start_date=today - timedelta(days=30),
+                end_date=today + timedelta(days=60), is_deleted=False, updated_at=datetime.utcnow() - timedelta(seconds=i)
+            )
+            db.add(objective)
+            for j in range(3):
+                db.add(KeyResult(
+                    objective_id=objective.id, title=f"KR {j}", metric="ventas", target=Decimal("100"),
+                    current=Decimal("10.5"), unit="%", progress=Decimal("10.5")
+                ))
+            db.add(CheckIn(
+                objective_id=objective.id, user_id=objective.owner_id, progress=Decimal("12.5"),
+                previous_progress=Decimal("0"), comment="Avance \"semanal\"", blockers=None if i % 3 else "Bloqueo"
+            ))
+        await db.commit()
+
+
+# --- Medición ---
+
+async def measure(client: httpx.AsyncClient, url: str, rounds: int) -> tuple:
+    response = await client.get(url)
+    response.raise_for_status()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await client.get(url)
+    return (time.perf_counter() - start) / rounds * 1000, response.content
+
+
+async def main(n_objectives: int, rounds: int):
+    engine.echo = False
+    await seed(n_objectives)
+
+    fast_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark")
+    legacy_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=legacy_app), base_url="http://benchmark")
+
+    print(f"{'endpoint':32} {'before ms':>10} {'after ms':>10} {'speed-up':>9} {'bytes':>8}  identical")
+    all_identical = True
+    try:
+        async with fast_client, legacy_client:
+            for url in ENDPOINTS:
+                legacy_ms, legacy_body = await measure(legacy_client, url, rounds)
+                fast_ms, fast_body = await measure(fast_client, url, rounds)
+                identical = legacy_body == fast_body
+                all_identical = all_identical and identical
+                print(f"{url:32} {legacy_ms:10.2f} {fast_ms:10.2f} {legacy_ms / fast_ms:8.1f}x {len(fast_body):8}  {identical}")
+    finally:
+        await engine.dispose()
+    return all_identical
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objectives", type=int, default=100, help="Objectives to seed (each with 3 key results and a check-in)")
+    parser.add_argument("--rounds", type=int, default=50, help="Requests per endpoint")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main(args.objectives, args.rounds)) else 1)
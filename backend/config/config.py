@@ -37,3 +37,27 @@ else:
 
     # Construir URL de Oracle
     DATABASE_URL = f"oracle+oracledb://{ORACLE_USER}:{ORACLE_PASSWORD}@{ORACLE_HOST}:{ORACLE_PORT}/?service_name={ORACLE_SERVICE}"
+
+# Periodic recalculation of objective statuses (see services/scheduler.py)
+STATUS_SCHEDULER_ENABLED = os.getenv("STATUS_SCHEDULER_ENABLED", "true").lower() == "true"
+STATUS_SCHEDULER_INTERVAL_SECONDS = int(os.getenv("STATUS_SCHEDULER_INTERVAL_SECONDS", "3600"))
+
+# Write-behind buffer for check-ins (see services/check_in_buffer.py)
+CHECK_IN_WRITE_BUFFER_ENABLED = os.getenv("CHECK_IN_WRITE_BUFFER_ENABLED", "false").lower() == "true"
+CHECK_IN_BUFFER_FLUSH_MS = int(os.getenv("CHECK_IN_BUFFER_FLUSH_MS", "50"))
+CHECK_IN_BUFFER_MAX_ROWS = int(os.getenv("CHECK_IN_BUFFER_MAX_ROWS", "200"))
+CHECK_IN_BUFFER_LOG_DIR = os.getenv("CHECK_IN_BUFFER_LOG_DIR", "./check_in_buffer")
+
+# Response compression (see services/compression.py); zstd is offered when the zstandard package is installed
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_ZSTD_ENABLED = os.getenv("COMPRESSION_ZSTD_ENABLED", "true").lower() == "true"
+COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+COMPRESSION_CONTENT_TYPES = os.getenv(
+    "COMPRESSION_CONTENT_TYPES", "application/json,application/x-ndjson,text/"
+).split(",")
+
+# Report files (see services/reports.py): rendered in worker processes and cached on disk
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", "./report_cache")
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
@@ -0,0 +1,72 @@
+from sqlalchemy import Date, String
+from sqlalchemy.exc import CompileError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class iso_week_start(FunctionElement):
+    """
+    Monday of the ISO week of a date/datetime expression, for grouping by
+    week in SQL. Compiled for each supported database; the value comes back
+    as a date (or ISO text / datetime, depending on the driver).
+    """
+    type = Date()
+    inherit_cache = True
+    name = "iso_week_start"
+
+
+@compiles(iso_week_start)
+def _iso_week_start_default(element, compiler, **kw):
+    raise CompileError(f"iso_week_start is not supported on {compiler.dialect.name}")
+
+
+@compiles(iso_week_start, "sqlite")
+def _iso_week_start_sqlite(element, compiler, **kw):
+    # 'weekday 0' moves forward to the next Sunday (or stays on it); six days back is Monday
+    return "date(%s, 'weekday 0', '-6 days')" % compiler.process(element.clauses, **kw)
+
+
+@compiles(iso_week_start, "oracle")
+def _iso_week_start_oracle(element, compiler, **kw):
+    return "TRUNC(%s, 'IW')" % compiler.process(element.clauses, **kw)
+
+
+@compiles(iso_week_start, "postgresql")
+def _iso_week_start_postgresql(element, compiler, **kw):
+    return "CAST(date_trunc('week', %s) AS DATE)" % compiler.process(element.clauses, **kw)
+
+
+class new_uuid(FunctionElement):
+    """
+    Random UUID text (36 characters, lowercase), generated by the database,
+    for primary keys of rows written with INSERT ... SELECT.
+    """
+    type = String(36)
+    inherit_cache = True
+    name = "new_uuid"
+
+
+@compiles(new_uuid)
+def _new_uuid_default(element, compiler, **kw):
+    raise CompileError(f"new_uuid is not supported on {compiler.dialect.name}")
+
+
+@compiles(new_uuid, "sqlite")
+def _new_uuid_sqlite(element, compiler, **kw):
+    return (
+        "lower(hex(randomblob(4)) || '-' || hex(randomblob(2)) || '-' || hex(randomblob(2)) || '-' || "
+        "hex(randomblob(2)) || '-' || hex(randomblob(6)))"
+    )
+
+
+@compiles(new_uuid, "oracle")
+def _new_uuid_oracle(element, compiler, **kw):
+    return (
+        "LOWER(REGEXP_REPLACE(RAWTOHEX(SYS_GUID()), "
+        "'([0-9A-F]{8})([0-9A-F]{4})([0-9A-F]{4})([0-9A-F]{4})([0-9A-F]{12})', '\\1-\\2-\\3-\\4-\\5'))"
+    )
+
+
+@compiles(new_uuid, "postgresql")
+def _new_uuid_postgresql(element, compiler, **kw):
+    return "CAST(gen_random_uuid() AS VARCHAR(36))"
@@ -1,12 +1,59 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routers import users, objectives, checkins, evaluations, pdi, dashboard, cycles, settings, competencies
+from config.config import (
+    STATUS_SCHEDULER_ENABLED, STATUS_SCHEDULER_INTERVAL_SECONDS,
+    CHECK_IN_WRITE_BUFFER_ENABLED, CHECK_IN_BUFFER_FLUSH_MS, CHECK_IN_BUFFER_MAX_ROWS, CHECK_IN_BUFFER_LOG_DIR,
+    COMPRESSION_ENABLED, COMPRESSION_MIN_SIZE, COMPRESSION_GZIP_LEVEL, COMPRESSION_ZSTD_ENABLED,
+    COMPRESSION_ZSTD_LEVEL, COMPRESSION_CONTENT_TYPES, REPORT_CACHE_DIR, REPORT_WORKERS
+)
+from routers import users, objectives, checkins, evaluations, pdi, dashboard, cycles, settings, competencies, exports, reports, batch, sync
+from services.scheduler import run_status_scheduler
+from services.check_in_buffer import start_check_in_buffer, stop_check_in_buffer
+from services.table_versions import install_table_versioning
+from services.sync import install_sync_tombstones
+from services.compression import CompressionMiddleware
+from services.reports import start_report_renderer, stop_report_renderer
+from services.evaluation_campaigns import stop_evaluation_campaigns
+
+# Count writes per table for the ETags of read endpoints
+install_table_versioning()
+# Record deleted rows for delta sync clients
+install_sync_tombstones()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start background jobs
+    scheduler_task = None
+    if STATUS_SCHEDULER_ENABLED:
+        scheduler_task = asyncio.create_task(run_status_scheduler(STATUS_SCHEDULER_INTERVAL_SECONDS))
+    if CHECK_IN_WRITE_BUFFER_ENABLED:
+        await start_check_in_buffer(CHECK_IN_BUFFER_FLUSH_MS, CHECK_IN_BUFFER_MAX_ROWS, CHECK_IN_BUFFER_LOG_DIR)
+    start_report_renderer(REPORT_CACHE_DIR, REPORT_WORKERS)
+
+    yield
+
+    # Stop background jobs
+    await stop_evaluation_campaigns()
+    stop_report_renderer()
+    if CHECK_IN_WRITE_BUFFER_ENABLED:
+        await stop_check_in_buffer()
+    if scheduler_task:
+        scheduler_task.cancel()
+        try:
+            await scheduler_task
+        except asyncio.CancelledError:
+            pass
+
 
 app = FastAPI(
     title="OKS System API",
     description="API para el sistema de gestión de Objetivos y Key Results (OKR)",
     version="1.0.0",
-    redirect_slashes=True
+    redirect_slashes=True,
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -16,8 +63,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Keyset pagination cursor
 )
 
+# Compress large JSON / text responses
+if COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        min_size=COMPRESSION_MIN_SIZE,
+        gzip_level=COMPRESSION_GZIP_LEVEL,
+        zstd_level=COMPRESSION_ZSTD_LEVEL,
+        content_types=COMPRESSION_CONTENT_TYPES,
+        zstd_enabled=COMPRESSION_ZSTD_ENABLED
+    )
+
 # Register routers
 app.include_router(users.router)
 app.include_router(objectives.router)
@@ -28,6 +87,10 @@ app.include_router(pdi.router)
 app.include_router(dashboard.router)
 app.include_router(cycles.router)
 app.include_router(settings.router)
+app.include_router(exports.router)
+app.include_router(reports.router)
+app.include_router(batch.router)
+app.include_router(sync.router)
 
 
 
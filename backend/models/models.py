@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, date
 from typing import List, Optional
-from sqlalchemy import String, ForeignKey, Boolean, DateTime, JSON, Numeric, Integer, Text, Date, CLOB
+from sqlalchemy import String, ForeignKey, Boolean, DateTime, JSON, Numeric, Integer, Text, Date, CLOB, UniqueConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 class Base(DeclarativeBase):
@@ -35,12 +35,13 @@ class User(Base):
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
     )
-    department_id: Mapped[str] = mapped_column(ForeignKey("departments.id"))
-    manager_id: Mapped[Optional[str]] = mapped_column(ForeignKey("users.id"))
+    department_id: Mapped[str] = mapped_column(ForeignKey("departments.id"), index=True)
+    manager_id: Mapped[Optional[str]] = mapped_column(ForeignKey("users.id"), index=True)
     email: Mapped[str] = mapped_column(String(255), unique=True)
     full_name: Mapped[str] = mapped_column(String(255))
     role: Mapped[str] = mapped_column(String(50))
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Delta sync
 
     department: Mapped["Department"] = relationship(back_populates="users")
     manager: Mapped[Optional["User"]] = relationship("User", remote_side=[id], back_populates="subordinates")
@@ -59,6 +60,7 @@ class Department(Base):
     )
     organization_id: Mapped[str] = mapped_column(ForeignKey("organizations.id"))
     name: Mapped[str] = mapped_column(String(255))
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Delta sync
 
     organization: Mapped["Organization"] = relationship(back_populates="departments")
     users: Mapped[List["User"]] = relationship(back_populates="department")
@@ -74,18 +76,34 @@ class Cycle(Base):
     start_date: Mapped[date] = mapped_column(Date)
     end_date: Mapped[date] = mapped_column(Date)
     is_active: Mapped[bool] = mapped_column(Boolean, default=False)
+    check_in_cadence_days: Mapped[int] = mapped_column(Integer, default=7, server_default='7')  # Days between check-ins
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    closed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)  # Set when the cycle is closed (numbers frozen in snapshots)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Delta sync
     
     objectives: Mapped[List["Objective"]] = relationship("Objective", back_populates="cycle")
 
 
+class CycleSnapshot(Base):
+    __tablename__ = "cycle_snapshots"
+    __table_args__ = (UniqueConstraint("cycle_id", "kind"),)
+    
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    cycle_id: Mapped[str] = mapped_column(ForeignKey("cycles.id"))
+    kind: Mapped[str] = mapped_column(String(100))  # metrics, department-progress, monthly-progress, report:<type>
+    data: Mapped[str | dict | list] = mapped_column(JSON().with_variant(CLOB(), 'oracle'))
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
 class Objective(Base):
     __tablename__ = "objectives"
     
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
     )
-    cycle_id: Mapped[str] = mapped_column(ForeignKey("cycles.id"))
+    cycle_id: Mapped[str] = mapped_column(ForeignKey("cycles.id"), index=True)
     owner_id: Mapped[str] = mapped_column(ForeignKey("users.id"))
     title: Mapped[str] = mapped_column(String(500))
     description: Mapped[Optional[str]] = mapped_column(Text)
@@ -99,8 +117,13 @@ class Objective(Base):
     methodology: Mapped[str] = mapped_column(String(20), default="okr")  # okr or smart
     is_deleted: Mapped[bool] = mapped_column(Boolean)  # Logical delete flag
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Delta sync
     deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime)  # Deletion timestamp
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default='1')  # Incremented on every edit (If-Match)
+    status_dirty: Mapped[bool] = mapped_column(Boolean, default=False, server_default='0', index=True)  # Status must be recalculated
+    next_status_check: Mapped[Optional[date]] = mapped_column(Date, index=True)  # Next date the status can change over time
+    check_in_cadence_days: Mapped[Optional[int]] = mapped_column(Integer)  # Overrides the cycle cadence
+    next_check_in_due: Mapped[Optional[date]] = mapped_column(Date, index=True)  # Next check-in due date (None if completed)
     
     cycle: Mapped["Cycle"] = relationship("Cycle", back_populates="objectives")
     owner: Mapped["User"] = relationship("User", back_populates="objectives")
@@ -122,7 +145,7 @@ class KeyResult(Base):
     unit: Mapped[str] = mapped_column(String(50))  # %, puntos, horas, etc.
     progress: Mapped[float] = mapped_column(Numeric(5, 2), default=0.0)  # 0-100
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Delta sync
     
     objective: Mapped["Objective"] = relationship("Objective", back_populates="key_results")
 
@@ -133,13 +156,15 @@ class CheckIn(Base):
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
     )
-    objective_id: Mapped[str] = mapped_column(ForeignKey("objectives.id"))
-    user_id: Mapped[str] = mapped_column(ForeignKey("users.id"))
+    objective_id: Mapped[str] = mapped_column(ForeignKey("objectives.id"), index=True)
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.id"), index=True)
     progress: Mapped[float] = mapped_column(Numeric(5, 2))  # 0-100
     previous_progress: Mapped[float] = mapped_column(Numeric(5, 2))
     comment: Mapped[Optional[str]] = mapped_column(Text)
     blockers: Mapped[Optional[str]] = mapped_column(Text)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Delta sync
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default='1')  # Incremented on every edit (If-Match)
     
     objective: Mapped["Objective"] = relationship("Objective", back_populates="check_ins")
     user: Mapped["User"] = relationship("User", back_populates="check_ins")
@@ -167,14 +192,15 @@ class Competency(Base):
 
 class Evaluation(Base):
     __tablename__ = "evaluations"
+    __table_args__ = (UniqueConstraint("user_id", "cycle_id", name="uq_evaluations_user_cycle"),)  # One evaluation per person and cycle
     
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
     )
-    user_id: Mapped[str] = mapped_column(ForeignKey("users.id"))
-    cycle_id: Mapped[str] = mapped_column(ForeignKey("cycles.id"))
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.id"), index=True)
+    cycle_id: Mapped[str] = mapped_column(ForeignKey("cycles.id"), index=True)
     period: Mapped[str] = mapped_column(String(50))  # e.g., "H2 2024"
-    phase: Mapped[str] = mapped_column(String(50))  # self-evaluation, leader-evaluation, calibration, feedback, completed
+    phase: Mapped[str] = mapped_column(String(50), index=True)  # self-evaluation, leader-evaluation, calibration, feedback, completed
     objectives_score: Mapped[Optional[float]] = mapped_column(Numeric(5, 2))
     competencies_score: Mapped[Optional[float]] = mapped_column(Numeric(5, 2))
     final_score: Mapped[Optional[float]] = mapped_column(Numeric(5, 2))
@@ -183,7 +209,7 @@ class Evaluation(Base):
     strengths: Mapped[Optional[str]] = mapped_column(Text)
     improvements: Mapped[Optional[str]] = mapped_column(Text)
     development_actions: Mapped[Optional[str]] = mapped_column(Text)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     user: Mapped["User"] = relationship("User", back_populates="evaluations")
@@ -192,13 +218,33 @@ class Evaluation(Base):
     evaluation_objectives: Mapped[List["EvaluationObjective"]] = relationship("EvaluationObjective", back_populates="evaluation", cascade="all, delete-orphan")
 
 
+class EvaluationCampaign(Base):
+    __tablename__ = "evaluation_campaigns"
+    
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    cycle_id: Mapped[str] = mapped_column(ForeignKey("cycles.id"), unique=True)
+    phase: Mapped[str] = mapped_column(String(50))  # Phase of the evaluations created
+    expected_level: Mapped[int] = mapped_column(Integer)  # Expected competency level (capped by each competency's levels)
+    status: Mapped[str] = mapped_column(String(20))  # running, completed, failed
+    last_user_id: Mapped[Optional[str]] = mapped_column(String(36))  # Checkpoint: users up to this id are done
+    evaluations_created: Mapped[int] = mapped_column(Integer, default=0)
+    objectives_created: Mapped[int] = mapped_column(Integer, default=0)
+    competencies_created: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    started_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    heartbeat_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)  # Written after every batch
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+
 class EvaluationCompetency(Base):
     __tablename__ = "evaluation_competencies"
     
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
     )
-    evaluation_id: Mapped[str] = mapped_column(ForeignKey("evaluations.id"))
+    evaluation_id: Mapped[str] = mapped_column(ForeignKey("evaluations.id"), index=True)
     competency_id: Mapped[str] = mapped_column(ForeignKey("competencies.id"))
     self_score: Mapped[Optional[int]] = mapped_column(Integer)  # 1-5
     leader_score: Mapped[Optional[int]] = mapped_column(Integer)  # 1-5
@@ -215,7 +261,7 @@ class EvaluationObjective(Base):
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
     )
-    evaluation_id: Mapped[str] = mapped_column(ForeignKey("evaluations.id"))
+    evaluation_id: Mapped[str] = mapped_column(ForeignKey("evaluations.id"), index=True)
     objective_id: Mapped[str] = mapped_column(ForeignKey("objectives.id"))
     self_score: Mapped[Optional[float]] = mapped_column(Numeric(5, 2))  # 0-100
     leader_score: Mapped[Optional[float]] = mapped_column(Numeric(5, 2))  # 0-100
@@ -241,7 +287,8 @@ class PDI(Base):
     career_goals: Mapped[Optional[str]] = mapped_column(Text)
     resources_needed: Mapped[Optional[str]] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Delta sync
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default='1')  # Incremented on every edit (If-Match)
     
     user: Mapped["User"] = relationship("User", back_populates="pdis")
     cycle: Mapped["Cycle"] = relationship("Cycle")
@@ -266,3 +313,21 @@ class PDIAction(Base):
     
     pdi: Mapped["PDI"] = relationship("PDI", back_populates="actions")
     responsible: Mapped[Optional["User"]] = relationship("User")
+
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+    
+    table_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, default=0, server_default='0')  # Incremented on every write to the table
+
+
+class SyncTombstone(Base):
+    __tablename__ = "sync_tombstones"
+    
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    table_name: Mapped[str] = mapped_column(String(64))
+    row_id: Mapped[str] = mapped_column(String(36))  # Id of the deleted row
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
@@ -0,0 +1,45 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Request
+from schemas.schemas import BatchRequest, BatchResponse
+from services.batch import dispatch
+
+router = APIRouter(prefix="/api/batch", tags=["batch"])
+
+# Maximum number of sub-requests accepted in one batch
+MAX_BATCH_REQUESTS = 20
+
+# Sub-requests of a batch run at the same time (each holds a pooled connection while it runs)
+BATCH_CONCURRENCY = 5
+
+BATCH_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
+
+
+@router.post("/", response_model=BatchResponse)
+@router.post("", response_model=BatchResponse)
+async def run_batch(batch: BatchRequest, request: Request):
+    """
+    Run several API requests in one round-trip. Sub-requests are independent
+    (no shared transaction, no ordering between them) and run concurrently;
+    each result carries its own status code, headers and body, in the
+    order of the requests.
+    """
+    if not batch.requests:
+        raise HTTPException(status_code=400, detail="No requests provided")
+    if len(batch.requests) > MAX_BATCH_REQUESTS:
+        raise HTTPException(status_code=400, detail=f"A batch can contain at most {MAX_BATCH_REQUESTS} requests")
+    for operation in batch.requests:
+        if operation.method.upper() not in BATCH_METHODS:
+            raise HTTPException(status_code=400, detail=f"Unsupported method: {operation.method}")
+        if not operation.url.startswith("/api/") or operation.url.startswith(router.prefix):
+            raise HTTPException(status_code=400, detail=f"Invalid batch URL: {operation.url}")
+
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run(operation):
+        async with semaphore:
+            result = await dispatch(
+                request.app, request.scope, operation.method.upper(), operation.url, operation.headers, operation.body
+            )
+        return {"id": operation.id, **result}
+
+    return {"responses": await asyncio.gather(*(run(operation) for operation in batch.requests))}
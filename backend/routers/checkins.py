@@ -1,107 +1,434 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, update, func, or_
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
+from datetime import date, datetime, time, timedelta
 from database.database import get_db
-from models.models import CheckIn, Objective, User
-from schemas.schemas import CheckInCreate, CheckInRead, CheckInUpdate
+from database.sql_functions import iso_week_start
+from models.models import CheckIn, Objective, User, Cycle
+from schemas.schemas import (
+    CheckInCreate, CheckInRead, CheckInUpdate, CheckInSummary, CheckInBatchCreate, CheckInBatchResult,
+    CheckInFeed, CheckInHeatmap, PendingCheckInOwner, ObjectiveSummary, UserRead
+)
+from services.objective_status import load_status_inputs, progress_update_values
+from services.check_ins import write_check_ins
+from services.check_in_buffer import get_check_in_buffer
+from services.check_in_cadence import refresh_check_in_due, pending_check_in_owners
+from services.cycle_metrics import current_cycle_id
+from services.expansion import parse_expand, parse_fields, column_values, dump, shaped_response
+from services.serialization import serializer_for
+from services.table_versions import conditional_get, cache_headers
+from services.references import ReferenceLoader, get_reference_loader
+from services.versioning import parse_if_match, versioned_update
 
 router = APIRouter(prefix="/api/check-ins", tags=["check-ins"])
 
+# Maximum number of check-ins accepted by the batch endpoint
+MAX_BATCH_CHECK_INS = 500
 
-@router.get("/", response_model=List[CheckInRead])
+# Related objects that can be requested with ?expand=
+CHECK_IN_EXPANSIONS = {"objective", "objective.key_results", "user"}
+
+# Largest page returned by the feed
+MAX_FEED_PAGE_SIZE = 200
+
+# Longest period covered by the heatmap
+MAX_HEATMAP_WEEKS = 104
+
+
+async def load_check_in(db: AsyncSession, check_in_id: str) -> Optional[CheckIn]:
+    """Check-in with its objective (key results and owner) and user, as CheckInRead returns it"""
+    query = select(CheckIn).options(
+        selectinload(CheckIn.objective).selectinload(Objective.key_results),
+        selectinload(CheckIn.objective).selectinload(Objective.owner),
+        selectinload(CheckIn.user)
+    ).where(CheckIn.id == check_in_id)
+    result = await db.execute(query)
+    return result.scalar_one_or_none()
+
+
+async def mark_objective_dirty(db: AsyncSession, objective_id: str):
+    """Flag an objective so the status scheduler recalculates it on its next pass"""
+    await db.execute(
+        update(Objective).where(Objective.id == objective_id).values(status_dirty=True)
+    )
+
+
+@router.get("/", response_model=List[CheckInSummary])
 async def get_check_ins(
     skip: int = 0,
     limit: int = 100,
     objective_id: Optional[str] = None,
     user_id: Optional[str] = None,
+    expand: Optional[str] = None,
+    fields: Optional[str] = None,
+    etag: str = Depends(conditional_get("check_ins", "objectives", "key_results", "users")),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all check-ins with optional filtering"""
-    query = select(CheckIn).options(
-        selectinload(CheckIn.objective),
-        selectinload(CheckIn.user)
-    ).order_by(desc(CheckIn.created_at))
+    """
+    Get all check-ins with optional filtering
+
+    By default each check-in references its objective and user only by id and
+    title/name. expand=objective,objective.key_results,user loads the full
+    objects, returned once each in an "included" side table; fields=... limits
+    the check-in fields returned.
+    """
+    expanded = parse_expand(expand, CHECK_IN_EXPANSIONS)
+    selected_fields = parse_fields(fields, CheckInSummary)
     
+    filters = []
     if objective_id:
-        query = query.where(CheckIn.objective_id == objective_id)
+        filters.append(CheckIn.objective_id == objective_id)
     if user_id:
-        query = query.where(CheckIn.user_id == user_id)
+        filters.append(CheckIn.user_id == user_id)
     
-    query = query.offset(skip).limit(limit)
+    if not expanded:
+        # Compact shape: check-in columns plus objective title and user name in one query
+        query = select(
+            *CheckIn.__table__.columns,
+            Objective.title.label("objective_title"),
+            User.full_name.label("user_name")
+        ).join(
+            Objective, CheckIn.objective_id == Objective.id
+        ).join(
+            User, CheckIn.user_id == User.id
+        ).where(*filters).order_by(desc(CheckIn.created_at)).offset(skip).limit(limit)
+        result = await db.execute(query)
+        
+        serializer = serializer_for(CheckInSummary, selected_fields)
+        return serializer.response([
+            serializer.row({
+                **row,
+                "objective": {"id": row["objective_id"], "title": row["objective_title"]},
+                "user": {"id": row["user_id"], "full_name": row["user_name"]}
+            })
+            for row in result.mappings()
+        ], headers=cache_headers(etag))
+    
+    query = select(CheckIn).where(*filters).order_by(desc(CheckIn.created_at)).offset(skip).limit(limit)
     result = await db.execute(query)
     check_ins = result.scalars().all()
-    return check_ins
+    
+    items = [
+        dump(CheckInSummary, column_values(check_in), selected_fields, exclude={"objective", "user"})
+        for check_in in check_ins
+    ]
+    included = {}
+    
+    # Each referenced objective/user is loaded and serialized once
+    if "objective" in expanded or "objective.key_results" in expanded:
+        with_key_results = "objective.key_results" in expanded
+        objectives_query = select(Objective).where(
+            Objective.id.in_({check_in.objective_id for check_in in check_ins})
+        )
+        if with_key_results:
+            objectives_query = objectives_query.options(selectinload(Objective.key_results))
+        objectives_result = await db.execute(objectives_query)
+        included["objectives"] = {
+            objective.id: dump(ObjectiveSummary, objective)
+            if with_key_results else
+            dump(ObjectiveSummary, column_values(objective), exclude={"key_results"})
+            for objective in objectives_result.scalars().all()
+        }
+    
+    if "user" in expanded:
+        users_result = await db.execute(
+            select(User).where(User.id.in_({check_in.user_id for check_in in check_ins}))
+        )
+        included["users"] = {user.id: dump(UserRead, user) for user in users_result.scalars().all()}
+    
+    return shaped_response(items, included, headers=cache_headers(etag))
+
+
+@router.get("/feed", response_model=CheckInFeed)
+async def get_check_in_feed(
+    skip: int = 0,
+    limit: int = 50,
+    department_id: Optional[str] = None,
+    manager_id: Optional[str] = None,
+    cycle_id: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    etag: str = Depends(conditional_get("check_ins", "objectives", "users")),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Paginated check-in feed, newest first, with objective title/status and
+    user name already joined. Filters by team (department or manager of the
+    author), cycle and date range (inclusive); total is the number of
+    matching check-ins.
+    """
+    limit = max(min(limit, MAX_FEED_PAGE_SIZE), 0)
+    
+    filters = [Objective.is_deleted == False]
+    if department_id:
+        filters.append(User.department_id == department_id)
+    if manager_id:
+        filters.append(User.manager_id == manager_id)
+    if cycle_id:
+        filters.append(Objective.cycle_id == cycle_id)
+    if date_from:
+        filters.append(CheckIn.created_at >= datetime.combine(date_from, time.min))
+    if date_to:
+        filters.append(CheckIn.created_at < datetime.combine(date_to + timedelta(days=1), time.min))
+    
+    # Page and total in one query: the window count is evaluated before offset/limit
+    query = select(
+        *CheckIn.__table__.columns,
+        Objective.title.label("objective_title"),
+        Objective.status.label("objective_status"),
+        User.full_name.label("user_name"),
+        func.count().over().label("total")
+    ).join(
+        Objective, CheckIn.objective_id == Objective.id
+    ).join(
+        User, CheckIn.user_id == User.id
+    ).where(*filters).order_by(desc(CheckIn.created_at), CheckIn.id).offset(skip).limit(limit)
+    result = await db.execute(query)
+    rows = result.mappings().all()
+    
+    if rows:
+        total = rows[0]["total"]
+    elif skip > 0 or limit == 0:
+        # Past the last page there is no row to carry the count
+        count_result = await db.execute(
+            select(func.count()).select_from(CheckIn).join(
+                Objective, CheckIn.objective_id == Objective.id
+            ).join(
+                User, CheckIn.user_id == User.id
+            ).where(*filters)
+        )
+        total = count_result.scalar_one()
+    else:
+        total = 0
+    
+    serializer = serializer_for(CheckInFeed)
+    return serializer.response(serializer.row({"items": rows, "total": total}), headers=cache_headers(etag))
+
+
+@router.get(
+    "/pending", response_model=List[PendingCheckInOwner],
+    dependencies=[Depends(conditional_get("objectives", "users", daily=True))]
+)
+async def get_pending_check_ins(
+    department_id: Optional[str] = None,
+    manager_id: Optional[str] = None,
+    cycle_id: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Owners with objectives whose next check-in is due (by the cadence of the
+    objective or its cycle), most overdue first. manager_id gives a
+    manager's team.
+    """
+    return await pending_check_in_owners(
+        db, department_id=department_id, manager_id=manager_id, cycle_id=cycle_id
+    )
+
+
+@router.get("/heatmap", response_model=CheckInHeatmap)
+async def get_check_in_heatmap(
+    cycle_id: Optional[str] = None,
+    department_id: Optional[str] = None,
+    manager_id: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    etag: str = Depends(conditional_get("check_ins", "users", "cycles")),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Check-ins per user and ISO week, counted in SQL, as a sparse columnar
+    matrix (only non-zero cells). The period is date_from..date_to or else
+    the cycle (the active one by default). Users are the active users of the
+    department / manager's team, plus any other user with check-ins in the
+    period, by name.
+    """
+    if not (date_from and date_to):
+        cycle_id = cycle_id or await current_cycle_id(db)
+        result = await db.execute(select(Cycle.start_date, Cycle.end_date).where(Cycle.id == cycle_id))
+        cycle = result.one_or_none()
+        if not cycle:
+            raise HTTPException(status_code=404, detail="Cycle not found")
+        date_from = date_from or cycle.start_date
+        date_to = date_to or cycle.end_date
+    
+    first_week = date_from - timedelta(days=date_from.weekday())
+    week_count = (date_to - first_week).days // 7 + 1
+    if week_count < 1 or week_count > MAX_HEATMAP_WEEKS:
+        raise HTTPException(
+            status_code=400, detail=f"The period must cover between 1 and {MAX_HEATMAP_WEEKS} weeks"
+        )
+    
+    in_period = [
+        CheckIn.created_at >= datetime.combine(date_from, time.min),
+        CheckIn.created_at < datetime.combine(date_to + timedelta(days=1), time.min)
+    ]
+    user_filters = []
+    if department_id:
+        user_filters.append(User.department_id == department_id)
+    if manager_id:
+        user_filters.append(User.manager_id == manager_id)
+    
+    users_result = await db.execute(
+        select(User.id, User.full_name).where(
+            *user_filters,
+            or_(User.is_active == True, User.id.in_(select(CheckIn.user_id).where(*in_period)))
+        ).order_by(User.full_name, User.id)
+    )
+    users = users_result.all()
+    user_positions = {user.id: index for index, user in enumerate(users)}
+    
+    week = iso_week_start(CheckIn.created_at)
+    cells_result = await db.execute(
+        select(CheckIn.user_id, week.label("week"), func.count().label("count")).join(
+            User, CheckIn.user_id == User.id
+        ).where(*in_period, *user_filters).group_by(CheckIn.user_id, week)
+    )
+    
+    user_index, week_index, counts = [], [], []
+    for user_id, week_start, count in cells_result.all():
+        # ISO text on SQLite, datetime on Oracle
+        if isinstance(week_start, str):
+            week_start = date.fromisoformat(week_start)
+        elif isinstance(week_start, datetime):
+            week_start = week_start.date()
+        user_index.append(user_positions[user_id])
+        week_index.append((week_start - first_week).days // 7)
+        counts.append(count)
+    
+    weeks = [
+        "%d-W%02d" % (first_week + timedelta(weeks=index)).isocalendar()[:2]
+        for index in range(week_count)
+    ]
+    serializer = serializer_for(CheckInHeatmap)
+    return serializer.response(serializer.row({
+        "start_date": first_week,
+        "weeks": weeks,
+        "user_ids": [user.id for user in users],
+        "user_names": [user.full_name for user in users],
+        "user_index": user_index,
+        "week_index": week_index,
+        "counts": counts,
+        "total": sum(counts)
+    }), headers=cache_headers(etag))
 
 
-@router.get("/{check_in_id}", response_model=CheckInRead)
+@router.get(
+    "/{check_in_id}", response_model=CheckInRead,
+    dependencies=[Depends(conditional_get("check_ins", "objectives", "key_results", "users"))]
+)
 async def get_check_in(check_in_id: str, db: AsyncSession = Depends(get_db)):
     """Get a specific check-in by ID"""
-    query = select(CheckIn).options(
-        selectinload(CheckIn.objective),
-        selectinload(CheckIn.user)
-    ).where(CheckIn.id == check_in_id)
-    result = await db.execute(query)
-    check_in = result.scalar_one_or_none()
+    check_in = await load_check_in(db, check_in_id)
     if not check_in:
         raise HTTPException(status_code=404, detail="Check-in not found")
     return check_in
 
 
 @router.post("/", response_model=CheckInRead, status_code=201)
-async def create_check_in(check_in: CheckInCreate, db: AsyncSession = Depends(get_db)):
-    """Create a new check-in"""
-    # Check if objective exists
-    obj_result = await db.execute(select(Objective).where(Objective.id == check_in.objective_id))
-    if not obj_result.scalar_one_or_none():
+async def create_check_in(
+    check_in: CheckInCreate,
+    db: AsyncSession = Depends(get_db),
+    references: ReferenceLoader = Depends(get_reference_loader)
+):
+    """Create a new check-in and roll its progress into the objective"""
+    # Check if objective exists (loading what its status calculation needs)
+    status_inputs = await load_status_inputs(db, [check_in.objective_id])
+    if check_in.objective_id not in status_inputs:
         raise HTTPException(status_code=404, detail="Objective not found")
     
     # Check if user exists
-    user_result = await db.execute(select(User).where(User.id == check_in.user_id))
-    if not user_result.scalar_one_or_none():
-        raise HTTPException(status_code=404, detail="User not found")
+    references.add(User, [check_in.user_id], "User")
+    await references.check()
+    
+    # Write-behind mode: answer once the group containing this check-in is committed
+    check_in_buffer = get_check_in_buffer()
+    if check_in_buffer:
+        # Release the connection while waiting, the group commit uses its own
+        await db.close()
+        values = await check_in_buffer.submit(check_in.model_dump())
+        # Same response as a synchronous write
+        return await load_check_in(db, values["id"])
     
     db_check_in = CheckIn(**check_in.model_dump())
     db.add(db_check_in)
+    
+    # Update objective progress and status in the same transaction
+    values = progress_update_values(check_in.progress, status_inputs[check_in.objective_id])
+    objective_result = await db.execute(
+        update(Objective)
+        .where(Objective.id == check_in.objective_id, Objective.is_deleted == False)
+        .values(**values, version=Objective.version + 1)
+        .returning(Objective.id, Objective.progress, Objective.status)
+    )
+    if not objective_result.one_or_none():
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Objective not found")
+    
     await db.commit()
     await db.refresh(db_check_in)
     
     # Reload with relationships
-    query = select(CheckIn).options(
-        selectinload(CheckIn.objective),
-        selectinload(CheckIn.user)
-    ).where(CheckIn.id == db_check_in.id)
-    result = await db.execute(query)
-    return result.scalar_one()
+    return await load_check_in(db, db_check_in.id)
+
+
+@router.post("/batch", response_model=CheckInBatchResult, status_code=201)
+async def create_check_ins_batch(
+    batch: CheckInBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    references: ReferenceLoader = Depends(get_reference_loader)
+):
+    """Create many check-ins at once (e.g. a team's weekly check-in) in a single transaction"""
+    if not batch.check_ins:
+        raise HTTPException(status_code=400, detail="No check-ins provided")
+    if len(batch.check_ins) > MAX_BATCH_CHECK_INS:
+        raise HTTPException(status_code=400, detail=f"A batch can contain at most {MAX_BATCH_CHECK_INS} check-ins")
+    
+    # Check if objectives exist
+    objective_ids = {check_in.objective_id for check_in in batch.check_ins}
+    status_inputs = await load_status_inputs(db, objective_ids)
+    missing_objectives = objective_ids - status_inputs.keys()
+    if missing_objectives:
+        raise HTTPException(status_code=404, detail=f"Objective not found: {', '.join(sorted(missing_objectives))}")
+    
+    # Check if users exist
+    references.add(User, (check_in.user_id for check_in in batch.check_ins), "User")
+    await references.check(list_ids=True)
+    
+    # Multi-row insert and progress roll-up into the objectives
+    objective_rows = await write_check_ins(
+        db, [check_in.model_dump() for check_in in batch.check_ins], status_inputs
+    )
+    
+    await db.commit()
+    return {
+        "created": len(batch.check_ins),
+        "objectives": [
+            {"id": row["id"], "progress": row["progress"], "status": row["status"]}
+            for row in objective_rows
+        ]
+    }
 
 
 @router.put("/{check_in_id}", response_model=CheckInRead)
 async def update_check_in(
     check_in_id: str,
     check_in_update: CheckInUpdate,
+    if_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
-    """Update a check-in"""
-    result = await db.execute(select(CheckIn).where(CheckIn.id == check_in_id))
-    db_check_in = result.scalar_one_or_none()
-    if not db_check_in:
-        raise HTTPException(status_code=404, detail="Check-in not found")
-    
-    update_data = check_in_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_check_in, field, value)
+    """Update a check-in (only if it is still at the version sent in If-Match, else 412)"""
+    row = await versioned_update(
+        db, CheckIn, check_in_id, check_in_update.model_dump(exclude_unset=True), parse_if_match(if_match),
+        "Check-in", returning=(CheckIn.objective_id,)
+    )
     
+    await mark_objective_dirty(db, row.objective_id)
     await db.commit()
-    await db.refresh(db_check_in)
     
     # Reload with relationships
-    query = select(CheckIn).options(
-        selectinload(CheckIn.objective),
-        selectinload(CheckIn.user)
-    ).where(CheckIn.id == check_in_id)
-    result = await db.execute(query)
-    return result.scalar_one()
+    return await load_check_in(db, check_in_id)
 
 
 @router.delete("/{check_in_id}", status_code=204)
@@ -112,7 +439,10 @@ async def delete_check_in(check_in_id: str, db: AsyncSession = Depends(get_db)):
     if not db_check_in:
         raise HTTPException(status_code=404, detail="Check-in not found")
     
-    db.delete(db_check_in)
+    await db.delete(db_check_in)
+    await mark_objective_dirty(db, db_check_in.objective_id)
+    # The previous check-in (if any) now sets the due date
+    await refresh_check_in_due(db, [db_check_in.objective_id])
     await db.commit()
     return None
 
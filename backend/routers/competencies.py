@@ -1,10 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
+from typing import List, Optional
 from database.database import get_db
 from models.models import Competency
-from schemas.schemas import CompetencyCreate, CompetencyRead, CompetencyUpdate
+from schemas.schemas import CompetencyCreate, CompetencyRead, CompetencyUpdate, CompetencyGapMatrix
+from services.competency_catalog import get_competency_catalog, competency_dict
+from services.competency_gaps import GAP_GROUPINGS, competency_gaps
+from services.cycle_metrics import current_cycle_id
+from services.cycle_snapshots import get_cycle_snapshot
+from services.table_versions import conditional_get
 import json
 
 # Alerta simple para depuración
@@ -13,46 +18,19 @@ def _log(message: str):
 
 router = APIRouter(prefix="/api/competencies", tags=["competencies"])
 
-@router.get("/", response_model=List[CompetencyRead])
+@router.get("/", response_model=List[CompetencyRead], dependencies=[Depends(conditional_get("competencies"))])
 async def get_competencies(
     skip: int = 0,
     limit: int = 100,
     category: str | None = None,
+    include_inactive: bool = False,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all competencies with optional filtering"""
+    """Get active competencies (all with include_inactive=true), by name, with optional filtering"""
     try:
-        # Simple query - no filters for now
-        query = select(Competency)
-        
-        result = await db.execute(query)
-        competencies_db = result.scalars().all()
-        
-        # Convertir datos de DB a formato correcto para el schema
-        competencies = []
-        for comp in competencies_db:
-            # Convertir level_descriptions de string a dict
-            level_descriptions = comp.level_descriptions
-            if isinstance(level_descriptions, str):
-                try:
-                    level_descriptions = json.loads(level_descriptions) if level_descriptions.strip() else {}
-                except json.JSONDecodeError:
-                    level_descriptions = {}
-            elif not isinstance(level_descriptions, dict):
-                level_descriptions = {}
-            
-            competency_dict = {
-                "id": comp.id,
-                "name": comp.name,
-                "description": comp.description,
-                "category": comp.category,
-                "levels": comp.levels,
-                "level_descriptions": level_descriptions,
-                "is_active": comp.is_active,
-                "created_at": comp.created_at,
-                "updated_at": comp.updated_at
-            }
-            competencies.append(competency_dict)
+        competencies = await get_competency_catalog().get(
+            db, category=category, include_inactive=include_inactive, skip=skip, limit=limit
+        )
         
         _log(f"GET: Devueltos {len(competencies)} competencies")
         return competencies
@@ -62,6 +40,40 @@ async def get_competencies(
         _log(f"ERROR en GET competencies: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get competencies: {str(e)}")
 
+@router.get(
+    "/gaps", response_model=CompetencyGapMatrix,
+    dependencies=[Depends(conditional_get(
+        "evaluations", "evaluation_competencies", "competencies", "users", "departments", "cycle_snapshots"
+    ))]
+)
+async def get_competency_gaps(
+    cycle_id: Optional[str] = None,
+    group_by: str = "department",
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Average competency gaps (self and leader score vs expected level, self vs
+    leader) per competency x department or x manager team, for a cycle
+    (current cycle by default), as a sparse matrix for a heatmap
+    """
+    if group_by not in GAP_GROUPINGS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid group_by '{group_by}' (expected one of: {', '.join(GAP_GROUPINGS)})"
+        )
+    
+    cycle_id = cycle_id or await current_cycle_id(db)
+    if not cycle_id:
+        raise HTTPException(status_code=404, detail="Cycle not found")
+    
+    # Closed cycles are served from the matrices frozen when they were closed
+    snapshot = await get_cycle_snapshot(db, cycle_id, f"competency-gaps:{group_by}")
+    if snapshot is not None:
+        return snapshot
+    
+    return await competency_gaps(db, cycle_id, group_by)
+
+
 @router.post("/", response_model=CompetencyRead, status_code=201)
 async def create_competency(competency: CompetencyCreate, db: AsyncSession = Depends(get_db)):
     """Create a new competency"""
@@ -83,27 +95,8 @@ async def create_competency(competency: CompetencyCreate, db: AsyncSession = Dep
         await db.commit()
         await db.refresh(db_competency)
         
-        # Convertir level_descriptions de string a dict para la respuesta
-        level_descriptions = db_competency.level_descriptions
-        if isinstance(level_descriptions, str):
-            try:
-                level_descriptions = json.loads(level_descriptions) if level_descriptions.strip() else {}
-            except json.JSONDecodeError:
-                level_descriptions = {}
-        elif not isinstance(level_descriptions, dict):
-            level_descriptions = {}
-            
-        competency_response = {
-            "id": db_competency.id,
-            "name": db_competency.name,
-            "description": db_competency.description,
-            "category": db_competency.category,
-            "levels": db_competency.levels,
-            "level_descriptions": level_descriptions,
-            "is_active": db_competency.is_active,
-            "created_at": db_competency.created_at,
-            "updated_at": db_competency.updated_at
-        }
+        get_competency_catalog().invalidate()
+        competency_response = competency_dict(db_competency)
         
         _log(f"POST: Creada competencia '{db_competency.name}' (ID: {db_competency.id})")
         return competency_response
@@ -144,27 +137,8 @@ async def update_competency(competency_id: str, competency: CompetencyUpdate, db
         await db.commit()
         await db.refresh(db_competency)
         
-        # Convertir level_descriptions de string a dict para la respuesta
-        level_descriptions = db_competency.level_descriptions
-        if isinstance(level_descriptions, str):
-            try:
-                level_descriptions = json.loads(level_descriptions) if level_descriptions.strip() else {}
-            except json.JSONDecodeError:
-                level_descriptions = {}
-        elif not isinstance(level_descriptions, dict):
-            level_descriptions = {}
-             
-        competency_response = {
-            "id": db_competency.id,
-            "name": db_competency.name,
-            "description": db_competency.description,
-            "category": db_competency.category,
-            "levels": db_competency.levels,
-            "level_descriptions": level_descriptions,
-            "is_active": db_competency.is_active,
-            "created_at": db_competency.created_at,
-            "updated_at": db_competency.updated_at
-        }
+        get_competency_catalog().invalidate()
+        competency_response = competency_dict(db_competency)
         
         _log(f"PUT: Actualizada competencia '{db_competency.name}' (ID: {db_competency.id})")
         return competency_response
@@ -193,6 +167,7 @@ async def delete_competency(competency_id: str, db: AsyncSession = Depends(get_d
         db_competency.is_active = False
         
         await db.commit()
+        get_competency_catalog().invalidate()
         
         _log(f"DELETE: Desactivada competencia '{db_competency.name}' (ID: {db_competency.id})")
         
@@ -1,10 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, exists, or_
 from typing import List
 from database.database import get_db
-from models.models import Cycle
+from models.models import Cycle, Objective, Evaluation, PDI, EvaluationCampaign, CycleSnapshot
 from schemas.schemas import CycleCreate, CycleRead
+from services.check_in_cadence import refresh_check_in_due
+from services.cycle_metrics import dashboard_snapshots
+from services.cycle_snapshots import close_cycle
+from services.reports import report_snapshots
+from services.competency_gaps import gap_snapshots
+from services.serialization import serializer_for
+from services.table_versions import conditional_get, cache_headers
 
 router = APIRouter(prefix="/api/cycles", tags=["cycles"])
 
@@ -15,21 +22,22 @@ async def get_cycles(
     skip: int = 0,
     limit: int = 100,
     is_active: bool = None,
+    etag: str = Depends(conditional_get("cycles")),
     db: AsyncSession = Depends(get_db)
 ):
     """Get all cycles with optional filtering"""
-    query = select(Cycle)
+    query = select(*Cycle.__table__.columns)
     
     if is_active is not None:
         query = query.where(Cycle.is_active == is_active)
     
     query = query.offset(skip).limit(limit)
     result = await db.execute(query)
-    cycles = result.scalars().all()
-    return cycles
+    serializer = serializer_for(CycleRead)
+    return serializer.response(serializer.rows(result.mappings()), headers=cache_headers(etag))
 
 
-@router.get("/{cycle_id}", response_model=CycleRead)
+@router.get("/{cycle_id}", response_model=CycleRead, dependencies=[Depends(conditional_get("cycles"))])
 async def get_cycle(cycle_id: str, db: AsyncSession = Depends(get_db)):
     """Get a specific cycle by ID"""
     result = await db.execute(select(Cycle).where(Cycle.id == cycle_id))
@@ -75,10 +83,15 @@ async def update_cycle(
         for active_cycle in active_cycles:
             active_cycle.is_active = False
     
+    previous_cadence = db_cycle.check_in_cadence_days
     update_data = cycle_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_cycle, field, value)
     
+    # Objectives following the cycle cadence get new check-in due dates
+    if db_cycle.check_in_cadence_days != previous_cadence:
+        await refresh_check_in_due(db, cycle_id=cycle_id)
+    
     await db.commit()
     await db.refresh(db_cycle)
     return db_cycle
@@ -92,6 +105,27 @@ async def update_cycle(
     return db_cycle
 
 
+@router.post("/{cycle_id}/close", response_model=CycleRead)
+async def close_cycle_endpoint(cycle_id: str, db: AsyncSession = Depends(get_db)):
+    """Close a cycle, freezing its dashboard, report and competency gap numbers into snapshots"""
+    result = await db.execute(select(Cycle).where(Cycle.id == cycle_id))
+    db_cycle = result.scalar_one_or_none()
+    if not db_cycle:
+        raise HTTPException(status_code=404, detail="Cycle not found")
+    if db_cycle.closed_at:
+        raise HTTPException(status_code=409, detail="Cycle already closed")
+    
+    snapshots = {
+        **await dashboard_snapshots(db, db_cycle),
+        **await report_snapshots(db, db_cycle),
+        **await gap_snapshots(db, db_cycle)
+    }
+    await close_cycle(db, db_cycle, snapshots)
+    await db.commit()
+    await db.refresh(db_cycle)
+    return db_cycle
+
+
 @router.delete("/{cycle_id}", status_code=204)
 async def delete_cycle(cycle_id: str, db: AsyncSession = Depends(get_db)):
     """Delete a cycle"""
@@ -100,7 +134,15 @@ async def delete_cycle(cycle_id: str, db: AsyncSession = Depends(get_db)):
     if not db_cycle:
         raise HTTPException(status_code=404, detail="Cycle not found")
     
-    db.delete(db_cycle)
+    # Rows of the cycle are not deleted with it
+    in_use = await db.execute(select(or_(*(
+        exists().where(model.cycle_id == cycle_id)
+        for model in (Objective, Evaluation, PDI, EvaluationCampaign, CycleSnapshot)
+    ))))
+    if in_use.scalar():
+        raise HTTPException(status_code=409, detail="Cycle has objectives, evaluations or PDIs")
+    
+    await db.delete(db_cycle)
     await db.commit()
     return None
 
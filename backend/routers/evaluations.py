@@ -1,272 +1,246 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, desc
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from datetime import datetime
-from decimal import Decimal
 from database.database import get_db
-from models.models import Evaluation, EvaluationCompetency, EvaluationObjective, User, Cycle, Competency, Objective
+from models.models import (
+    Evaluation, EvaluationCampaign, EvaluationCompetency, EvaluationObjective, Cycle, Competency, Objective,
+    User
+)
 from schemas.schemas import (
-    EvaluationCreate, EvaluationRead, EvaluationUpdate,
-    EvaluationCompetencyCreate, EvaluationObjectiveCreate,
-    EvaluationCompetencyRead, EvaluationObjectiveRead,
-    UserRead, CompetencyRead, ObjectiveRead
+    EvaluationCreate, EvaluationRead, EvaluationUpdate, EvaluationCampaignCreate, EvaluationCampaignRead,
+    CycleCalibration, EvaluationScoringResult
 )
-
-# Temporary: disable database dependency for testing
-async def mock_get_db():
-    # Mock database session for testing
-    class MockSession:
-        pass
-    return MockSession()
+from services.cycle_metrics import current_cycle_id
+from services.evaluation_campaigns import launch_campaign
+from services.evaluation_scoring import score_evaluations, calibration_stats
+from services.organization_settings import evaluation_weights
+from services.pagination import encode_cursor, after_cursor
+from services.table_versions import conditional_get
+from services.references import ReferenceLoader, get_reference_loader
 
 router = APIRouter(prefix="/api/evaluations", tags=["evaluations"])
 
-# Mock data for evaluations
-MOCK_EVALUATIONS = [
-    {
-        "id": "eval-1",
-        "user_id": "user-1",
-        "cycle_id": "cycle-1",
-        "period": "Q1 2024",
-        "phase": "self-evaluation",
-        "objectives_weight": Decimal("70.0"),
-        "competencies_weight": Decimal("30.0"),
-        "objectives_score": Decimal("85.0"),
-        "competencies_score": Decimal("4.2"),
-        "final_score": Decimal("78.5"),
-        "strengths": "Strong analytical skills and project management",
-        "improvements": "Could improve communication in team settings",
-        "development_actions": "Attend communication workshop",
-        "created_at": datetime(2024, 1, 15, 10, 0, 0),
-        "updated_at": datetime(2024, 1, 15, 10, 0, 0),
-        "user": {
-            "id": "user-1",
-            "email": "john.doe@company.com",
-            "full_name": "John Doe",
-            "role": "Software Engineer",
-            "department_id": "dept-1",
-            "manager_id": "user-2",
-            "is_active": True
-        },
-        "evaluation_competencies": [
-            {
-                "id": "ec-1",
-                "evaluation_id": "eval-1",
-                "competency_id": "comp-1",
-                "self_score": 4,
-                "leader_score": 4,
-                "expected_level": 4,
-                "comment": "Good technical skills",
-                "competency": {
-                    "id": "comp-1",
-                    "name": "Technical Expertise",
-                    "description": "Ability to apply technical knowledge",
-                    "category": "Technical",
-                    "levels": 5,
-                    "level_descriptions": {"1": "Basic", "2": "Intermediate", "3": "Advanced", "4": "Expert", "5": "Master"},
-                    "created_at": datetime(2024, 1, 1, 0, 0, 0),
-                    "updated_at": datetime(2024, 1, 1, 0, 0, 0)
-                }
-            }
-        ],
-        "evaluation_objectives": [
-            {
-                "id": "eo-1",
-                "evaluation_id": "eval-1",
-                "objective_id": "obj-1",
-                "self_score": Decimal("90.0"),
-                "leader_score": Decimal("85.0"),
-                "weight": Decimal("50.0"),
-                "target_progress": Decimal("100.0"),
-                "comment": "Exceeded expectations",
-                "objective": {
-                    "id": "obj-1",
-                    "title": "Complete project X",
-                    "description": "Deliver project X by end of quarter",
-                    "type": "commitment",
-                    "start_date": datetime(2024, 1, 1).date(),
-                    "end_date": datetime(2024, 3, 31).date(),
-                    "methodology": "OKR",
-                    "owner_id": "user-1",
-                    "created_at": datetime(2024, 1, 1, 0, 0, 0),
-                    "updated_at": datetime(2024, 1, 1, 0, 0, 0),
-                    "key_results": [
-                        {
-                            "id": "kr-1",
-                            "objective_id": "obj-1",
-                            "title": "Implement feature A",
-                            "description": "Complete implementation of feature A",
-                            "target_value": Decimal("100.0"),
-                            "current_value": Decimal("100.0"),
-                            "unit": "percent",
-                            "created_at": datetime(2024, 1, 1, 0, 0, 0),
-                            "updated_at": datetime(2024, 1, 1, 0, 0, 0)
-                        }
-                    ],
-                    "owner": {
-                        "id": "user-1",
-                        "email": "john.doe@company.com",
-                        "full_name": "John Doe",
-                        "role": "Software Engineer",
-                        "department_id": "dept-1",
-                        "manager_id": "user-2",
-                        "is_active": True
-                    }
-                }
-            }
-        ]
-    }
-]
+# Largest page returned by the list endpoint
+MAX_EVALUATION_PAGE_SIZE = 200
+
+# Tables an evaluation response is built from
+EVALUATION_TABLES = (
+    "evaluations", "evaluation_competencies", "evaluation_objectives",
+    "competencies", "objectives", "key_results", "users"
+)
+
+# Everything EvaluationRead renders, loaded with one IN query per relation
+# (instead of one query per evaluation, competency and objective)
+EVALUATION_LOAD_OPTIONS = (
+    selectinload(Evaluation.user),
+    selectinload(Evaluation.evaluation_competencies).selectinload(EvaluationCompetency.competency),
+    selectinload(Evaluation.evaluation_objectives).selectinload(EvaluationObjective.objective).options(
+        selectinload(Objective.key_results),
+        selectinload(Objective.owner)
+    ),
+)
+
+
+async def load_evaluation(db: AsyncSession, evaluation_id: str) -> Evaluation:
+    """Evaluation with its competencies and objectives loaded (404 if missing)"""
+    result = await db.execute(
+        select(Evaluation).options(*EVALUATION_LOAD_OPTIONS).where(Evaluation.id == evaluation_id)
+        # Refresh objects already in the session (after a create or update)
+        .execution_options(populate_existing=True)
+    )
+    evaluation = result.scalar_one_or_none()
+    if not evaluation:
+        raise HTTPException(status_code=404, detail="Evaluation not found")
+    return evaluation
 
 
 @router.get("/", response_model=List[EvaluationRead])
 async def get_evaluations(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     user_id: Optional[str] = None,
     cycle_id: Optional[str] = None,
     phase: Optional[str] = None,
-    db: AsyncSession = Depends(mock_get_db)
+    etag: str = Depends(conditional_get(*EVALUATION_TABLES)),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all evaluations with optional filtering"""
-    # Filter mock data based on parameters
-    filtered_evaluations = MOCK_EVALUATIONS
-    
+    """
+    Get evaluations, newest first, with optional filtering
+
+    Pages are read by keyset: when there are more evaluations the
+    X-Next-Cursor header holds the cursor of the next page, to pass back as
+    ?cursor=. skip is still accepted for offset paging.
+    """
+    limit = max(min(limit, MAX_EVALUATION_PAGE_SIZE), 0)
+
+    query = select(Evaluation).options(*EVALUATION_LOAD_OPTIONS)
     if user_id:
-        filtered_evaluations = [e for e in filtered_evaluations if e["user_id"] == user_id]
+        query = query.where(Evaluation.user_id == user_id)
     if cycle_id:
-        filtered_evaluations = [e for e in filtered_evaluations if e["cycle_id"] == cycle_id]
+        query = query.where(Evaluation.cycle_id == cycle_id)
     if phase:
-        filtered_evaluations = [e for e in filtered_evaluations if e["phase"] == phase]
-    
-    # Apply pagination
-    paginated_evaluations = filtered_evaluations[skip:skip + limit]
-    
-    # Convert to Pydantic models
-    return [EvaluationRead(**eval_data) for eval_data in paginated_evaluations]
+        query = query.where(Evaluation.phase == phase)
+    if cursor:
+        query = query.where(after_cursor(Evaluation.created_at, Evaluation.id, cursor))
+
+    # One extra row tells whether there is a next page
+    query = query.order_by(desc(Evaluation.created_at), desc(Evaluation.id)).offset(skip).limit(limit + 1)
+    result = await db.execute(query)
+    evaluations = result.scalars().all()
+
+    if len(evaluations) > limit:
+        evaluations = evaluations[:limit]
+        if evaluations:
+            last = evaluations[-1]
+            response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+    return evaluations
+
+
+@router.post("/campaigns", response_model=EvaluationCampaignRead, status_code=202)
+async def launch_evaluation_campaign(campaign: EvaluationCampaignCreate, db: AsyncSession = Depends(get_db)):
+    """
+    Generate the evaluations of a cycle in the background: one per active
+    person, with their objectives of the cycle (weight and progress as
+    target) and every active competency, weighted by the organization
+    settings. Launching again resumes or tops up the campaign without
+    duplicating evaluations; poll GET /campaigns/{cycle_id} for progress.
+    """
+    result = await db.execute(select(Cycle).where(Cycle.id == campaign.cycle_id))
+    cycle = result.scalar_one_or_none()
+    if not cycle:
+        raise HTTPException(status_code=404, detail="Cycle not found")
+    if cycle.closed_at:
+        raise HTTPException(status_code=409, detail="Cycle is closed")
+
+    return await launch_campaign(db, cycle, campaign.phase, campaign.expected_level)
+
+
+@router.get("/campaigns/{cycle_id}", response_model=EvaluationCampaignRead)
+async def get_evaluation_campaign(cycle_id: str, db: AsyncSession = Depends(get_db)):
+    """Get the evaluation campaign of a cycle"""
+    result = await db.execute(select(EvaluationCampaign).where(EvaluationCampaign.cycle_id == cycle_id))
+    campaign = result.scalar_one_or_none()
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return campaign
+
 
+async def get_cycle(db: AsyncSession, cycle_id: Optional[str]) -> Cycle:
+    """Cycle by id, or the current cycle when no id is given (404 if missing)"""
+    cycle_id = cycle_id or await current_cycle_id(db)
+    cycle = await db.get(Cycle, cycle_id) if cycle_id else None
+    if not cycle:
+        raise HTTPException(status_code=404, detail="Cycle not found")
+    return cycle
 
-@router.get("/{evaluation_id}", response_model=EvaluationRead)
-async def get_evaluation(evaluation_id: str, db: AsyncSession = Depends(mock_get_db)):
+
+@router.post("/scores", response_model=EvaluationScoringResult)
+async def compute_evaluation_scores(cycle_id: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    """
+    Recompute the objectives, competencies and final scores of the
+    evaluations of a cycle (current cycle by default) from their objective
+    and competency scores and the organization weights, and return the
+    calibration statistics
+    """
+    cycle = await get_cycle(db, cycle_id)
+    if cycle.closed_at:
+        raise HTTPException(status_code=409, detail="Cycle is closed")
+
+    updated = await score_evaluations(db, await evaluation_weights(db), cycle.id)
+    await db.commit()
+    return {"updated": updated, "calibration": await calibration_stats(db, cycle.id)}
+
+
+@router.get(
+    "/calibration", response_model=CycleCalibration,
+    dependencies=[Depends(conditional_get("evaluations", "users", "departments"))]
+)
+async def get_calibration(cycle_id: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    """
+    Final score distribution of a cycle (current cycle by default) per
+    department: mean, percentiles, histogram and leniency of each leader
+    """
+    cycle = await get_cycle(db, cycle_id)
+    return await calibration_stats(db, cycle.id)
+
+
+@router.get(
+    "/{evaluation_id}", response_model=EvaluationRead,
+    dependencies=[Depends(conditional_get(*EVALUATION_TABLES))]
+)
+async def get_evaluation(evaluation_id: str, db: AsyncSession = Depends(get_db)):
     """Get a specific evaluation by ID"""
-    # Find evaluation in mock data
-    evaluation = next((e for e in MOCK_EVALUATIONS if e["id"] == evaluation_id), None)
-    if not evaluation:
-        raise HTTPException(status_code=404, detail="Evaluation not found")
-    return EvaluationRead(**evaluation)
+    return await load_evaluation(db, evaluation_id)
 
 
 @router.post("/", response_model=EvaluationRead, status_code=201)
-async def create_evaluation(evaluation: EvaluationCreate, db: AsyncSession = Depends(mock_get_db)):
-    """Create a new evaluation"""
-    # Generate a new ID
-    new_id = f"eval-{len(MOCK_EVALUATIONS) + 1}"
-    
-    # Create the evaluation data
-    evaluation_data = evaluation.model_dump(exclude={"evaluation_competencies", "evaluation_objectives"})
-    evaluation_data.update({
-        "id": new_id,
-        "created_at": datetime.now(),
-        "updated_at": datetime.now(),
-        "user": {
-            "id": evaluation.user_id,
-            "email": "mock@example.com",
-            "full_name": "Mock User",
-            "role": "Employee",
-            "department_id": "dept-1",
-            "manager_id": None,
-            "is_active": True
-        },
-        "evaluation_competencies": [],
-        "evaluation_objectives": []
-    })
-    
-    # Add competencies
-    for i, ec_data in enumerate(evaluation.evaluation_competencies or []):
-        ec_dict = ec_data.model_dump()
-        ec_dict.update({
-            "id": f"ec-{len(MOCK_EVALUATIONS) + 1}-{i + 1}",
-            "evaluation_id": new_id,
-            "competency": {
-                "id": ec_data.competency_id,
-                "name": "Mock Competency",
-                "description": "Mock competency description",
-                "category": "Technical",
-                "levels": 5,
-                "level_descriptions": {"1": "Basic", "2": "Intermediate", "3": "Advanced", "4": "Expert", "5": "Master"},
-                "created_at": datetime.now(),
-                "updated_at": datetime.now()
-            }
-        })
-        evaluation_data["evaluation_competencies"].append(ec_dict)
-    
-    # Add objectives
-    for i, eo_data in enumerate(evaluation.evaluation_objectives or []):
-        eo_dict = eo_data.model_dump()
-        eo_dict.update({
-            "id": f"eo-{len(MOCK_EVALUATIONS) + 1}-{i + 1}",
-            "evaluation_id": new_id,
-            "objective": {
-                "id": eo_data.objective_id,
-                "title": "Mock Objective",
-                "description": "Mock objective description",
-                "type": "commitment",
-                "start_date": datetime.now().date(),
-                "end_date": (datetime.now().replace(month=12, day=31)).date(),
-                "methodology": "OKR",
-                "owner_id": evaluation.user_id,
-                "created_at": datetime.now(),
-                "updated_at": datetime.now(),
-                "key_results": [],
-                "owner": {
-                    "id": evaluation.user_id,
-                    "email": "mock@example.com",
-                    "full_name": "Mock User",
-                    "role": "Employee",
-                    "department_id": "dept-1",
-                    "manager_id": None,
-                    "is_active": True
-                }
-            }
-        })
-        evaluation_data["evaluation_objectives"].append(eo_dict)
-    
-    # Add to mock data
-    MOCK_EVALUATIONS.append(evaluation_data)
-    
-    return EvaluationRead(**evaluation_data)
+async def create_evaluation(
+    evaluation: EvaluationCreate,
+    db: AsyncSession = Depends(get_db),
+    references: ReferenceLoader = Depends(get_reference_loader)
+):
+    """Create a new evaluation with its competencies and objectives"""
+    competencies = evaluation.evaluation_competencies or []
+    objectives = evaluation.evaluation_objectives or []
+    references.add(User, [evaluation.user_id], "User")
+    references.add(Cycle, [evaluation.cycle_id], "Cycle")
+    references.add(Competency, (item.competency_id for item in competencies), "Competency")
+    references.add(Objective, (item.objective_id for item in objectives), "Objective")
+    await references.check()
+
+    existing = await db.execute(
+        select(Evaluation.id).where(Evaluation.user_id == evaluation.user_id, Evaluation.cycle_id == evaluation.cycle_id)
+    )
+    if existing.first():
+        raise HTTPException(status_code=409, detail="Evaluation already exists for this user and cycle")
+
+    db_evaluation = Evaluation(
+        **evaluation.model_dump(exclude={"evaluation_competencies", "evaluation_objectives"}),
+        evaluation_competencies=[EvaluationCompetency(**item.model_dump()) for item in competencies],
+        evaluation_objectives=[EvaluationObjective(**item.model_dump()) for item in objectives]
+    )
+    db.add(db_evaluation)
+    await db.commit()
+
+    return await load_evaluation(db, db_evaluation.id)
 
 
 @router.put("/{evaluation_id}", response_model=EvaluationRead)
 async def update_evaluation(
     evaluation_id: str,
     evaluation_update: EvaluationUpdate,
-    db: AsyncSession = Depends(mock_get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update an evaluation"""
-    # Find evaluation in mock data
-    evaluation = next((e for e in MOCK_EVALUATIONS if e["id"] == evaluation_id), None)
-    if not evaluation:
-        raise HTTPException(status_code=404, detail="Evaluation not found")
-    
-    # Update the evaluation data
+    evaluation = await load_evaluation(db, evaluation_id)
+
     update_data = evaluation_update.model_dump(exclude_unset=True)
-    evaluation.update(update_data)
-    evaluation["updated_at"] = datetime.now()
-    
-    return EvaluationRead(**evaluation)
+    for field, value in update_data.items():
+        setattr(evaluation, field, value)
+    evaluation.updated_at = datetime.utcnow()
+
+    await db.commit()
+    return evaluation
 
 
 @router.delete("/{evaluation_id}", status_code=204)
-async def delete_evaluation(evaluation_id: str, db: AsyncSession = Depends(mock_get_db)):
-    """Delete an evaluation"""
-    # Find and remove evaluation from mock data
-    evaluation = next((e for e in MOCK_EVALUATIONS if e["id"] == evaluation_id), None)
+async def delete_evaluation(evaluation_id: str, db: AsyncSession = Depends(get_db)):
+    """Delete an evaluation with its competencies and objectives"""
+    result = await db.execute(
+        select(Evaluation).options(
+            selectinload(Evaluation.evaluation_competencies),
+            selectinload(Evaluation.evaluation_objectives)
+        ).where(Evaluation.id == evaluation_id)
+    )
+    evaluation = result.scalar_one_or_none()
     if not evaluation:
         raise HTTPException(status_code=404, detail="Evaluation not found")
-    
-    MOCK_EVALUATIONS.remove(evaluation)
-    return None
 
+    await db.delete(evaluation)
+    await db.commit()
+    return None
@@ -0,0 +1,141 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from typing import Optional
+from datetime import date, datetime, time, timedelta
+from models.models import CheckIn, Objective, User, Department, Cycle, Evaluation
+from services.exports import stream_export, EXPORT_MEDIA_TYPES
+
+router = APIRouter(prefix="/api/exports", tags=["exports"])
+
+
+def export_response(request: Request, query, name: str, export_format: str) -> StreamingResponse:
+    """Streaming download of a column query in the requested format"""
+    if export_format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format '{export_format}' (expected one of: {', '.join(EXPORT_MEDIA_TYPES)})"
+        )
+    filename = f"{name}-{date.today().isoformat()}.{export_format}"
+    return StreamingResponse(
+        stream_export(request, query, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+def created_between(column, date_from: Optional[date], date_to: Optional[date]) -> list:
+    """Filters for a timestamp within an inclusive date range"""
+    filters = []
+    if date_from:
+        filters.append(column >= datetime.combine(date_from, time.min))
+    if date_to:
+        filters.append(column < datetime.combine(date_to + timedelta(days=1), time.min))
+    return filters
+
+
+@router.get("/objectives")
+async def export_objectives(
+    request: Request,
+    format: str = "ndjson",
+    cycle_id: Optional[str] = None,
+    department_id: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """
+    Export objectives (format=ndjson or csv) with owner, department and
+    cycle names. The date range keeps objectives whose period overlaps it.
+    """
+    filters = [Objective.is_deleted == False]
+    if cycle_id:
+        filters.append(Objective.cycle_id == cycle_id)
+    if department_id:
+        filters.append(User.department_id == department_id)
+    if date_from:
+        filters.append(Objective.end_date >= date_from)
+    if date_to:
+        filters.append(Objective.start_date <= date_to)
+
+    query = select(
+        Objective.id, Objective.title, Objective.type, Objective.methodology, Objective.status,
+        Objective.approval_status, Objective.progress, Objective.weight,
+        Objective.start_date, Objective.end_date,
+        Objective.cycle_id, Cycle.name.label("cycle_name"),
+        Objective.owner_id, User.full_name.label("owner_name"), Department.name.label("department_name"),
+        Objective.created_at, Objective.updated_at
+    ).join(
+        User, Objective.owner_id == User.id
+    ).outerjoin(
+        Department, User.department_id == Department.id
+    ).outerjoin(
+        Cycle, Objective.cycle_id == Cycle.id
+    ).where(*filters).order_by(Objective.created_at, Objective.id)
+
+    return export_response(request, query, "objectives", format)
+
+
+@router.get("/check-ins")
+async def export_check_ins(
+    request: Request,
+    format: str = "ndjson",
+    cycle_id: Optional[str] = None,
+    department_id: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """Export check-ins (format=ndjson or csv), oldest first, with objective and author"""
+    filters = [Objective.is_deleted == False, *created_between(CheckIn.created_at, date_from, date_to)]
+    if cycle_id:
+        filters.append(Objective.cycle_id == cycle_id)
+    if department_id:
+        filters.append(User.department_id == department_id)
+
+    query = select(
+        CheckIn.id, CheckIn.created_at,
+        CheckIn.objective_id, Objective.title.label("objective_title"),
+        CheckIn.user_id, User.full_name.label("user_name"), Department.name.label("department_name"),
+        CheckIn.previous_progress, CheckIn.progress, CheckIn.comment, CheckIn.blockers
+    ).join(
+        Objective, CheckIn.objective_id == Objective.id
+    ).join(
+        User, CheckIn.user_id == User.id
+    ).outerjoin(
+        Department, User.department_id == Department.id
+    ).where(*filters).order_by(CheckIn.created_at, CheckIn.id)
+
+    return export_response(request, query, "check-ins", format)
+
+
+@router.get("/evaluations")
+async def export_evaluations(
+    request: Request,
+    format: str = "ndjson",
+    cycle_id: Optional[str] = None,
+    department_id: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """Export evaluations (format=ndjson or csv) with scores, by creation date"""
+    filters = created_between(Evaluation.created_at, date_from, date_to)
+    if cycle_id:
+        filters.append(Evaluation.cycle_id == cycle_id)
+    if department_id:
+        filters.append(User.department_id == department_id)
+
+    query = select(
+        Evaluation.id, Evaluation.period, Evaluation.phase,
+        Evaluation.cycle_id, Cycle.name.label("cycle_name"),
+        Evaluation.user_id, User.full_name.label("user_name"), Department.name.label("department_name"),
+        Evaluation.objectives_score, Evaluation.objectives_weight,
+        Evaluation.competencies_score, Evaluation.competencies_weight, Evaluation.final_score,
+        Evaluation.created_at, Evaluation.updated_at
+    ).join(
+        User, Evaluation.user_id == User.id
+    ).outerjoin(
+        Department, User.department_id == Department.id
+    ).outerjoin(
+        Cycle, Evaluation.cycle_id == Cycle.id
+    ).where(*filters).order_by(Evaluation.created_at, Evaluation.id)
+
+    return export_response(request, query, "evaluations", format)
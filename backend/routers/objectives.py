@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete, func
 from sqlalchemy.orm import selectinload
@@ -6,68 +6,19 @@ from typing import List, Optional
 from datetime import datetime, date
 from database.database import get_db
 from models.models import Objective, KeyResult, User, Cycle
-from schemas.schemas import ObjectiveCreate, ObjectiveRead, ObjectiveUpdate, KeyResultCreate
+from schemas.schemas import ObjectiveCreate, ObjectiveRead, ObjectiveUpdate, ObjectiveSummary, KeyResultCreate, UserRead
+from services.objective_status import refresh_objective_status, recompute_pending_statuses
+from services.check_in_cadence import refresh_check_in_due
+from services.expansion import parse_expand, parse_fields, column_values, dump, shaped_response
+from services.serialization import serializer_for
+from services.table_versions import conditional_get, cache_headers
+from services.references import ReferenceLoader, get_reference_loader
+from services.versioning import parse_if_match, versioned_update
 
 router = APIRouter(prefix="/api/objectives", tags=["objectives"])
 
-
-def calculate_objective_status(objective: Objective) -> str:
-    """
-    Calculate automatic objective status based on progress and time
-    
-    Args:
-        objective: Objective instance with its key results
-        
-    Returns:
-        str: Status ("on-track", "at-risk", "delayed", "completed")
-    """
-    current_date = date.today()
-    
-    # If objective is completed, return completed
-    if objective.progress >= 100:
-        return "completed"
-    
-    # Check if objective hasn't started yet
-    if current_date < objective.start_date:
-        return "on-track"
-    
-    # Calculate total duration and elapsed time
-    total_duration = (objective.end_date - objective.start_date).days
-    if total_duration <= 0:
-        total_duration = 1  # Avoid division by zero
-    
-    elapsed_days = (current_date - objective.start_date).days
-    time_percentage = min(elapsed_days / total_duration, 1.0)
-    
-    # Expected progress based on time
-    expected_progress = time_percentage * 100
-    
-    # Calculate key results progress
-    kr_progress = 0
-    if objective.key_results:
-        kr_progress = sum(kr.progress or 0 for kr in objective.key_results) / len(objective.key_results)
-    
-    # Use the minimum between objective progress and key results progress
-    actual_progress = min(objective.progress or 0, kr_progress)
-    
-    # Determine status based on progress vs expected time
-    days_remaining = (objective.end_date - current_date).days
-    
-    if days_remaining < 0:
-        # Objective is past due date
-        return "delayed"
-    elif days_remaining <= 7:
-        # Within 7 days of deadline
-        if actual_progress < 90:
-            return "at-risk"
-    elif actual_progress < (expected_progress * 0.7):
-        # Progress is significantly behind expected time
-        return "at-risk"
-    elif actual_progress < (expected_progress * 0.5):
-        # Progress is critically behind
-        return "delayed"
-    
-    return "on-track"
+# Related objects that can be requested with ?expand=
+OBJECTIVE_EXPANSIONS = {"key_results", "owner"}
 
 
 async def update_objective_status(db: AsyncSession, objective_id: str) -> str:
@@ -90,12 +41,11 @@ async def update_objective_status(db: AsyncSession, objective_id: str) -> str:
     if not objective:
         raise HTTPException(status_code=404, detail="Objective not found")
     
-    new_status = calculate_objective_status(objective)
-    objective.status = new_status
+    refresh_objective_status(objective)
     objective.updated_at = datetime.utcnow()
     
     await db.commit()
-    return new_status
+    return objective.status
 
 
 @router.get("/", response_model=List[ObjectiveRead])
@@ -105,14 +55,21 @@ async def get_objectives(
     cycle_id: Optional[str] = None,
     owner_id: Optional[str] = None,
     status: Optional[str] = None,
+    expand: Optional[str] = None,
+    fields: Optional[str] = None,
+    etag: str = Depends(conditional_get("objectives", "key_results", "users")),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all objectives with optional filtering"""
-    # Build query with relationships
-    query = select(Objective).options(
-        selectinload(Objective.key_results),
-        selectinload(Objective.owner)
-    )
+    """
+    Get all objectives with optional filtering
+
+    Without expand/fields the full objectives (key results and owner) are
+    returned. fields=... returns only the given objective fields and
+    expand=key_results,owner loads only those relations, with owners
+    returned once each in an "included" side table.
+    """
+    # Build query
+    query = select(Objective)
     
     # Filter out logically deleted objectives
     query = query.where(Objective.is_deleted == False)
@@ -129,12 +86,73 @@ async def get_objectives(
     query = query.order_by(Objective.updated_at.desc())
     query = query.offset(skip).limit(limit)
     
+    if expand is None and fields is None:
+        # Full objectives with relationships, serialized straight from the rows
+        result = await db.execute(query.with_only_columns(*Objective.__table__.columns))
+        objectives = result.mappings().all()
+        
+        key_results = {}
+        owners = {}
+        if objectives:
+            key_results_result = await db.execute(
+                select(*KeyResult.__table__.columns).where(
+                    KeyResult.objective_id.in_([objective["id"] for objective in objectives])
+                )
+            )
+            for key_result in key_results_result.mappings():
+                key_results.setdefault(key_result["objective_id"], []).append(key_result)
+            
+            owners_result = await db.execute(
+                select(*User.__table__.columns).where(
+                    User.id.in_({objective["owner_id"] for objective in objectives})
+                )
+            )
+            owners = {owner["id"]: owner for owner in owners_result.mappings()}
+        
+        serializer = serializer_for(ObjectiveRead)
+        return serializer.response([
+            serializer.row({
+                **objective,
+                "key_results": key_results.get(objective["id"], []),
+                "owner": owners.get(objective["owner_id"])
+            })
+            for objective in objectives
+        ], headers=cache_headers(etag))
+    
+    expanded = parse_expand(expand, OBJECTIVE_EXPANSIONS)
+    selected_fields = parse_fields(fields, ObjectiveSummary)
+    if selected_fields is not None:
+        selected_fields |= expanded & {"key_results"}
+    
+    with_key_results = "key_results" in expanded
+    if with_key_results:
+        query = query.options(selectinload(Objective.key_results))
     result = await db.execute(query)
     objectives = result.scalars().all()
-    return objectives
+    
+    items = [
+        dump(ObjectiveSummary, objective, selected_fields)
+        if with_key_results else
+        dump(ObjectiveSummary, column_values(objective), selected_fields, exclude={"key_results"})
+        for objective in objectives
+    ]
+    if not expanded:
+        return shaped_response(items, headers=cache_headers(etag))
+    
+    included = {}
+    if "owner" in expanded:
+        owners_result = await db.execute(
+            select(User).where(User.id.in_({objective.owner_id for objective in objectives}))
+        )
+        included["users"] = {user.id: dump(UserRead, user) for user in owners_result.scalars().all()}
+    
+    return shaped_response(items, included, headers=cache_headers(etag))
 
 
-@router.get("/{objective_id}", response_model=ObjectiveRead)
+@router.get(
+    "/{objective_id}", response_model=ObjectiveRead,
+    dependencies=[Depends(conditional_get("objectives", "key_results", "users"))]
+)
 async def get_objective(objective_id: str, db: AsyncSession = Depends(get_db)):
     """Get a specific objective by ID"""
     query = select(Objective).options(
@@ -149,17 +167,16 @@ async def get_objective(objective_id: str, db: AsyncSession = Depends(get_db)):
 
 
 @router.post("/", response_model=ObjectiveRead, status_code=201)
-async def create_objective(objective: ObjectiveCreate, db: AsyncSession = Depends(get_db)):
+async def create_objective(
+    objective: ObjectiveCreate,
+    db: AsyncSession = Depends(get_db),
+    references: ReferenceLoader = Depends(get_reference_loader)
+):
     """Create a new objective"""
-    # Check if cycle exists
-    cycle_result = await db.execute(select(Cycle).where(Cycle.id == objective.cycle_id))
-    if not cycle_result.scalar_one_or_none():
-        raise HTTPException(status_code=404, detail="Cycle not found")
-    
-    # Check if owner exists
-    user_result = await db.execute(select(User).where(User.id == objective.owner_id))
-    if not user_result.scalar_one_or_none():
-        raise HTTPException(status_code=404, detail="User not found")
+    # Check if cycle and owner exist
+    references.add(Cycle, [objective.cycle_id], "Cycle")
+    references.add(User, [objective.owner_id], "User")
+    await references.check()
     
     objective_data = objective.model_dump(exclude={"key_results"})
     key_results_data = objective.key_results or []
@@ -175,9 +192,11 @@ async def create_objective(objective: ObjectiveCreate, db: AsyncSession = Depend
     
     await db.commit()
     await db.refresh(db_objective)
+    await db.refresh(db_objective, ["key_results"])
     
-    # Update status automatically
-    db_objective.status = calculate_objective_status(db_objective)
+    # Update status and first check-in due date automatically
+    refresh_objective_status(db_objective)
+    await refresh_check_in_due(db, [db_objective.id])
     await db.commit()
     await db.refresh(db_objective)
     
@@ -194,18 +213,14 @@ async def create_objective(objective: ObjectiveCreate, db: AsyncSession = Depend
 async def update_objective(
     objective_id: str,
     objective_update: ObjectiveUpdate,
+    if_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
-    """Update an objective"""
-    query = select(Objective).where(Objective.id == objective_id, Objective.is_deleted == False)
-    result = await db.execute(query)
-    db_objective = result.scalar_one_or_none()
-    if not db_objective:
-        raise HTTPException(status_code=404, detail="Objective not found")
-    
-    update_data = objective_update.model_dump(exclude_unset=True, exclude={"key_results"})
-    for field, value in update_data.items():
-        setattr(db_objective, field, value)
+    """Update an objective (only if it is still at the version sent in If-Match, else 412)"""
+    await versioned_update(
+        db, Objective, objective_id, objective_update.model_dump(exclude_unset=True, exclude={"key_results"}),
+        parse_if_match(if_match), "Objective", Objective.is_deleted == False
+    )
     
     # Handle key results update if provided
     if objective_update.key_results is not None:
@@ -233,32 +248,27 @@ async def update_objective(
                 db_kr = KeyResult(**kr_dump, objective_id=objective_id)
                 db.add(db_kr)
         
-        # Delete key results that are no longer present
-        from sqlalchemy import delete as sqlalchemy_delete
+        # Delete key results that are no longer present (through the session, so they leave sync tombstones)
         krs_to_delete = set(existing_krs.keys()) - incoming_kr_ids
-        if krs_to_delete:
-            delete_query = sqlalchemy_delete(KeyResult).where(
-                KeyResult.objective_id == objective_id,
-                KeyResult.id.in_(krs_to_delete)
-            )
-            # Execute delete and ignore result
-            await db.execute(delete_query)
+        for kr_id in krs_to_delete:
+            await db.delete(existing_krs[kr_id])
     
-    # Single commit with all changes
-    await db.commit()
-    await db.refresh(db_objective)
-    
-    # Update status automatically in the same transaction
-    db_objective.status = calculate_objective_status(db_objective)
-    await db.commit()
-    
-    # Reload with relationships
+    # Load the updated objective with relationships (pending key result changes are flushed first)
     query = select(Objective).options(
         selectinload(Objective.key_results),
         selectinload(Objective.owner)
     ).where(Objective.id == objective_id)
     result = await db.execute(query)
-    return result.scalar_one()
+    db_objective = result.scalar_one()
+    
+    # Update status and check-in due date automatically in the same transaction
+    refresh_objective_status(db_objective)
+    await refresh_check_in_due(db, [objective_id])
+    
+    # Single commit with all changes
+    await db.commit()
+    await db.refresh(db_objective, ["next_check_in_due", "version"])
+    return db_objective
 
 
 @router.delete("/{objective_id}", status_code=204)
@@ -272,6 +282,7 @@ async def delete_objective(objective_id: str, db: AsyncSession = Depends(get_db)
     # Logical delete - mark as deleted instead of physical deletion
     db_objective.is_deleted = True
     db_objective.deleted_at = datetime.utcnow()
+    db_objective.next_check_in_due = None
     
     await db.commit()
     return None
@@ -298,11 +309,16 @@ async def batch_update_status(
     
     updated_count = 0
     for objective in objectives:
-        new_status = calculate_objective_status(objective)
-        if objective.status != new_status:
-            objective.status = new_status
-            objective.updated_at = datetime.utcnow()
+        if refresh_objective_status(objective):
             updated_count += 1
     
     await db.commit()
-    return {"updated_count": updated_count, "total_count": len(objectives)}
\ No newline at end of file
+    return {"updated_count": updated_count, "total_count": len(objectives)}
+
+
+@router.post("/recompute-pending-status", response_model=dict)
+async def recompute_pending_status(
+    db: AsyncSession = Depends(get_db)
+):
+    """Update status only for objectives marked dirty or past their next status check"""
+    return await recompute_pending_statuses(db)
\ No newline at end of file
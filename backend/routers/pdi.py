@@ -1,14 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from database.database import get_db
 from models.models import PDI, PDIAction, User, Cycle
-from schemas.schemas import PDICreate, PDIRead, PDIUpdate, PDIActionCreate
+from schemas.schemas import PDICreate, PDIRead, PDIUpdate, PDISummary, PDIActionCreate, UserRead
+from services.expansion import parse_expand, parse_fields, column_values, dump, shaped_response
+from services.table_versions import conditional_get, cache_headers
+from services.references import ReferenceLoader, get_reference_loader
+from services.versioning import parse_if_match, versioned_update
 
 router = APIRouter(prefix="/api/pdis", tags=["pdis"])
 
+# Related objects that can be requested with ?expand=
+PDI_EXPANSIONS = {"actions", "user"}
+
 
 @router.get("/", response_model=List[PDIRead])
 async def get_pdis(
@@ -16,13 +23,20 @@ async def get_pdis(
     limit: int = 100,
     user_id: Optional[str] = None,
     cycle_id: Optional[str] = None,
+    expand: Optional[str] = None,
+    fields: Optional[str] = None,
+    etag: str = Depends(conditional_get("pdis", "pdi_actions", "users")),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all PDIs with optional filtering"""
-    query = select(PDI).options(
-        selectinload(PDI.user),
-        selectinload(PDI.actions).selectinload(PDIAction.responsible)
-    )
+    """
+    Get all PDIs with optional filtering
+
+    Without expand/fields the full PDIs (user and actions) are returned.
+    fields=... returns only the given PDI fields and expand=actions,user
+    loads only those relations, with users (PDI owners and action
+    responsibles) returned once each in an "included" side table.
+    """
+    query = select(PDI)
     
     if user_id:
         query = query.where(PDI.user_id == user_id)
@@ -30,12 +44,51 @@ async def get_pdis(
         query = query.where(PDI.cycle_id == cycle_id)
     
     query = query.offset(skip).limit(limit)
+    
+    if expand is None and fields is None:
+        query = query.options(
+            selectinload(PDI.user),
+            selectinload(PDI.actions).selectinload(PDIAction.responsible)
+        )
+        result = await db.execute(query)
+        pdis = result.scalars().all()
+        return pdis
+    
+    expanded = parse_expand(expand, PDI_EXPANSIONS)
+    selected_fields = parse_fields(fields, PDISummary)
+    if selected_fields is not None:
+        selected_fields |= expanded & {"actions"}
+    
+    with_actions = "actions" in expanded
+    if with_actions:
+        query = query.options(selectinload(PDI.actions))
     result = await db.execute(query)
     pdis = result.scalars().all()
-    return pdis
+    
+    items = [
+        dump(PDISummary, pdi, selected_fields)
+        if with_actions else
+        dump(PDISummary, column_values(pdi), selected_fields, exclude={"actions"})
+        for pdi in pdis
+    ]
+    if not expanded:
+        return shaped_response(items, headers=cache_headers(etag))
+    
+    included = {}
+    if "user" in expanded:
+        user_ids = {pdi.user_id for pdi in pdis}
+        if with_actions:
+            user_ids |= {action.responsible_id for pdi in pdis for action in pdi.actions if action.responsible_id}
+        users_result = await db.execute(select(User).where(User.id.in_(user_ids)))
+        included["users"] = {user.id: dump(UserRead, user) for user in users_result.scalars().all()}
+    
+    return shaped_response(items, included, headers=cache_headers(etag))
 
 
-@router.get("/{pdi_id}", response_model=PDIRead)
+@router.get(
+    "/{pdi_id}", response_model=PDIRead,
+    dependencies=[Depends(conditional_get("pdis", "pdi_actions", "users"))]
+)
 async def get_pdi(pdi_id: str, db: AsyncSession = Depends(get_db)):
     """Get a specific PDI by ID"""
     query = select(PDI).options(
@@ -50,17 +103,16 @@ async def get_pdi(pdi_id: str, db: AsyncSession = Depends(get_db)):
 
 
 @router.post("/", response_model=PDIRead, status_code=201)
-async def create_pdi(pdi: PDICreate, db: AsyncSession = Depends(get_db)):
+async def create_pdi(
+    pdi: PDICreate,
+    db: AsyncSession = Depends(get_db),
+    references: ReferenceLoader = Depends(get_reference_loader)
+):
     """Create a new PDI"""
-    # Check if user exists
-    user_result = await db.execute(select(User).where(User.id == pdi.user_id))
-    if not user_result.scalar_one_or_none():
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    # Check if cycle exists
-    cycle_result = await db.execute(select(Cycle).where(Cycle.id == pdi.cycle_id))
-    if not cycle_result.scalar_one_or_none():
-        raise HTTPException(status_code=404, detail="Cycle not found")
+    # Check if user and cycle exist
+    references.add(User, [pdi.user_id], "User")
+    references.add(Cycle, [pdi.cycle_id], "Cycle")
+    await references.check()
     
     pdi_data = pdi.model_dump(exclude={"actions"})
     actions_data = pdi.actions or []
@@ -90,20 +142,14 @@ async def create_pdi(pdi: PDICreate, db: AsyncSession = Depends(get_db)):
 async def update_pdi(
     pdi_id: str,
     pdi_update: PDIUpdate,
+    if_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
-    """Update a PDI"""
-    result = await db.execute(select(PDI).where(PDI.id == pdi_id))
-    db_pdi = result.scalar_one_or_none()
-    if not db_pdi:
-        raise HTTPException(status_code=404, detail="PDI not found")
-    
-    update_data = pdi_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_pdi, field, value)
-    
+    """Update a PDI (only if it is still at the version sent in If-Match, else 412)"""
+    await versioned_update(
+        db, PDI, pdi_id, pdi_update.model_dump(exclude_unset=True), parse_if_match(if_match), "PDI"
+    )
     await db.commit()
-    await db.refresh(db_pdi)
     
     # Reload with relationships
     query = select(PDI).options(
@@ -122,7 +168,7 @@ async def delete_pdi(pdi_id: str, db: AsyncSession = Depends(get_db)):
     if not db_pdi:
         raise HTTPException(status_code=404, detail="PDI not found")
     
-    db.delete(db_pdi)
+    await db.delete(db_pdi)
     await db.commit()
     return None
 
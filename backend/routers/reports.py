@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from database.database import get_db
+from models.models import Cycle
+from services.reports import REPORT_TYPES, REPORT_FORMATS, get_report_renderer
+
+router = APIRouter(prefix="/api/reports", tags=["reports"])
+
+
+@router.get("/{report_type}")
+async def download_report(
+    report_type: str,
+    format: str = "xlsx",
+    cycle_id: str = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Download a report (department-performance or cycle-summary) as xlsx or pdf"""
+    if report_type not in REPORT_TYPES:
+        raise HTTPException(status_code=404, detail="Report not found")
+    if format not in REPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format '{format}' (expected one of: {', '.join(REPORT_FORMATS)})"
+        )
+
+    # Current cycle if not provided
+    if cycle_id:
+        result = await db.execute(select(Cycle).where(Cycle.id == cycle_id))
+    else:
+        result = await db.execute(
+            select(Cycle).where(Cycle.is_active == True).order_by(Cycle.created_at.desc()).limit(1)
+        )
+    cycle = result.scalar_one_or_none()
+    if not cycle:
+        raise HTTPException(status_code=404, detail="Cycle not found")
+
+    renderer = get_report_renderer()
+    if renderer is None:
+        raise HTTPException(status_code=503, detail="Report rendering is not available")
+
+    path = await renderer.get(db, report_type, cycle, format)
+    return FileResponse(
+        path,
+        media_type=REPORT_FORMATS[format],
+        filename=f"{report_type}-{cycle.name}.{format}"
+    )
@@ -1,4 +1,5 @@
 import json
+from decimal import Decimal
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
@@ -6,40 +7,34 @@ from sqlalchemy.orm import selectinload
 from database.database import get_db
 from models.models import Organization, Competency
 from schemas.schemas import SettingsRead, SettingsUpdate
+from services.table_versions import conditional_get
+from services.evaluation_scoring import score_evaluations
+from services.organization_settings import DEFAULT_SETTINGS, get_settings_cache, parse_settings
 
 router = APIRouter(prefix="/api/settings", tags=["settings"])
 
-@router.get("/", response_model=SettingsRead)
-@router.get("", response_model=SettingsRead)
+@router.get("/", response_model=SettingsRead, dependencies=[Depends(conditional_get("organizations"))])
+@router.get("", response_model=SettingsRead, dependencies=[Depends(conditional_get("organizations"))])
 async def get_settings(db: AsyncSession = Depends(get_db)):
     """Get organization settings"""
-    # Get the first organization (or create default if none exists)
-    result = await db.execute(select(Organization).limit(1))
-    organization = result.scalar_one_or_none()
-    if not organization:
+    # The ETag is the current counter: the body must not be older than it
+    settings_dict = await get_settings_cache().get(db, check_now=True)
+    if settings_dict is None:
         # Create default organization if none exists
         organization = Organization(
             name="Default Organization",
-            settings={
-                "evaluation_scale_objectives": "1-5",
-                "evaluation_scale_competencies": "1-5",
-                "weight_objectives": 70,
-                "weight_competencies": 30
-            }
+            settings=dict(DEFAULT_SETTINGS)
         )
         db.add(organization)
         await db.commit()
-    
-    # Handle Oracle JSON field that might be string
-    settings_dict = organization.settings
-    if isinstance(settings_dict, str):
-        settings_dict = json.loads(settings_dict) if settings_dict else {}
+        get_settings_cache().invalidate()
+        settings_dict = dict(DEFAULT_SETTINGS)
     
     return SettingsRead(
-        evaluation_scale_objectives=settings_dict.get("evaluation_scale_objectives", "1-5"),
-        evaluation_scale_competencies=settings_dict.get("evaluation_scale_competencies", "1-5"),
-        weight_objectives=settings_dict.get("weight_objectives", 70),
-        weight_competencies=settings_dict.get("weight_competencies", 30)
+        evaluation_scale_objectives=settings_dict["evaluation_scale_objectives"],
+        evaluation_scale_competencies=settings_dict["evaluation_scale_competencies"],
+        weight_objectives=settings_dict["weight_objectives"],
+        weight_competencies=settings_dict["weight_competencies"]
     )
 
 @router.put("/", response_model=SettingsRead)
@@ -56,10 +51,8 @@ async def update_settings(settings: SettingsUpdate, db: AsyncSession = Depends(g
         )
         db.add(organization)
     
-    # Handle Oracle JSON field that might be string
-    settings_dict = organization.settings
-    if isinstance(settings_dict, str):
-        settings_dict = json.loads(settings_dict) if settings_dict else {}
+    settings_dict = parse_settings(organization.settings)
+    previous_weights = (settings_dict.get("weight_objectives"), settings_dict.get("weight_competencies"))
     
     # Update settings
     settings_dict["evaluation_scale_objectives"] = settings.evaluation_scale_objectives
@@ -73,12 +66,13 @@ async def update_settings(settings: SettingsUpdate, db: AsyncSession = Depends(g
     # Update existing competencies if scale or weight changed
     await update_existing_competencies(db, settings_dict)
     
-    await db.commit()
+    # Rescore the evaluations of open cycles with the new weights
+    weights = (settings.weight_objectives, settings.weight_competencies)
+    if weights != previous_weights:
+        await score_evaluations(db, tuple(Decimal(str(weight)) for weight in weights))
     
-    # Handle Oracle JSON field that might be string
-    settings_dict = organization.settings
-    if isinstance(settings_dict, str):
-        settings_dict = json.loads(settings_dict) if settings_dict else {}
+    await db.commit()
+    get_settings_cache().invalidate()
     
     return SettingsRead(
         evaluation_scale_objectives=settings_dict["evaluation_scale_objectives"],
@@ -89,7 +83,8 @@ async def update_settings(settings: SettingsUpdate, db: AsyncSession = Depends(g
 
 async def update_existing_competencies(db: AsyncSession, settings_dict: dict):
     """
-    Update existing competencies to adapt to new scale settings
+    Update existing competencies to adapt to new scale settings.
+    The caller commits, together with the settings.
     """
     try:
         # Get all active competencies
@@ -140,8 +135,6 @@ async def update_existing_competencies(db: AsyncSession, settings_dict: dict):
                 comp.levels = new_levels
                 comp.level_descriptions = json.dumps(new_level_descriptions)
         
-        await db.commit()
-        
     except Exception as e:
         print(f"Error updating competencies: {str(e)}")
         # Don't raise error here, as settings update should still succeed
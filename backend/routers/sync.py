@@ -0,0 +1,24 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.database import get_db
+from schemas.schemas import SyncResponse
+from services.sync import sync_changes
+
+router = APIRouter(prefix="/api/sync", tags=["sync"])
+
+
+@router.get("/", response_model=SyncResponse)
+@router.get("", response_model=SyncResponse)
+async def get_changes(
+    since: Optional[str] = Query(None, description="Token returned by the previous call (none for a full sync)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Users, departments, cycles, objectives, key results, check-ins and PDIs
+    created, updated or deleted since the token. Call again with the
+    returned token right away while has_more is true, later to refresh.
+    Expired tokens (older than the deletions kept) answer 410: sync again
+    without a token.
+    """
+    return await sync_changes(db, since)
@@ -6,11 +6,18 @@ from typing import List, Optional
 from database.database import get_db
 from models.models import User, Department, Objective, CheckIn
 from schemas.schemas import UserCreate, UserRead, UserUpdate, UserWithDepartment
+from services.check_in_cadence import count_pending_check_ins
+from services.table_versions import conditional_get
+from services.directory import get_directory
+from services.references import ReferenceLoader, get_reference_loader
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
 
-@router.get("/", response_model=List[UserWithDepartment])
+@router.get(
+    "/", response_model=List[UserWithDepartment],
+    dependencies=[Depends(conditional_get("users", "departments", "objectives", daily=True))]
+)
 async def get_users(
     skip: int = 0,
     limit: int = 100,
@@ -28,6 +35,9 @@ async def get_users(
     result = await db.execute(query)
     users = result.scalars().all()
     
+    # Objectives with a check-in due, for all users of the page at once
+    pending_check_ins = await count_pending_check_ins(db, [user.id for user in users])
+    
     # Format response to include department name, manager name, and objectives statistics
     formatted_users = []
     for user in users:
@@ -42,13 +52,6 @@ async def get_users(
             total_progress = sum(obj.progress or 0 for obj in objectives)
             avg_progress = float(total_progress / objectives_count)
         
-        # Get pending check-ins count (simplified approach)
-        checkins_query = select(func.count(CheckIn.id)).where(
-            CheckIn.user_id == user.id
-        )
-        checkins_result = await db.execute(checkins_query)
-        pending_checkins = checkins_result.scalar() or 0
-        
         user_dict = {
             "id": user.id,
             "email": user.email,
@@ -61,14 +64,17 @@ async def get_users(
             "manager": user.manager.full_name if user.manager else None,
             "objectivesCount": objectives_count,
             "avgProgress": avg_progress,
-            "pendingCheckIns": pending_checkins,
+            "pendingCheckIns": pending_check_ins.get(user.id, 0),
         }
         formatted_users.append(user_dict)
     
     return formatted_users
 
 
-@router.get("/{user_id}", response_model=UserWithDepartment)
+@router.get(
+    "/{user_id}", response_model=UserWithDepartment,
+    dependencies=[Depends(conditional_get("users", "departments", "objectives", daily=True))]
+)
 async def get_user(user_id: str, db: AsyncSession = Depends(get_db)):
     """Get a specific user by ID with objectives statistics"""
     result = await db.execute(
@@ -92,12 +98,8 @@ async def get_user(user_id: str, db: AsyncSession = Depends(get_db)):
         total_progress = sum(obj.progress or 0 for obj in objectives)
         avg_progress = float(total_progress / objectives_count)
     
-    # Get pending check-ins count
-    checkins_query = select(func.count(CheckIn.id)).where(
-        CheckIn.user_id == user.id
-    )
-    checkins_result = await db.execute(checkins_query)
-    pending_checkins = checkins_result.scalar() or 0
+    # Get objectives with a check-in due
+    pending_check_ins = await count_pending_check_ins(db, [user.id])
     
     # Format response to include department name, manager name, and objectives statistics
     user_dict = {
@@ -112,19 +114,22 @@ async def get_user(user_id: str, db: AsyncSession = Depends(get_db)):
         "manager": user.manager,
         "objectivesCount": objectives_count,
         "avgProgress": avg_progress,
-        "pendingCheckIns": pending_checkins,
+        "pendingCheckIns": pending_check_ins.get(user.id, 0),
     }
     
     return user_dict
 
 
 @router.post("/", response_model=UserRead, status_code=201)
-async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
+async def create_user(
+    user: UserCreate,
+    db: AsyncSession = Depends(get_db),
+    references: ReferenceLoader = Depends(get_reference_loader)
+):
     """Create a new user"""
     # Check if department exists
-    dept_result = await db.execute(select(Department).where(Department.id == user.department_id))
-    if not dept_result.scalar_one_or_none():
-        raise HTTPException(status_code=404, detail="Department not found")
+    references.add(Department, [user.department_id], "Department")
+    await references.check()
     
     # Check if email already exists
     email_result = await db.execute(select(User).where(User.email == user.email))
@@ -134,6 +139,7 @@ async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     db_user = User(**user.model_dump())
     db.add(db_user)
     await db.commit()
+    get_directory().invalidate()
     await db.refresh(db_user)
     return db_user
 
@@ -155,34 +161,20 @@ async def update_user(
         setattr(db_user, field, value)
     
     await db.commit()
+    get_directory().invalidate()
     await db.refresh(db_user)
     return db_user
 
 
-@router.get("/departments/", response_model=List[dict])
+@router.get("/departments/", response_model=List[dict], dependencies=[Depends(conditional_get("departments"))])
 async def get_departments(db: AsyncSession = Depends(get_db)):
     """Get all departments"""
-    result = await db.execute(select(Department))
-    departments = result.scalars().all()
-    return [{"id": dept.id, "name": dept.name} for dept in departments]
+    return await get_directory().departments(db)
 
-@router.get("/managers/", response_model=List[dict])
+@router.get("/managers/", response_model=List[dict], dependencies=[Depends(conditional_get("users", "departments"))])
 async def get_managers(db: AsyncSession = Depends(get_db)):
     """Get all users that can be managers (exclude basic roles)"""
-    query = select(User).where(
-        User.role.in_(['Líder de Equipo', 'Gerente', 'Director', 'Manager'])
-    ).options(selectinload(User.department))
-    result = await db.execute(query)
-    managers = result.scalars().all()
-    return [
-        {
-            "id": manager.id, 
-            "name": manager.full_name,
-            "role": manager.role,
-            "department": manager.department.name if manager.department else None
-        } 
-        for manager in managers
-    ]
+    return await get_directory().managers(db)
 
 
 
@@ -196,5 +188,6 @@ async def delete_user(user_id: str, db: AsyncSession = Depends(get_db)):
     
     await db.delete(db_user)
     await db.commit()
+    get_directory().invalidate()
     return None
 
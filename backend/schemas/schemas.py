@@ -1,7 +1,8 @@
-from pydantic import BaseModel, ConfigDict, EmailStr
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, EmailStr, field_validator
+from typing import Any, Optional, List, Dict
 from datetime import datetime, date
 from decimal import Decimal
+from services.competency_catalog import parse_level_descriptions
 
 
 # ========== Organization Schemas ==========
@@ -59,6 +60,12 @@ class UserUpdate(BaseModel):
 class UserRead(UserBase):
     id: str
 
+class UserRef(BaseModel):
+    id: str
+    full_name: str
+
+    model_config = ConfigDict(from_attributes=True)
+
 class UserWithDepartment(UserRead):
     department: Optional[DepartmentRead] = None
     manager: Optional[str] = None
@@ -72,6 +79,7 @@ class CycleBase(BaseModel):
     start_date: date
     end_date: date
     is_active: bool = False
+    check_in_cadence_days: int = 7
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -81,6 +89,7 @@ class CycleCreate(CycleBase):
 class CycleRead(CycleBase):
     id: str
     created_at: datetime
+    closed_at: Optional[datetime] = None
 
 # ========== KeyResult Schemas ==========
 class KeyResultBase(BaseModel):
@@ -126,6 +135,7 @@ class ObjectiveBase(BaseModel):
     methodology: str = "okr"  # okr or smart
     cycle_id: str
     owner_id: str
+    check_in_cadence_days: Optional[int] = None  # Defaults to the cycle cadence
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -144,6 +154,7 @@ class ObjectiveUpdate(BaseModel):
     end_date: Optional[date] = None
     methodology: Optional[str] = None
     owner_id: Optional[str] = None
+    check_in_cadence_days: Optional[int] = None
     key_results: Optional[List[KeyResultCreate]] = None
 
     model_config = ConfigDict(from_attributes=True)
@@ -152,9 +163,25 @@ class ObjectiveRead(ObjectiveBase):
     id: str
     created_at: datetime
     updated_at: datetime
+    version: int = 1  # Send it as If-Match to update only this version
+    next_check_in_due: Optional[date] = None
     key_results: List[KeyResultRead] = []
     owner: Optional[UserRead] = None
 
+class ObjectiveSummary(ObjectiveBase):
+    id: str
+    created_at: datetime
+    updated_at: datetime
+    version: int = 1  # Send it as If-Match to update only this version
+    next_check_in_due: Optional[date] = None
+    key_results: Optional[List[KeyResultRead]] = None
+
+class ObjectiveRef(BaseModel):
+    id: str
+    title: str
+
+    model_config = ConfigDict(from_attributes=True)
+
 # ========== CheckIn Schemas ==========
 class CheckInBase(BaseModel):
     objective_id: str
@@ -180,9 +207,63 @@ class CheckInUpdate(BaseModel):
 class CheckInRead(CheckInBase):
     id: str
     created_at: datetime
+    version: int = 1  # Send it as If-Match to update only this version
     objective: Optional[ObjectiveRead] = None
     user: Optional[UserRead] = None
 
+class CheckInSummary(CheckInBase):
+    id: str
+    created_at: datetime
+    version: int = 1  # Send it as If-Match to update only this version
+    objective: Optional[ObjectiveRef] = None
+    user: Optional[UserRef] = None
+
+class CheckInBatchCreate(BaseModel):
+    check_ins: List[CheckInCreate]
+
+class ObjectiveProgressSummary(BaseModel):
+    id: str
+    progress: Decimal
+    status: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+class CheckInBatchResult(BaseModel):
+    created: int
+    objectives: List[ObjectiveProgressSummary] = []
+
+class CheckInFeedItem(CheckInBase):
+    id: str
+    created_at: datetime
+    objective_title: str
+    objective_status: str
+    user_name: str
+
+class CheckInFeed(BaseModel):
+    items: List[CheckInFeedItem] = []
+    total: int
+
+# Sparse user x ISO week matrix: cell i is (user_index[i], week_index[i]) -> counts[i]
+class CheckInHeatmap(BaseModel):
+    start_date: date  # Monday of the first week
+    weeks: List[str]  # ISO week labels, e.g. "2026-W42"
+    user_ids: List[str]
+    user_names: List[str]
+    user_index: List[int]
+    week_index: List[int]
+    counts: List[int]
+    total: int
+
+class PendingCheckInOwner(BaseModel):
+    user_id: str
+    full_name: str
+    department_id: str
+    manager_id: Optional[str] = None
+    pending_count: int
+    oldest_due: date
+
+    model_config = ConfigDict(from_attributes=True)
+
 # ========== Competency Schemas ==========
 class CompetencyBase(BaseModel):
     name: str
@@ -226,6 +307,31 @@ class CompetencyRead(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+    @field_validator("level_descriptions", mode="before")
+    @classmethod
+    def level_descriptions_dict(cls, value):
+        # Stored as JSON text (e.g. when read through an evaluation)
+        return parse_level_descriptions(value)
+
+# Sparse competency x group matrix: cell i is (competency_index[i], group_index[i]) -> values at i
+class CompetencyGapMatrix(BaseModel):
+    cycle_id: str
+    group_by: str  # department or manager
+    competency_ids: List[str]
+    competency_names: List[str]
+    competency_evaluations: List[int]  # Org-wide, per competency
+    competency_self_gap: List[Optional[Decimal]]
+    competency_leader_gap: List[Optional[Decimal]]
+    group_ids: List[str]
+    group_names: List[Optional[str]]
+    competency_index: List[int]
+    group_index: List[int]
+    evaluations: List[int]
+    expected_level: List[Optional[Decimal]]
+    self_gap: List[Optional[Decimal]]  # Self score minus expected level
+    leader_gap: List[Optional[Decimal]]  # Leader score minus expected level
+    self_leader_gap: List[Optional[Decimal]]  # Self score minus leader score
+
 # ========== EvaluationCompetency Schemas ==========
 class EvaluationCompetencyBase(BaseModel):
     competency_id: str
@@ -281,11 +387,9 @@ class EvaluationCreate(EvaluationBase):
     evaluation_competencies: Optional[List[EvaluationCompetencyCreate]] = []
     evaluation_objectives: Optional[List[EvaluationObjectiveCreate]] = []
 
+# Scores are computed by the server (POST /api/evaluations/scores), not edited
 class EvaluationUpdate(BaseModel):
     phase: Optional[str] = None
-    objectives_score: Optional[Decimal] = None
-    competencies_score: Optional[Decimal] = None
-    final_score: Optional[Decimal] = None
     strengths: Optional[str] = None
     improvements: Optional[str] = None
     development_actions: Optional[str] = None
@@ -303,6 +407,55 @@ class EvaluationRead(EvaluationBase):
     evaluation_competencies: List[EvaluationCompetencyRead] = []
     evaluation_objectives: List[EvaluationObjectiveRead] = []
 
+# ========== EvaluationCampaign Schemas ==========
+class EvaluationCampaignCreate(BaseModel):
+    cycle_id: str
+    phase: str = "self-evaluation"
+    expected_level: int = 3  # Capped by the levels of each competency
+
+class EvaluationCampaignRead(BaseModel):
+    id: str
+    cycle_id: str
+    phase: str
+    expected_level: int
+    status: str  # running, completed, failed
+    evaluations_created: int
+    objectives_created: int
+    competencies_created: int
+    error: Optional[str] = None
+    started_at: datetime
+    heartbeat_at: datetime
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+# ========== Calibration Schemas ==========
+class LeaderCalibration(BaseModel):
+    leader_id: str
+    name: Optional[str] = None
+    evaluations: int
+    mean: Decimal
+    leniency: Decimal  # Team mean minus department mean
+
+class DepartmentCalibration(BaseModel):
+    department_id: Optional[str] = None
+    name: Optional[str] = None
+    evaluations: int
+    mean: Decimal
+    percentiles: Dict[str, Decimal]  # p10, p25, p50, p75, p90
+    histogram: List[int]  # Final scores in bins of 10 points (0-10, ..., 90-100)
+    leaders: List[LeaderCalibration] = []
+
+class CycleCalibration(BaseModel):
+    cycle_id: str
+    evaluations: int  # Evaluations with a final score
+    mean: Optional[Decimal] = None
+    departments: List[DepartmentCalibration] = []
+
+class EvaluationScoringResult(BaseModel):
+    updated: int  # Evaluations whose scores changed
+    calibration: CycleCalibration
+
 # ========== PDIAction Schemas ==========
 class PDIActionBase(BaseModel):
     type: str  # training, project, mentoring, rotation, coaching, certification, other
@@ -334,6 +487,12 @@ class PDIActionRead(PDIActionBase):
     updated_at: datetime
     responsible: Optional[UserRead] = None
 
+class PDIActionSummary(PDIActionBase):
+    id: str
+    pdi_id: str
+    created_at: datetime
+    updated_at: datetime
+
 # ========== PDI Schemas ==========
 class PDIBase(BaseModel):
     user_id: str
@@ -361,9 +520,17 @@ class PDIRead(PDIBase):
     id: str
     created_at: datetime
     updated_at: datetime
+    version: int = 1  # Send it as If-Match to update only this version
     user: Optional[UserRead] = None
     actions: List[PDIActionRead] = []
 
+class PDISummary(PDIBase):
+    id: str
+    created_at: datetime
+    updated_at: datetime
+    version: int = 1  # Send it as If-Match to update only this version
+    actions: Optional[List[PDIActionSummary]] = None
+
 # ========== Dashboard Schemas ==========
 class DashboardMetrics(BaseModel):
     total_objectives: int
@@ -383,6 +550,22 @@ class MonthlyProgress(BaseModel):
     month: str
     progress: Decimal
 
+class DepartmentTrend(BaseModel):
+    department_id: str
+    name: str
+    objectives: int
+    progress: Decimal
+    completion_rate: Decimal  # % of objectives completed
+    at_risk_share: Decimal  # % of objectives at risk
+
+class CycleTrend(BaseModel):
+    cycle_id: str
+    name: str
+    start_date: date
+    end_date: date
+    closed: bool
+    departments: List[DepartmentTrend]
+
 # ========== Settings Schemas ==========
 class SettingsBase(BaseModel):
     evaluation_scale_objectives: str
@@ -395,3 +578,31 @@ class SettingsRead(SettingsBase):
 
 class SettingsUpdate(SettingsBase):
     pass
+
+# ========== Batch Schemas ==========
+class BatchOperation(BaseModel):
+    id: Optional[str] = None  # Echoed in the result, to match results to operations
+    method: str = "GET"
+    url: str  # Path and query string, e.g. /api/competencies/?category=core
+    headers: Dict[str, str] = {}
+    body: Optional[Any] = None  # JSON body
+
+class BatchRequest(BaseModel):
+    requests: List[BatchOperation]
+
+class BatchResult(BaseModel):
+    id: Optional[str] = None
+    status: int
+    headers: Dict[str, str]
+    body: Optional[Any] = None  # Parsed JSON, text, or base64 for binary content
+    body_encoding: Optional[str] = None  # "base64" for binary content
+
+class BatchResponse(BaseModel):
+    responses: List[BatchResult]
+
+# ========== Sync Schemas ==========
+class SyncResponse(BaseModel):
+    token: str  # Pass it as ?since= in the next call
+    has_more: bool  # More changes of the same pass: call again right away
+    changes: Dict[str, List[Dict[str, Any]]]  # Created or updated rows, by table
+    deleted: Dict[str, List[str]]  # Ids of deleted rows, by table
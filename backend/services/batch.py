@@ -0,0 +1,120 @@
+import asyncio
+import base64
+import json
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+# Headers of the batch request that are not passed on to its sub-requests
+# (sub-responses are returned uncompressed inside the batch response)
+NOT_INHERITED_HEADERS = {b"content-length", b"content-type", b"accept-encoding", b"if-none-match", b"if-match"}
+
+# Redirects (e.g. added or missing trailing slash) followed inside a sub-request
+MAX_BATCH_REDIRECTS = 3
+
+
+def _sub_scope(parent_scope: dict, method: str, url: str, headers: Dict[str, str], body: bytes) -> dict:
+    parts = urlsplit(url)
+    sub_headers = [(name, value) for name, value in parent_scope["headers"] if name not in NOT_INHERITED_HEADERS]
+    sub_headers = [(name, value) for name, value in sub_headers if name.decode("latin-1") not in headers]
+    sub_headers += [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+    if body:
+        sub_headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    return {
+        "type": "http",
+        "asgi": parent_scope.get("asgi", {"version": "3.0"}),
+        "http_version": parent_scope.get("http_version", "1.1"),
+        "scheme": parent_scope.get("scheme", "http"),
+        "server": parent_scope.get("server"),
+        "client": parent_scope.get("client"),
+        "root_path": parent_scope.get("root_path", ""),
+        "method": method,
+        "path": parts.path,
+        "raw_path": parts.path.encode(),
+        "query_string": parts.query.encode(),
+        "headers": sub_headers,
+    }
+
+
+async def _call(app, scope: dict, body: bytes) -> dict:
+    request_sent = False
+    response_complete = asyncio.Event()
+    response = {"status": 500, "headers": [], "body": bytearray()}
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Like a server, report the disconnect only once the response is sent
+        # (streaming responses listen for it while they send)
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+            if not message.get("more_body", False):
+                response_complete.set()
+
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        # The error middleware has already sent its 500 response; the error
+        # of one sub-request must not fail the whole batch
+        response["status"] = 500
+    finally:
+        response_complete.set()
+    return response
+
+
+def _result_body(content_type: str, body: bytes) -> tuple:
+    if not body:
+        return None, None
+    if content_type.startswith("application/json"):
+        return json.loads(body), None
+    if content_type.startswith("text/"):
+        return body.decode("utf-8", errors="replace"), None
+    return base64.b64encode(body).decode("ascii"), "base64"
+
+
+async def dispatch(app, parent_scope: dict, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                   body: Any = None) -> dict:
+    """
+    Run one sub-request of a batch through the application in-process, with
+    its middleware, dependencies (its own database session from the pool)
+    and exception handlers, as if it had been sent on its own.
+
+    Args:
+        app: ASGI application
+        parent_scope: ASGI scope of the batch request (client, server and headers are inherited)
+        method: HTTP method
+        url: Path with optional query string
+        headers: Extra request headers (lowercase names), e.g. if-none-match
+        body: JSON body
+
+    Returns:
+        BatchResult data (without id)
+    """
+    headers = {name.lower(): value for name, value in (headers or {}).items()}
+    encoded_body = json.dumps(body).encode("utf-8") if body is not None else b""
+    for _ in range(MAX_BATCH_REDIRECTS + 1):
+        scope = _sub_scope(parent_scope, method, url, headers, encoded_body)
+        response = await _call(app, scope, encoded_body)
+        response_headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in response["headers"]}
+        location = response_headers.get("location")
+        if response["status"] not in (307, 308) or not location:
+            break
+        location = urlsplit(location)
+        url = location.path + (f"?{location.query}" if location.query else "")
+
+    response_headers.pop("content-length", None)
+    result_body, body_encoding = _result_body(response_headers.get("content-type", ""), bytes(response["body"]))
+    return {
+        "status": response["status"],
+        "headers": response_headers,
+        "body": result_body,
+        "body_encoding": body_encoding
+    }
@@ -0,0 +1,257 @@
+import asyncio
+import glob
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.exc import DataError, IntegrityError
+from database.database import AsyncSessionLocal
+from models.models import CheckIn
+from services.check_ins import write_check_ins
+
+logger = logging.getLogger(__name__)
+
+# Size at which the log is rewritten with only the check-ins still queued
+# (while the queue never drains, e.g. during a sustained rush)
+CHECK_IN_LOG_COMPACT_BYTES = 1024 * 1024
+
+
+def _encode(values: dict) -> str:
+    return json.dumps(values, default=str)
+
+
+def _process_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    if os.name != "posix":
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _decode(values: dict) -> dict:
+    values["progress"] = Decimal(values["progress"])
+    values["previous_progress"] = Decimal(values["previous_progress"])
+    values["created_at"] = datetime.fromisoformat(values["created_at"])
+    return values
+
+
+class CheckInWriteBuffer:
+    """
+    Write-behind buffer for check-ins. Validated check-ins are appended to a
+    local log and queued in memory; a background task inserts them in groups
+    (every flush_ms or max_rows, whichever comes first) with one commit per
+    group. Callers are answered once their group has been committed.
+
+    Each process writes its own log file in log_dir. Logs left behind by a
+    crash are replayed on start. When a group is rejected because of its
+    data (a constraint violation), it is retried in halves so that only the
+    offending check-ins fail. Failed check-ins are recorded in the log so
+    they are not replayed: their callers already got the error.
+    """
+
+    def __init__(self, flush_ms: int, max_rows: int, log_dir: str):
+        self.flush_interval = flush_ms / 1000
+        self.max_rows = max_rows
+        self.log_dir = log_dir
+        self.log_path = os.path.join(log_dir, f"check-ins-{os.getpid()}.log")
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+        self._has_pending = asyncio.Event()
+        self._is_full = asyncio.Event()
+        self._closing = False
+        self._log_file = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        os.makedirs(self.log_dir, exist_ok=True)
+        await self._replay_logs()
+        self._log_file = open(self.log_path, "a", encoding="utf-8")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush everything still queued and close the log"""
+        self._closing = True
+        self._has_pending.set()
+        self._is_full.set()
+        if self._task:
+            await self._task
+        if self._log_file:
+            self._log_file.close()
+            if os.path.getsize(self.log_path) == 0:
+                os.remove(self.log_path)
+
+    async def submit(self, check_in: dict) -> dict:
+        """
+        Queue a validated check-in and wait until it has been committed
+
+        Returns:
+            dict: Stored check-in values (including generated id and created_at)
+        """
+        if self._closing:
+            raise RuntimeError("Check-in write buffer is closed")
+
+        values = {**check_in, "id": str(uuid.uuid4()), "created_at": datetime.utcnow()}
+        self._log_file.write(_encode(values) + "\n")
+        self._log_file.flush()
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((values, future))
+        self._has_pending.set()
+        if len(self._pending) >= self.max_rows:
+            self._is_full.set()
+
+        return await future
+
+    async def _run(self):
+        while True:
+            await self._has_pending.wait()
+            if not self._pending:
+                if self._closing:
+                    return
+                self._has_pending.clear()
+                continue
+
+            # Wait for the group to fill up or for the flush interval to elapse
+            if not self._closing:
+                try:
+                    await asyncio.wait_for(self._is_full.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            group = self._pending[:self.max_rows]
+            del self._pending[:self.max_rows]
+            if len(self._pending) < self.max_rows and not self._closing:
+                self._is_full.clear()
+
+            await self._flush(group)
+
+    async def _flush(self, group: List[Tuple[dict, asyncio.Future]]):
+        # One fsync per group makes the whole group durable in the log
+        os.fsync(self._log_file.fileno())
+
+        failed = await self._commit(group)
+        if failed:
+            self._log_file.write(json.dumps({"failed": [values["id"] for (values, _), _ in failed]}) + "\n")
+            self._log_file.flush()
+            os.fsync(self._log_file.fileno())
+            for (_, future), error in failed:
+                if not future.done():
+                    future.set_exception(error)
+
+        if not self._pending:
+            # Everything logged so far is committed (or was reported as failed)
+            self._log_file.truncate(0)
+        elif self._log_file.tell() >= CHECK_IN_LOG_COMPACT_BYTES:
+            self._compact_log()
+
+    async def _commit(self, group: List[Tuple[dict, asyncio.Future]]) -> list:
+        """
+        Commit a group and answer its callers. A group rejected because of
+        its data is split in halves and retried, down to single check-ins;
+        other errors (e.g. the database is unreachable) fail the whole group.
+
+        Returns:
+            list: (entry, error) of the check-ins that could not be written
+        """
+        try:
+            async with AsyncSessionLocal() as db:
+                await write_check_ins(db, [values for values, _ in group])
+                await db.commit()
+        except (IntegrityError, DataError) as e:
+            if len(group) == 1:
+                logger.warning("Check-in %s rejected: %s", group[0][0]["id"], e)
+                return [(group[0], e)]
+            middle = len(group) // 2
+            return await self._commit(group[:middle]) + await self._commit(group[middle:])
+        except Exception as e:
+            logger.exception("Check-in group commit failed (%s rows)", len(group))
+            return [(entry, e) for entry in group]
+
+        for values, future in group:
+            if not future.done():
+                future.set_result(values)
+        return []
+
+    def _compact_log(self):
+        # Replace the log with the check-ins still queued; the new file is
+        # made durable before it replaces the old one
+        compact_path = f"{self.log_path}.compact"
+        with open(compact_path, "w", encoding="utf-8") as compact_file:
+            compact_file.writelines(_encode(values) + "\n" for values, _ in self._pending)
+            compact_file.flush()
+            os.fsync(compact_file.fileno())
+        self._log_file.close()
+        os.replace(compact_path, self.log_path)
+        self._log_file = open(self.log_path, "a", encoding="utf-8")
+
+    async def _replay_logs(self):
+        """Insert check-ins from logs of previous runs that were not committed"""
+        for path in glob.glob(os.path.join(self.log_dir, "check-ins-*.log")):
+            # Skip logs of workers that are still running
+            pid = os.path.basename(path)[len("check-ins-"):-len(".log")]
+            if pid.isdigit() and _process_alive(int(pid)):
+                continue
+
+            # Claim the file so concurrent workers do not replay it twice
+            claimed_path = f"{path}.replay-{os.getpid()}"
+            try:
+                os.replace(path, claimed_path)
+            except OSError:
+                continue
+
+            check_ins = []
+            failed_ids = set()
+            with open(claimed_path, encoding="utf-8") as log_file:
+                for line in log_file:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if "failed" in record:
+                        failed_ids.update(record["failed"])
+                    else:
+                        check_ins.append(_decode(record))
+            check_ins = [c for c in check_ins if c["id"] not in failed_ids]
+
+            if check_ins:
+                async with AsyncSessionLocal() as db:
+                    result = await db.execute(
+                        select(CheckIn.id).where(CheckIn.id.in_([c["id"] for c in check_ins]))
+                    )
+                    committed_ids = set(result.scalars().all())
+                    missing = [c for c in check_ins if c["id"] not in committed_ids]
+                    if missing:
+                        await write_check_ins(db, missing)
+                        await db.commit()
+                        logger.info("Replayed %s check-ins from %s", len(missing), path)
+
+            os.remove(claimed_path)
+
+
+_buffer: Optional[CheckInWriteBuffer] = None
+
+
+def get_check_in_buffer() -> Optional[CheckInWriteBuffer]:
+    """Active write buffer, or None when check-ins are written synchronously"""
+    return _buffer
+
+
+async def start_check_in_buffer(flush_ms: int, max_rows: int, log_dir: str):
+    global _buffer
+    _buffer = CheckInWriteBuffer(flush_ms, max_rows, log_dir)
+    await _buffer.start()
+
+
+async def stop_check_in_buffer():
+    global _buffer
+    if _buffer:
+        await _buffer.stop()
+        _buffer = None
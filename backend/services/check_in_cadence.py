@@ -0,0 +1,151 @@
+from datetime import date, datetime, timedelta
+from typing import Iterable, Optional
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.models import Objective, Cycle, CheckIn, User
+
+# Days between check-ins when neither the objective nor its cycle sets a cadence
+DEFAULT_CHECK_IN_CADENCE_DAYS = 7
+
+
+def cadence_days_column():
+    """Effective cadence of an objective: its own, else its cycle's (needs a join to Cycle)"""
+    return func.coalesce(
+        Objective.check_in_cadence_days,
+        Cycle.check_in_cadence_days,
+        DEFAULT_CHECK_IN_CADENCE_DAYS
+    )
+
+
+def check_in_due_date(last_check_in: date, cadence_days: Optional[int], progress=None) -> Optional[date]:
+    """
+    Date by which the next check-in of an objective is due
+
+    Args:
+        last_check_in: Date of the last check-in (or the objective start date if none)
+        cadence_days: Days between check-ins
+        progress: Objective progress; completed objectives need no more check-ins
+
+    Returns:
+        Optional[date]: Due date, or None if no check-in is expected
+    """
+    if (progress or 0) >= 100:
+        return None
+    return last_check_in + timedelta(days=cadence_days or DEFAULT_CHECK_IN_CADENCE_DAYS)
+
+
+def pending_check_in_filters(current_date: Optional[date] = None) -> list:
+    """Conditions selecting objectives whose next check-in is due (a range on next_check_in_due)"""
+    current_date = current_date or date.today()
+    return [
+        Objective.next_check_in_due <= current_date,
+        Objective.is_deleted == False
+    ]
+
+
+async def refresh_check_in_due(
+    db: AsyncSession,
+    objective_ids: Optional[Iterable[str]] = None,
+    cycle_id: Optional[str] = None
+) -> int:
+    """
+    Recalculate next_check_in_due from the last check-in of each objective
+    (or its start date) and its effective cadence, with one query and one
+    bulk update. Used when the inputs change other than by a new check-in
+    (objective or cycle edits, deleted check-ins). Does not commit.
+
+    Args:
+        db: Database session
+        objective_ids: Objectives to refresh
+        cycle_id: Refresh every objective of a cycle instead
+
+    Returns:
+        int: Number of objectives refreshed
+    """
+    last_check_in = select(
+        CheckIn.objective_id,
+        func.max(CheckIn.created_at).label("last_check_in_at")
+    ).group_by(CheckIn.objective_id).subquery()
+
+    query = select(
+        Objective.id,
+        Objective.progress,
+        Objective.start_date,
+        cadence_days_column().label("cadence_days"),
+        last_check_in.c.last_check_in_at
+    ).join(
+        Cycle, Objective.cycle_id == Cycle.id
+    ).outerjoin(
+        last_check_in, last_check_in.c.objective_id == Objective.id
+    ).where(Objective.is_deleted == False)
+
+    if objective_ids is not None:
+        query = query.where(Objective.id.in_(set(objective_ids)))
+    if cycle_id is not None:
+        query = query.where(Objective.cycle_id == cycle_id)
+
+    result = await db.execute(query)
+    objective_rows = []
+    for row in result.all():
+        last_date = row.last_check_in_at.date() if row.last_check_in_at else row.start_date
+        objective_rows.append({
+            "id": row.id,
+            "next_check_in_due": check_in_due_date(last_date, row.cadence_days, row.progress)
+        })
+
+    if objective_rows:
+        await db.execute(update(Objective), objective_rows)
+    return len(objective_rows)
+
+
+async def count_pending_check_ins(db: AsyncSession, owner_ids: Iterable[str], current_date: Optional[date] = None) -> dict:
+    """
+    Number of objectives with a check-in due, per owner
+
+    Returns:
+        dict: owner_id -> pending count (owners with none are left out)
+    """
+    result = await db.execute(
+        select(Objective.owner_id, func.count(Objective.id))
+        .where(Objective.owner_id.in_(set(owner_ids)), *pending_check_in_filters(current_date))
+        .group_by(Objective.owner_id)
+    )
+    return dict(result.all())
+
+
+async def pending_check_in_owners(
+    db: AsyncSession,
+    current_date: Optional[date] = None,
+    department_id: Optional[str] = None,
+    manager_id: Optional[str] = None,
+    cycle_id: Optional[str] = None
+) -> list:
+    """
+    Owners with at least one check-in due, most overdue first
+
+    Returns:
+        list: Rows with user_id, full_name, department_id, manager_id, pending_count, oldest_due
+    """
+    query = select(
+        User.id.label("user_id"),
+        User.full_name,
+        User.department_id,
+        User.manager_id,
+        func.count(Objective.id).label("pending_count"),
+        func.min(Objective.next_check_in_due).label("oldest_due")
+    ).join(
+        User, Objective.owner_id == User.id
+    ).where(*pending_check_in_filters(current_date))
+
+    if department_id:
+        query = query.where(User.department_id == department_id)
+    if manager_id:
+        query = query.where(User.manager_id == manager_id)
+    if cycle_id:
+        query = query.where(Objective.cycle_id == cycle_id)
+
+    query = query.group_by(
+        User.id, User.full_name, User.department_id, User.manager_id
+    ).order_by(func.min(Objective.next_check_in_due), User.full_name)
+    result = await db.execute(query)
+    return result.mappings().all()
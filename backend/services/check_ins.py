@@ -0,0 +1,37 @@
+from typing import List, Optional
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.models import CheckIn, Objective
+from services.objective_status import load_status_inputs, progress_update_values
+
+
+async def write_check_ins(db: AsyncSession, check_ins: List[dict], status_inputs: Optional[dict] = None) -> List[dict]:
+    """
+    Insert several check-ins with one multi-row INSERT and roll the latest
+    progress of each objective into it with one bulk UPDATE (incrementing
+    its version, so edits of the previous progress get 412). Does not commit.
+
+    Args:
+        db: Database session
+        check_ins: Check-in column values
+        status_inputs: Result of load_status_inputs for the objectives, if already loaded
+
+    Returns:
+        List[dict]: Updated objectives (id, progress, status and the other written values)
+    """
+    if status_inputs is None:
+        status_inputs = await load_status_inputs(db, {check_in["objective_id"] for check_in in check_ins})
+
+    await db.execute(insert(CheckIn), check_ins)
+
+    # Latest check-in of each objective sets its progress
+    latest_progress = {check_in["objective_id"]: check_in["progress"] for check_in in check_ins}
+    objective_rows = [
+        {"id": objective_id, **progress_update_values(progress, status_inputs[objective_id])}
+        for objective_id, progress in latest_progress.items()
+        if objective_id in status_inputs
+    ]
+    if objective_rows:
+        await db.execute(update(Objective).values(version=Objective.version + 1), objective_rows)
+
+    return objective_rows
@@ -0,0 +1,99 @@
+import json
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.models import Competency
+from services.table_versions import get_table_versions
+
+
+def parse_level_descriptions(level_descriptions) -> dict:
+    """Level descriptions as a dict (stored as JSON text on Oracle)"""
+    if isinstance(level_descriptions, str):
+        try:
+            return json.loads(level_descriptions) if level_descriptions.strip() else {}
+        except json.JSONDecodeError:
+            return {}
+    return level_descriptions if isinstance(level_descriptions, dict) else {}
+
+
+def competency_dict(competency: Competency) -> dict:
+    """CompetencyRead data of a competency, with parsed level descriptions"""
+    return {
+        "id": competency.id,
+        "name": competency.name,
+        "description": competency.description,
+        "category": competency.category,
+        "levels": competency.levels,
+        "level_descriptions": parse_level_descriptions(competency.level_descriptions),
+        "is_active": competency.is_active,
+        "created_at": competency.created_at,
+        "updated_at": competency.updated_at
+    }
+
+
+class CompetencyCatalog:
+    """
+    In-process cache of competency catalog pages, with level descriptions
+    already parsed. Pages are keyed by their filters and valid for one
+    version of the competencies table: the version counter is checked on
+    every read (one primary key lookup), so writes made through any worker
+    are picked up; the write handlers of this process also invalidate it
+    directly.
+
+    Misses run the filtered, paginated query in the database.
+    """
+
+    def __init__(self, max_pages: int = 64):
+        self.max_pages = max_pages
+        self._version: Optional[int] = None
+        self._pages: Dict[Tuple, List[dict]] = {}
+
+    def invalidate(self):
+        self._version = None
+        self._pages = {}
+
+    async def get(self, db: AsyncSession, category: Optional[str] = None, include_inactive: bool = False,
+                  skip: int = 0, limit: int = 100) -> List[dict]:
+        """
+        Competencies ordered by name
+
+        Args:
+            db: Database session
+            category: Only competencies of this category
+            include_inactive: Also return deactivated competencies
+            skip: Competencies skipped
+            limit: Maximum competencies returned
+
+        Returns:
+            List of CompetencyRead data (shared: callers must not modify it)
+        """
+        versions = await get_table_versions(db, ["competencies"])
+        version = versions["competencies"]
+        if version != self._version:
+            self._version = version
+            self._pages = {}
+
+        key = (category, include_inactive, skip, limit)
+        page = self._pages.get(key)
+        if page is None:
+            query = select(Competency)
+            if not include_inactive:
+                query = query.where(or_(Competency.is_active == True, Competency.is_active.is_(None)))
+            if category:
+                query = query.where(Competency.category == category)
+            query = query.order_by(Competency.name, Competency.id).offset(skip).limit(limit)
+            result = await db.execute(query)
+            page = [competency_dict(competency) for competency in result.scalars().all()]
+
+            if len(self._pages) >= self.max_pages:
+                self._pages.pop(next(iter(self._pages)))
+            self._pages[key] = page
+        return page
+
+
+_catalog = CompetencyCatalog()
+
+
+def get_competency_catalog() -> CompetencyCatalog:
+    """Process-wide competency catalog cache"""
+    return _catalog
@@ -0,0 +1,116 @@
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from models.models import Cycle, Department, User, Competency, Evaluation, EvaluationCompetency
+from schemas.schemas import CompetencyGapMatrix
+
+# Ways people are grouped in the gap matrix: by department or by manager (direct reports)
+GAP_GROUPINGS = ("department", "manager")
+
+
+def _decimal(value) -> Optional[Decimal]:
+    # AVG returns float or Decimal depending on the database
+    return Decimal(str(value)).quantize(Decimal("0.01"), ROUND_HALF_UP) if value is not None else None
+
+
+def _gap_columns():
+    return (
+        func.count(EvaluationCompetency.id).label("evaluations"),
+        func.avg(EvaluationCompetency.expected_level).label("expected_level"),
+        # AVG skips NULLs: competencies not scored yet do not count as gaps
+        func.avg(EvaluationCompetency.self_score - EvaluationCompetency.expected_level).label("self_gap"),
+        func.avg(EvaluationCompetency.leader_score - EvaluationCompetency.expected_level).label("leader_gap"),
+        func.avg(EvaluationCompetency.self_score - EvaluationCompetency.leader_score).label("self_leader_gap"),
+    )
+
+
+async def competency_gaps(db: AsyncSession, cycle_id: str, group_by: str = "department") -> dict:
+    """
+    Average gaps of the competencies evaluated in a cycle, per competency x
+    department (or x manager team), as a sparse matrix for a heatmap:
+    cell i is (competency_index[i], group_index[i]) with the averages at
+    position i of the value lists. Gaps are score minus expected level
+    (self and leader) and self minus leader score; negative values are
+    skills below what is expected. The org-wide averages of each competency
+    come in the competency_* lists.
+
+    Args:
+        db: Database session
+        cycle_id: Cycle of the evaluations
+        group_by: "department" or "manager"
+
+    Returns:
+        CompetencyGapMatrix data
+    """
+    if group_by == "manager":
+        Leader = aliased(User)
+        group_id, group_name = User.manager_id, Leader.full_name
+        join_group = (Leader, User.manager_id == Leader.id)
+    else:
+        group_id, group_name = User.department_id, Department.name
+        join_group = (Department, User.department_id == Department.id)
+
+    cells = await db.execute(
+        select(
+            EvaluationCompetency.competency_id, group_id.label("group_id"), *_gap_columns()
+        ).join(
+            Evaluation, EvaluationCompetency.evaluation_id == Evaluation.id
+        ).join(
+            User, Evaluation.user_id == User.id
+        ).join(
+            *join_group
+        ).where(Evaluation.cycle_id == cycle_id).group_by(EvaluationCompetency.competency_id, group_id)
+    )
+    cells = cells.all()
+
+    totals = await db.execute(
+        select(
+            Competency.id, Competency.name, *_gap_columns()
+        ).join(
+            EvaluationCompetency, EvaluationCompetency.competency_id == Competency.id
+        ).join(
+            Evaluation, EvaluationCompetency.evaluation_id == Evaluation.id
+        ).where(Evaluation.cycle_id == cycle_id).group_by(Competency.id, Competency.name).order_by(Competency.name)
+    )
+    totals = totals.all()
+
+    groups = await db.execute(
+        select(group_id, group_name).select_from(User).join(*join_group).where(
+            group_id.in_({row.group_id for row in cells})
+        ).distinct().order_by(group_name)
+    )
+    groups = groups.all()
+
+    competency_index = {row.id: index for index, row in enumerate(totals)}
+    group_index = {row[0]: index for index, row in enumerate(groups)}
+    cells = sorted(cells, key=lambda row: (competency_index[row.competency_id], group_index[row.group_id]))
+
+    return {
+        "cycle_id": cycle_id,
+        "group_by": group_by,
+        "competency_ids": [row.id for row in totals],
+        "competency_names": [row.name for row in totals],
+        "competency_evaluations": [row.evaluations for row in totals],
+        "competency_self_gap": [_decimal(row.self_gap) for row in totals],
+        "competency_leader_gap": [_decimal(row.leader_gap) for row in totals],
+        "group_ids": [row[0] for row in groups],
+        "group_names": [row[1] for row in groups],
+        "competency_index": [competency_index[row.competency_id] for row in cells],
+        "group_index": [group_index[row.group_id] for row in cells],
+        "evaluations": [row.evaluations for row in cells],
+        "expected_level": [_decimal(row.expected_level) for row in cells],
+        "self_gap": [_decimal(row.self_gap) for row in cells],
+        "leader_gap": [_decimal(row.leader_gap) for row in cells],
+        "self_leader_gap": [_decimal(row.self_leader_gap) for row in cells],
+    }
+
+
+async def gap_snapshots(db: AsyncSession, cycle: Cycle) -> dict:
+    """Gap matrices of a cycle for every grouping, by snapshot kind, as JSON data"""
+    snapshots = {}
+    for group_by in GAP_GROUPINGS:
+        matrix = await competency_gaps(db, cycle.id, group_by)
+        snapshots[f"competency-gaps:{group_by}"] = CompetencyGapMatrix(**matrix).model_dump(mode="json")
+    return snapshots
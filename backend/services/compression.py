@@ -0,0 +1,204 @@
+import zlib
+from typing import Iterable, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # Optional: without it only gzip is offered
+    zstandard = None
+
+# Status codes whose responses never carry a body to compress
+UNCOMPRESSED_STATUS = {204, 304}
+
+
+def _parse_accept_encoding(header: str) -> dict:
+    """Codings of an Accept-Encoding header with their q-values"""
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+class _GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        # wbits=31: gzip container (header with mtime 0, so output is reproducible)
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        # Sync flush so every streamed chunk reaches the client right away
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH)
+
+
+class _ZstdEncoder:
+    name = "zstd"
+
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing response bodies with zstd (when the
+    zstandard package is installed and the client accepts it) or gzip.
+
+    Only responses whose Content-Type starts with one of content_types are
+    compressed, and complete bodies smaller than min_size bytes are sent
+    as they are. Streamed responses (more_body) are compressed chunk by
+    chunk and flushed after each one, so they keep streaming; they are
+    skipped only when they declare a Content-Length below min_size.
+    Bodiless responses (304, 204), HEAD requests and responses that already
+    have a Content-Encoding pass through untouched.
+    """
+
+    def __init__(
+        self,
+        app,
+        min_size: int = 1024,
+        gzip_level: int = 6,
+        zstd_level: int = 3,
+        content_types: Iterable[str] = ("application/json", "text/"),
+        zstd_enabled: bool = True
+    ):
+        self.app = app
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+        self.content_types = tuple(content_type.strip().lower() for content_type in content_types if content_type.strip())
+        self.zstd_enabled = zstd_enabled and zstandard is not None
+
+    def _encoder(self, scope):
+        """Encoder for the best coding the client accepts, or None"""
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding += value.decode("latin-1") + ","
+        accepted = _parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+
+        def quality(coding):
+            return accepted.get(coding, wildcard)
+
+        candidates = []
+        if self.zstd_enabled and quality("zstd") > 0:
+            candidates.append((quality("zstd"), 1, _ZstdEncoder, self.zstd_level))
+        if quality("gzip") > 0:
+            candidates.append((quality("gzip"), 0, _GzipEncoder, self.gzip_level))
+        if not candidates:
+            return None
+        # Highest q-value first; on ties zstd (faster for the same ratio)
+        _, _, encoder_class, level = max(candidates, key=lambda candidate: candidate[:2])
+        return encoder_class(level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoder = self._encoder(scope)
+        start_message = None
+        compress = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compress
+
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk tells the size
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not False:
+                start, start_message = start_message, False
+                headers = _Headers(start.get("headers", []))
+                eligible = self._eligible(start["status"], headers)
+                if eligible:
+                    headers.add_vary("Accept-Encoding")
+                compress = eligible and encoder is not None and self._large_enough(body, more_body, headers)
+                if compress:
+                    headers.set("content-encoding", encoder.name)
+                    headers.remove("content-length")
+                    # The compressed body is not byte-identical: strong validators become weak
+                    etag = headers.get("etag")
+                    if etag and not etag.startswith("W/"):
+                        headers.set("etag", "W/" + etag)
+                    if not more_body:
+                        body = encoder.finish(body)
+                        headers.set("content-length", str(len(body)))
+                await send({**start, "headers": headers.raw})
+                if not more_body:
+                    await send({**message, "body": body})
+                    return
+
+            if compress:
+                body = encoder.chunk(body) if more_body else encoder.finish(body)
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _eligible(self, status: int, headers: "_Headers") -> bool:
+        if status < 200 or status in UNCOMPRESSED_STATUS or headers.get("content-encoding"):
+            return False
+        content_type = (headers.get("content-type") or "").lower()
+        return content_type.startswith(self.content_types)
+
+    def _large_enough(self, body: bytes, more_body: bool, headers: "_Headers") -> bool:
+        if not more_body:
+            return len(body) >= self.min_size
+        content_length = headers.get("content-length")
+        return content_length is None or not content_length.isdigit() or int(content_length) >= self.min_size
+
+
+class _Headers:
+    """Minimal editor of raw ASGI header lists (lower-case names)"""
+
+    def __init__(self, raw: Iterable):
+        self.raw: List[tuple] = list(raw)
+
+    def get(self, name: str) -> Optional[str]:
+        key = name.encode("latin-1")
+        for header, value in self.raw:
+            if header.lower() == key:
+                return value.decode("latin-1")
+        return None
+
+    def remove(self, name: str):
+        key = name.encode("latin-1")
+        self.raw = [(header, value) for header, value in self.raw if header.lower() != key]
+
+    def set(self, name: str, value: str):
+        self.remove(name)
+        self.raw.append((name.encode("latin-1"), value.encode("latin-1")))
+
+    def add_vary(self, field: str):
+        vary = self.get("vary")
+        if not vary:
+            self.set("vary", field)
+        elif field.lower() not in [item.strip().lower() for item in vary.split(",")] and vary.strip() != "*":
+            self.set("vary", f"{vary}, {field}")
@@ -0,0 +1,213 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterable, List, Optional
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.models import Objective, Cycle, CheckIn, User, Department
+from schemas.schemas import DashboardMetrics, DepartmentProgress, MonthlyProgress
+from services.check_in_cadence import pending_check_in_filters
+
+
+async def current_cycle_id(db: AsyncSession) -> Optional[str]:
+    """Id of the most recent active cycle, if any"""
+    result = await db.execute(
+        select(Cycle.id).where(Cycle.is_active == True).order_by(Cycle.created_at.desc()).limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def dashboard_metrics(db: AsyncSession, cycle_id: str) -> DashboardMetrics:
+    """Objective counts, average progress, pending check-ins and deadlines of a cycle"""
+    # Get objectives for the cycle
+    objectives_query = select(Objective).where(Objective.cycle_id == cycle_id)
+    objectives_result = await db.execute(objectives_query)
+    objectives = objectives_result.scalars().all()
+
+    total_objectives = len(objectives)
+    completed_objectives = sum(1 for obj in objectives if obj.status == "completed")
+    at_risk_count = sum(1 for obj in objectives if obj.status == "at-risk")
+
+    # Calculate average progress
+    if objectives:
+        avg_progress = sum(float(obj.progress) for obj in objectives) / len(objectives)
+        on_track_count = sum(1 for obj in objectives if obj.status == "on-track")
+        on_track_percentage = (on_track_count / len(objectives)) * 100
+    else:
+        avg_progress = Decimal("0")
+        on_track_percentage = Decimal("0")
+
+    # Get pending check-ins (objectives whose next check-in is due)
+    pending_query = select(func.count(Objective.id)).where(
+        Objective.cycle_id == cycle_id,
+        *pending_check_in_filters()
+    )
+    pending_result = await db.execute(pending_query)
+    pending_check_ins = pending_result.scalar() or 0
+
+    # Get upcoming deadlines (objectives ending in next 7 days)
+    next_week = date.today() + timedelta(days=7)
+    upcoming_deadlines = sum(
+        1 for obj in objectives
+        if obj.end_date <= next_week and obj.status != "completed"
+    )
+
+    return DashboardMetrics(
+        total_objectives=total_objectives,
+        completed_objectives=completed_objectives,
+        avg_progress=Decimal(str(avg_progress)),
+        on_track_percentage=Decimal(str(on_track_percentage)),
+        at_risk_count=at_risk_count,
+        pending_check_ins=pending_check_ins,
+        upcoming_deadlines=upcoming_deadlines
+    )
+
+
+async def department_progress(db: AsyncSession, cycle_id: str) -> List[DepartmentProgress]:
+    """Average objective progress of each department with objectives in a cycle"""
+    # Get departments
+    depts_result = await db.execute(select(Department))
+    departments = depts_result.scalars().all()
+
+    department_progress_list = []
+    for dept in departments:
+        # Get users in department
+        users_result = await db.execute(
+            select(User).where(User.department_id == dept.id)
+        )
+        users = users_result.scalars().all()
+        user_ids = [user.id for user in users]
+
+        if not user_ids:
+            continue
+
+        # Get objectives for users in this department
+        objectives_result = await db.execute(
+            select(Objective).where(
+                Objective.cycle_id == cycle_id,
+                Objective.owner_id.in_(user_ids)
+            )
+        )
+        objectives = objectives_result.scalars().all()
+
+        if objectives:
+            avg_progress = sum(float(obj.progress) for obj in objectives) / len(objectives)
+            department_progress_list.append(
+                DepartmentProgress(
+                    name=dept.name,
+                    progress=Decimal(str(avg_progress)),
+                    objectives=len(objectives)
+                )
+            )
+
+    return department_progress_list
+
+
+async def monthly_progress(db: AsyncSession, cycle: Cycle) -> List[MonthlyProgress]:
+    """Average check-in progress of each month of a cycle"""
+    # Get check-ins for objectives in this cycle
+    check_ins_result = await db.execute(
+        select(CheckIn).join(Objective).where(Objective.cycle_id == cycle.id)
+    )
+    check_ins = check_ins_result.scalars().all()
+
+    # Group by month and calculate average progress
+    monthly_data = {}
+    month_names = ["Ene", "Feb", "Mar", "Abr", "May", "Jun", "Jul", "Ago", "Sep", "Oct", "Nov", "Dic"]
+
+    current_date = cycle.start_date
+    while current_date <= cycle.end_date:
+        month_key = current_date.strftime("%Y-%m")
+        if month_key not in monthly_data:
+            monthly_data[month_key] = {
+                "month": month_names[current_date.month - 1],
+                "progress_values": []
+            }
+        current_date += timedelta(days=30)
+
+    # Calculate progress based on check-ins (simplified - in real app would be more complex)
+    for check_in in check_ins:
+        month_key = check_in.created_at.strftime("%Y-%m")
+        if month_key in monthly_data:
+            monthly_data[month_key]["progress_values"].append(float(check_in.progress))
+
+    monthly_progress_list = []
+    for month_key, data in sorted(monthly_data.items()):
+        if data["progress_values"]:
+            avg_progress = sum(data["progress_values"]) / len(data["progress_values"])
+        else:
+            avg_progress = 0
+        monthly_progress_list.append(
+            MonthlyProgress(
+                month=data["month"],
+                progress=Decimal(str(avg_progress))
+            )
+        )
+
+    return monthly_progress_list
+
+
+def _percentage(part, total) -> Decimal:
+    return (Decimal(part or 0) * 100 / total).quantize(Decimal("0.01")) if total else Decimal("0")
+
+
+async def department_trends(db: AsyncSession, cycle_ids: Iterable[str]) -> dict:
+    """
+    Progress, completion rate and at-risk share of each department in
+    several cycles, from one grouped query.
+
+    Args:
+        db: Database session
+        cycle_ids: Cycles to compare
+
+    Returns:
+        Dict cycle id -> list of DepartmentTrend data (departments with
+        objectives in the cycle, by name)
+    """
+    cycle_ids = list(cycle_ids)
+    trends = {cycle_id: [] for cycle_id in cycle_ids}
+    if not cycle_ids:
+        return trends
+
+    result = await db.execute(
+        select(
+            Objective.cycle_id,
+            Department.id.label("department_id"),
+            Department.name,
+            func.count(Objective.id).label("objectives"),
+            func.avg(Objective.progress).label("progress"),
+            func.sum(case((Objective.status == "completed", 1), else_=0)).label("completed"),
+            func.sum(case((Objective.status == "at-risk", 1), else_=0)).label("at_risk")
+        ).join(
+            User, Objective.owner_id == User.id
+        ).join(
+            Department, User.department_id == Department.id
+        ).where(
+            Objective.cycle_id.in_(cycle_ids), Objective.is_deleted == False
+        ).group_by(
+            Objective.cycle_id, Department.id, Department.name
+        ).order_by(Department.name)
+    )
+    for row in result:
+        trends[row.cycle_id].append({
+            "department_id": row.department_id,
+            "name": row.name,
+            "objectives": row.objectives,
+            "progress": str(Decimal(str(row.progress)).quantize(Decimal("0.01"))),
+            "completion_rate": str(_percentage(row.completed, row.objectives)),
+            "at_risk_share": str(_percentage(row.at_risk, row.objectives)),
+        })
+    return trends
+
+
+async def dashboard_snapshots(db: AsyncSession, cycle: Cycle) -> dict:
+    """Dashboard responses of a cycle, by snapshot kind, as JSON data"""
+    metrics = await dashboard_metrics(db, cycle.id)
+    departments = await department_progress(db, cycle.id)
+    months = await monthly_progress(db, cycle)
+    trends = await department_trends(db, [cycle.id])
+    return {
+        "metrics": metrics.model_dump(mode="json"),
+        "department-progress": [item.model_dump(mode="json") for item in departments],
+        "monthly-progress": [item.model_dump(mode="json") for item in months],
+        "department-trends": trends[cycle.id],
+    }
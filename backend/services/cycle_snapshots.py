@@ -0,0 +1,59 @@
+import json
+from datetime import datetime
+from typing import Iterable
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.models import Cycle, CycleSnapshot
+
+
+def _decode(data):
+    # Stored as CLOB text on Oracle versions without a JSON type
+    return json.loads(data) if isinstance(data, str) else data
+
+
+async def get_cycle_snapshot(db: AsyncSession, cycle_id: str, kind: str):
+    """
+    Frozen data of a closed cycle.
+
+    Args:
+        db: Database session
+        cycle_id: Cycle id
+        kind: Snapshot kind ("metrics", "department-progress", "monthly-progress",
+            "department-trends", "report:<report type>" or "competency-gaps:<grouping>")
+
+    Returns:
+        The JSON data stored when the cycle was closed, or None if there is none
+    """
+    result = await db.execute(
+        select(CycleSnapshot.data).where(CycleSnapshot.cycle_id == cycle_id, CycleSnapshot.kind == kind)
+    )
+    return _decode(result.scalar_one_or_none())
+
+
+async def get_cycle_snapshots(db: AsyncSession, cycle_ids: Iterable[str], kind: str) -> dict:
+    """Snapshots of one kind for several cycles (cycle id -> data), in one query"""
+    result = await db.execute(
+        select(CycleSnapshot.cycle_id, CycleSnapshot.data).where(
+            CycleSnapshot.cycle_id.in_(list(cycle_ids)), CycleSnapshot.kind == kind
+        )
+    )
+    return {cycle_id: _decode(data) for cycle_id, data in result.all()}
+
+
+async def close_cycle(db: AsyncSession, cycle: Cycle, snapshots: dict):
+    """
+    Freeze a cycle: store its snapshots (kind -> JSON data), mark it closed
+    and inactive. Reads of the cycle are served from the snapshots from then
+    on. The caller commits.
+    """
+    closed_at = datetime.utcnow()
+    # Written as JSON text: the Oracle variant of the column is a plain CLOB
+    await db.execute(
+        insert(CycleSnapshot),
+        [
+            {"cycle_id": cycle.id, "kind": kind, "data": json.dumps(data), "created_at": closed_at}
+            for kind, data in snapshots.items()
+        ]
+    )
+    cycle.closed_at = closed_at
+    cycle.is_active = False
@@ -0,0 +1,129 @@
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.models import User, Department
+from services.table_versions import get_table_versions
+
+# Roles of the users offered as managers
+MANAGER_ROLES = ("Líder de Equipo", "Gerente", "Director", "Manager")
+
+# Seconds a worker serves its directory before checking the version counters again
+DIRECTORY_CHECK_INTERVAL_SECONDS = 2
+
+DIRECTORY_TABLES = ("users", "departments")
+
+
+class Directory:
+    """
+    In-memory directory of users and departments, for name lookups, the
+    department and manager lists and the existence checks of create
+    handlers (see ReferenceLoader).
+
+    Users and departments are held column-wise: parallel lists of ids and
+    names, department/manager references as int arrays of positions (-1 for
+    none) and dicts from id to position. The directory is loaded once and
+    reloaded when the change counters of the users or departments tables
+    move; counters are checked at most every check_interval seconds (user
+    writes of this process invalidate it at once). Ids it does not know
+    are looked up in the database before being reported missing, so rows
+    created through another worker are never rejected.
+    """
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._versions: Optional[dict] = None
+        self._checked_at = float("-inf")
+
+        self.department_ids: List[str] = []
+        self.department_names: List[str] = []
+        self.department_positions: Dict[str, int] = {}
+
+        self.user_ids: List[str] = []
+        self.user_names: List[str] = []
+        self.user_roles: List[str] = []
+        self.user_departments = array("i")  # Position in department_ids, -1 if none
+        self.user_managers = array("i")  # Position in user_ids, -1 if none
+        self.user_active = bytearray()
+        self.user_positions: Dict[str, int] = {}
+
+    def invalidate(self):
+        self._versions = None
+        self._checked_at = float("-inf")
+
+    async def refresh(self, db: AsyncSession, check_now: bool = False):
+        """
+        Reload the directory if users or departments changed since it was
+        loaded. check_now reads the counters even within check_interval
+        (for responses whose ETag comes from the same counters).
+        """
+        now = time.monotonic()
+        if not check_now and now - self._checked_at < self.check_interval:
+            return
+        versions = await get_table_versions(db, DIRECTORY_TABLES)
+        if versions != self._versions:
+            await self._load(db)
+            self._versions = versions
+        self._checked_at = now
+
+    async def _load(self, db: AsyncSession):
+        departments_result = await db.execute(select(Department.id, Department.name).order_by(Department.name))
+        departments = departments_result.all()
+        users_result = await db.execute(
+            select(
+                User.id, User.full_name, User.role, User.department_id, User.manager_id, User.is_active
+            ).order_by(User.full_name, User.id)
+        )
+        users = users_result.all()
+
+        department_positions = {row.id: position for position, row in enumerate(departments)}
+        user_positions = {row.id: position for position, row in enumerate(users)}
+
+        # Swapped in without awaiting, so readers never see a half-built directory
+        self.department_ids = [row.id for row in departments]
+        self.department_names = [row.name for row in departments]
+        self.department_positions = department_positions
+        self.user_ids = [row.id for row in users]
+        self.user_names = [row.full_name for row in users]
+        self.user_roles = [row.role for row in users]
+        self.user_departments = array("i", (department_positions.get(row.department_id, -1) for row in users))
+        self.user_managers = array("i", (user_positions.get(row.manager_id, -1) for row in users))
+        self.user_active = bytearray(bool(row.is_active) for row in users)
+        self.user_positions = user_positions
+
+    async def user_name_map(self, db: AsyncSession, user_ids: Iterable[str]) -> Dict[str, str]:
+        """Full names of the given users (unknown ids are left out)"""
+        await self.refresh(db)
+        positions = self.user_positions
+        return {user_id: self.user_names[positions[user_id]] for user_id in user_ids if user_id in positions}
+
+    async def departments(self, db: AsyncSession) -> List[dict]:
+        """All departments, by name"""
+        await self.refresh(db, check_now=True)
+        return [{"id": id_, "name": name} for id_, name in zip(self.department_ids, self.department_names)]
+
+    async def managers(self, db: AsyncSession) -> List[dict]:
+        """Users with a manager role, by name, with their department name"""
+        await self.refresh(db, check_now=True)
+        return [
+            {
+                "id": self.user_ids[position],
+                "name": self.user_names[position],
+                "role": role,
+                "department": (
+                    self.department_names[self.user_departments[position]]
+                    if self.user_departments[position] >= 0 else None
+                )
+            }
+            for position, role in enumerate(self.user_roles)
+            if role in MANAGER_ROLES
+        ]
+
+
+_directory = Directory(DIRECTORY_CHECK_INTERVAL_SECONDS)
+
+
+def get_directory() -> Directory:
+    """Process-wide user and department directory"""
+    return _directory
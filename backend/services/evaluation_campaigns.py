@@ -0,0 +1,213 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+from sqlalchemy import select, insert, exists, literal, case, or_, Integer, Numeric, String, DateTime
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.database import AsyncSessionLocal
+from database.sql_functions import new_uuid
+from models.models import (
+    User, Cycle, Objective, Competency,
+    Evaluation, EvaluationCampaign, EvaluationCompetency, EvaluationObjective
+)
+from services.organization_settings import evaluation_weights
+
+logger = logging.getLogger(__name__)
+
+# People whose evaluations are generated per transaction (and per checkpoint)
+CAMPAIGN_BATCH_USERS = 500
+
+# A running campaign without a heartbeat for this long is considered dead and can be resumed
+CAMPAIGN_STALE_SECONDS = 120
+
+_tasks: Dict[str, asyncio.Task] = {}
+
+
+async def generate_batch(db: AsyncSession, campaign: EvaluationCampaign, cycle: Cycle,
+                         last_user_id: Optional[str], upper_user_id: str, weights: Tuple[Decimal, Decimal]) -> dict:
+    """
+    Create the missing evaluation shells of the active users with
+    last_user_id < id <= upper_user_id, with INSERT ... SELECT statements:
+    one evaluation per person, one evaluation objective per objective they
+    own in the cycle and one evaluation competency per active competency.
+    Rows that already exist are skipped, so a batch can be run again.
+
+    Returns:
+        Dict with the number of evaluations, objectives and competencies created
+    """
+    now = datetime.utcnow()
+
+    def in_batch(user_id_column):
+        filters = [user_id_column <= upper_user_id]
+        if last_user_id is not None:
+            filters.append(user_id_column > last_user_id)
+        return filters
+
+    evaluations = await db.execute(
+        insert(Evaluation).from_select(
+            ["id", "user_id", "cycle_id", "period", "phase", "objectives_weight", "competencies_weight",
+             "created_at", "updated_at"],
+            select(
+                new_uuid(), User.id, literal(cycle.id, String), literal(cycle.name, String),
+                literal(campaign.phase, String), literal(weights[0], Numeric(5, 2)),
+                literal(weights[1], Numeric(5, 2)), literal(now, DateTime), literal(now, DateTime)
+            ).where(
+                User.is_active == True, *in_batch(User.id),
+                ~exists().where(Evaluation.user_id == User.id, Evaluation.cycle_id == cycle.id)
+            )
+        )
+    )
+
+    objectives = await db.execute(
+        insert(EvaluationObjective).from_select(
+            ["id", "evaluation_id", "objective_id", "weight", "target_progress"],
+            select(
+                new_uuid(), Evaluation.id, Objective.id, Objective.weight, Objective.progress
+            ).select_from(Evaluation).join(
+                Objective, (Objective.owner_id == Evaluation.user_id) & (Objective.cycle_id == Evaluation.cycle_id)
+            ).where(
+                Evaluation.cycle_id == cycle.id, *in_batch(Evaluation.user_id), Objective.is_deleted == False,
+                ~exists().where(
+                    EvaluationObjective.evaluation_id == Evaluation.id,
+                    EvaluationObjective.objective_id == Objective.id
+                )
+            )
+        )
+    )
+
+    expected_level = literal(campaign.expected_level, Integer)
+    competencies = await db.execute(
+        insert(EvaluationCompetency).from_select(
+            ["id", "evaluation_id", "competency_id", "expected_level"],
+            select(
+                new_uuid(), Evaluation.id, Competency.id,
+                case((Competency.levels < expected_level, Competency.levels), else_=expected_level)
+            ).select_from(Evaluation).join(
+                Competency, or_(Competency.is_active == True, Competency.is_active.is_(None))
+            ).where(
+                Evaluation.cycle_id == cycle.id, *in_batch(Evaluation.user_id),
+                ~exists().where(
+                    EvaluationCompetency.evaluation_id == Evaluation.id,
+                    EvaluationCompetency.competency_id == Competency.id
+                )
+            )
+        )
+    )
+
+    return {
+        "evaluations": evaluations.rowcount,
+        "objectives": objectives.rowcount,
+        "competencies": competencies.rowcount,
+    }
+
+
+async def run_campaign(campaign_id: str):
+    """
+    Generate the evaluations of a campaign batch by batch, from its
+    checkpoint. Each batch and its checkpoint are committed together, so an
+    interrupted campaign resumes after the last finished batch.
+    """
+    async with AsyncSessionLocal() as db:
+        campaign = await db.get(EvaluationCampaign, campaign_id)
+        cycle = await db.get(Cycle, campaign.cycle_id)
+        cycle_id = cycle.id
+        try:
+            weights = await evaluation_weights(db)
+            while True:
+                query = select(User.id).where(User.is_active == True).order_by(User.id).limit(CAMPAIGN_BATCH_USERS)
+                if campaign.last_user_id is not None:
+                    query = query.where(User.id > campaign.last_user_id)
+                result = await db.execute(query)
+                user_ids = result.scalars().all()
+                if not user_ids:
+                    break
+
+                created = await generate_batch(db, campaign, cycle, campaign.last_user_id, user_ids[-1], weights)
+                campaign.last_user_id = user_ids[-1]
+                campaign.evaluations_created += created["evaluations"]
+                campaign.objectives_created += created["objectives"]
+                campaign.competencies_created += created["competencies"]
+                campaign.heartbeat_at = datetime.utcnow()
+                await db.commit()
+
+            campaign.status = "completed"
+            campaign.finished_at = datetime.utcnow()
+            await db.commit()
+            logger.info(
+                "Evaluation campaign for cycle %s completed: %s evaluations, %s objectives, %s competencies",
+                cycle_id, campaign.evaluations_created, campaign.objectives_created, campaign.competencies_created
+            )
+        except asyncio.CancelledError:
+            # Shutdown: left running, with a stale heartbeat, to be resumed
+            await db.rollback()
+            raise
+        except Exception as exc:
+            logger.exception("Evaluation campaign for cycle %s failed", cycle_id)
+            await db.rollback()
+            campaign.status = "failed"
+            campaign.error = str(exc)
+            await db.commit()
+
+
+def _is_running(campaign: EvaluationCampaign) -> bool:
+    task = _tasks.get(campaign.id)
+    if task and not task.done():
+        return True
+    stale_before = datetime.utcnow() - timedelta(seconds=CAMPAIGN_STALE_SECONDS)
+    # Running in another worker
+    return campaign.status == "running" and campaign.heartbeat_at > stale_before
+
+
+async def launch_campaign(db: AsyncSession, cycle: Cycle, phase: str, expected_level: int) -> EvaluationCampaign:
+    """
+    Start (or resume) the evaluation campaign of a cycle in the background.
+
+    A cycle has one campaign. Launching it again while it runs returns it
+    as is; a failed or interrupted campaign resumes from its checkpoint, and
+    a completed one runs again from the start to add the people, objectives
+    and competencies created since (existing evaluations are kept).
+
+    Args:
+        db: Database session
+        cycle: Cycle whose evaluations are generated
+        phase: Phase of the new evaluations
+        expected_level: Expected level of the new evaluation competencies
+
+    Returns:
+        The campaign
+    """
+    result = await db.execute(select(EvaluationCampaign).where(EvaluationCampaign.cycle_id == cycle.id))
+    campaign = result.scalar_one_or_none()
+    if campaign and _is_running(campaign):
+        return campaign
+
+    now = datetime.utcnow()
+    if campaign is None:
+        campaign = EvaluationCampaign(cycle_id=cycle.id, evaluations_created=0, objectives_created=0,
+                                      competencies_created=0)
+        db.add(campaign)
+    elif campaign.status == "completed":
+        campaign.last_user_id = None
+        campaign.evaluations_created = campaign.objectives_created = campaign.competencies_created = 0
+    campaign.phase = phase
+    campaign.expected_level = expected_level
+    campaign.status = "running"
+    campaign.error = None
+    campaign.started_at = campaign.heartbeat_at = now
+    campaign.finished_at = None
+    await db.commit()
+
+    campaign_id = campaign.id
+    task = asyncio.create_task(run_campaign(campaign_id))
+    _tasks[campaign_id] = task
+    task.add_done_callback(lambda _: _tasks.pop(campaign_id, None))
+    return campaign
+
+
+async def stop_evaluation_campaigns():
+    """Cancel the campaigns running in this process (they resume when launched again)"""
+    tasks = list(_tasks.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
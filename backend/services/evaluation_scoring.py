@@ -0,0 +1,212 @@
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import select, update, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from models.models import Cycle, Department, User, Competency, Evaluation, EvaluationCompetency, EvaluationObjective
+
+# Evaluations written per bulk UPDATE
+SCORING_BATCH_ROWS = 1000
+
+# Percentiles reported by the calibration statistics
+CALIBRATION_PERCENTILES = (10, 25, 50, 75, 90)
+
+# Width of the final score histogram bins (0-10, 10-20, ..., 90-100)
+HISTOGRAM_BIN_WIDTH = 10
+
+_CENT = Decimal("0.01")
+
+
+def _decimal(value) -> Optional[Decimal]:
+    # Aggregates come back as float or Decimal depending on the database
+    return Decimal(str(value)).quantize(_CENT, ROUND_HALF_UP) if value is not None else None
+
+
+def final_score(objectives_score: Optional[Decimal], competencies_percent: Optional[Decimal],
+                weights: Tuple[Decimal, Decimal]) -> Optional[Decimal]:
+    """
+    Weighted final score (0-100). When only one part has scores it is the
+    final score on its own; None when neither has.
+    """
+    parts = [
+        (score, weight) for score, weight in zip((objectives_score, competencies_percent), weights)
+        if score is not None
+    ]
+    total_weight = sum(weight for _, weight in parts)
+    if not parts:
+        return None
+    if not total_weight:
+        return _decimal(sum(score for score, _ in parts) / len(parts))
+    return _decimal(sum(score * weight for score, weight in parts) / total_weight)
+
+
+async def score_evaluations(db: AsyncSession, weights: Tuple[Decimal, Decimal], cycle_id: Optional[str] = None) -> int:
+    """
+    Recompute objectives, competencies and final scores of the evaluations
+    of a cycle (or of every cycle that is not closed) with the given
+    weights, and write the changed ones with bulk UPDATEs. The caller
+    commits.
+
+    - objectives_score: average of the objective scores (leader score, else
+      self score; 0-100) weighted by each objective's weight
+    - competencies_score: average competency score (leader, else self), on
+      the competency scale
+    - final_score: objectives score and competency scores as a percentage of
+      each competency's levels, weighted by weights
+
+    Args:
+        db: Database session
+        weights: Objectives and competencies weights (organization settings)
+        cycle_id: Cycle to score; None scores all open cycles
+
+    Returns:
+        Number of evaluations updated
+    """
+    if cycle_id is not None:
+        in_scope = [Evaluation.cycle_id == cycle_id]
+    else:
+        in_scope = [Evaluation.cycle_id.in_(select(Cycle.id).where(Cycle.closed_at.is_(None)))]
+
+    objective_score = func.coalesce(EvaluationObjective.leader_score, EvaluationObjective.self_score)
+    scored_weight = func.sum(case((objective_score.is_not(None), EvaluationObjective.weight), else_=0))
+    objectives_result = await db.execute(
+        select(
+            EvaluationObjective.evaluation_id,
+            (func.sum(objective_score * EvaluationObjective.weight) / func.nullif(scored_weight, 0)).label("score")
+        ).join(
+            Evaluation, EvaluationObjective.evaluation_id == Evaluation.id
+        ).where(*in_scope).group_by(EvaluationObjective.evaluation_id)
+    )
+    objective_scores = {row.evaluation_id: _decimal(row.score) for row in objectives_result}
+
+    competency_score = func.coalesce(EvaluationCompetency.leader_score, EvaluationCompetency.self_score)
+    competencies_result = await db.execute(
+        select(
+            EvaluationCompetency.evaluation_id,
+            func.avg(competency_score).label("score"),
+            func.avg(competency_score * 100.0 / func.nullif(Competency.levels, 0)).label("percent")
+        ).join(
+            Evaluation, EvaluationCompetency.evaluation_id == Evaluation.id
+        ).join(
+            Competency, EvaluationCompetency.competency_id == Competency.id
+        ).where(*in_scope).group_by(EvaluationCompetency.evaluation_id)
+    )
+    competency_scores = {row.evaluation_id: (_decimal(row.score), _decimal(row.percent)) for row in competencies_result}
+
+    current = await db.execute(
+        select(
+            Evaluation.id, Evaluation.objectives_score, Evaluation.competencies_score, Evaluation.final_score,
+            Evaluation.objectives_weight, Evaluation.competencies_weight
+        ).where(*in_scope)
+    )
+    objectives_weight, competencies_weight = (_decimal(weight) for weight in weights)
+    changes = []
+    for row in current:
+        competencies_score, competencies_percent = competency_scores.get(row.id, (None, None))
+        values = {
+            "objectives_score": objective_scores.get(row.id),
+            "competencies_score": competencies_score,
+            "final_score": final_score(objective_scores.get(row.id), competencies_percent, weights),
+            "objectives_weight": objectives_weight,
+            "competencies_weight": competencies_weight,
+        }
+        if any(_decimal(getattr(row, name)) != value for name, value in values.items()):
+            changes.append({"id": row.id, **values})
+
+    for start in range(0, len(changes), SCORING_BATCH_ROWS):
+        # Bulk UPDATE by primary key: one executemany per batch
+        await db.execute(update(Evaluation), changes[start:start + SCORING_BATCH_ROWS])
+    return len(changes)
+
+
+def _percentile(ordered: List[Decimal], percent: int) -> Decimal:
+    # Linear interpolation between closest ranks
+    position = (len(ordered) - 1) * Decimal(percent) / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return _decimal(ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower))
+
+
+def _mean(values: Iterable[Decimal]) -> Decimal:
+    values = list(values)
+    return _decimal(sum(values) / len(values))
+
+
+def _histogram(values: Iterable[Decimal]) -> List[int]:
+    bins = [0] * (100 // HISTOGRAM_BIN_WIDTH)
+    for value in values:
+        index = int(value // HISTOGRAM_BIN_WIDTH)
+        bins[max(0, min(index, len(bins) - 1))] += 1
+    return bins
+
+
+async def calibration_stats(db: AsyncSession, cycle_id: str) -> dict:
+    """
+    Distribution of the final scores of a cycle per department: mean,
+    percentiles, histogram and, per leader, the mean of their team and its
+    leniency (team mean minus department mean). Evaluations without a final
+    score are left out.
+
+    Returns:
+        CycleCalibration data
+    """
+    Leader = aliased(User)
+    result = await db.execute(
+        select(
+            Evaluation.final_score, User.department_id, Department.name.label("department_name"),
+            User.manager_id, Leader.full_name.label("leader_name")
+        ).join(
+            User, Evaluation.user_id == User.id
+        ).outerjoin(
+            Department, User.department_id == Department.id
+        ).outerjoin(
+            Leader, User.manager_id == Leader.id
+        ).where(Evaluation.cycle_id == cycle_id, Evaluation.final_score.is_not(None))
+    )
+
+    departments = {}
+    for row in result:
+        department = departments.setdefault(row.department_id, {
+            "name": row.department_name, "scores": [], "leaders": defaultdict(list), "leader_names": {}
+        })
+        score = _decimal(row.final_score)
+        department["scores"].append(score)
+        if row.manager_id:
+            department["leaders"][row.manager_id].append(score)
+            department["leader_names"][row.manager_id] = row.leader_name
+
+    items = []
+    for department_id, department in departments.items():
+        scores = sorted(department["scores"])
+        mean = _mean(scores)
+        items.append({
+            "department_id": department_id,
+            "name": department["name"],
+            "evaluations": len(scores),
+            "mean": mean,
+            "percentiles": {f"p{percent}": _percentile(scores, percent) for percent in CALIBRATION_PERCENTILES},
+            "histogram": _histogram(scores),
+            "leaders": sorted(
+                (
+                    {
+                        "leader_id": leader_id,
+                        "name": department["leader_names"][leader_id],
+                        "evaluations": len(team_scores),
+                        "mean": _mean(team_scores),
+                        "leniency": _mean(team_scores) - mean,
+                    }
+                    for leader_id, team_scores in department["leaders"].items()
+                ),
+                key=lambda leader: leader["leniency"], reverse=True
+            ),
+        })
+    items.sort(key=lambda item: item["name"] or "")
+
+    all_scores = [score for department in departments.values() for score in department["scores"]]
+    return {
+        "cycle_id": cycle_id,
+        "evaluations": len(all_scores),
+        "mean": _mean(all_scores) if all_scores else None,
+        "departments": items,
+    }
@@ -0,0 +1,61 @@
+from typing import Iterable, Optional, Type
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import inspect
+
+
+def parse_expand(expand: Optional[str], allowed: Iterable[str]) -> set:
+    """
+    Parse a comma separated expand parameter (e.g. "objective,user")
+
+    Raises:
+        HTTPException: 400 if a value is not in allowed
+    """
+    names = {name.strip() for name in expand.split(",") if name.strip()} if expand else set()
+    unknown = names - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid expand: {', '.join(sorted(unknown))}. Allowed: {', '.join(sorted(allowed))}"
+        )
+    return names
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[set]:
+    """
+    Parse a comma separated fields parameter against the fields of a schema.
+    Returns None when no fields were requested (all fields).
+
+    Raises:
+        HTTPException: 400 if a field does not exist in the schema
+    """
+    if not fields:
+        return None
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = names - set(schema.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Invalid fields: {', '.join(sorted(unknown))}")
+    # Items are always identifiable
+    return names | {"id"}
+
+
+def column_values(obj) -> dict:
+    """Column attributes of an ORM object, without touching its relationships"""
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+
+def dump(schema: Type[BaseModel], obj, fields: Optional[set] = None, exclude: Optional[set] = None) -> dict:
+    """Serialize an ORM object or mapping through a schema, keeping only fields"""
+    return schema.model_validate(obj).model_dump(mode="json", include=fields, exclude=exclude)
+
+
+def shaped_response(items: list, included: Optional[dict] = None, headers: Optional[dict] = None) -> JSONResponse:
+    """
+    Response for lists with expanded references: items refer to related
+    entities by id and each related entity is serialized once in included
+    (e.g. {"objectives": {id: {...}}, "users": {id: {...}}}).
+    """
+    if included is None:
+        return JSONResponse(content=items, headers=headers)
+    return JSONResponse(content={"items": items, "included": included}, headers=headers)
@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+import anyio
+from datetime import date, datetime
+from decimal import Decimal
+from typing import AsyncIterator, List
+from fastapi import Request
+from sqlalchemy import Select
+from database.database import AsyncSessionLocal
+
+# Rows fetched per round trip of the server-side cursor (and per chunk sent)
+EXPORT_CHUNK_ROWS = 500
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _value(value):
+    # Same text the JSON API uses for these types
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _ndjson(rows, columns: List[str]) -> str:
+    return "".join(
+        json.dumps({column: _value(row[column]) for column in columns}, ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+def _csv(rows, columns: List[str]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_value(row[column]) for column in columns] for row in rows)
+    return buffer.getvalue()
+
+
+def _csv_header(columns: List[str]) -> str:
+    buffer = io.StringIO()
+    # BOM so that Excel opens the file as UTF-8
+    buffer.write("\ufeff")
+    csv.writer(buffer).writerow(columns)
+    return buffer.getvalue()
+
+
+async def stream_export(request: Request, query: Select, export_format: str) -> AsyncIterator[bytes]:
+    """
+    Stream the rows of a column query as NDJSON (one object per line) or CSV
+    (with a header row).
+
+    Rows are read through a server-side cursor, EXPORT_CHUNK_ROWS at a time,
+    and each batch is encoded and sent before the next one is fetched, so
+    memory does not grow with the size of the export. The generator uses its
+    own session, since the request's session is closed once the response
+    starts, and stops fetching as soon as the client disconnects.
+
+    Args:
+        request: Request being answered (to detect disconnects)
+        query: Select of labelled columns; the labels are the field names
+        export_format: "ndjson" or "csv"
+
+    Returns:
+        Async iterator of encoded chunks for a StreamingResponse
+    """
+    columns = [column.name for column in query.selected_columns]
+    encode = _csv if export_format == "csv" else _ndjson
+
+    db = AsyncSessionLocal()
+    try:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+        if export_format == "csv":
+            yield _csv_header(columns).encode("utf-8")
+        async for rows in result.mappings().partitions():
+            if await request.is_disconnected():
+                break
+            yield encode(rows, columns).encode("utf-8")
+    finally:
+        # Also runs when the response is cancelled by a disconnect: give the connection back to the pool
+        with anyio.CancelScope(shield=True):
+            await db.close()
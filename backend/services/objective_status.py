@@ -0,0 +1,251 @@
+from datetime import date, datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from models.models import Objective, KeyResult, Cycle
+from services.check_in_cadence import cadence_days_column, check_in_due_date
+
+# Days before the deadline in which an unfinished objective is flagged as at-risk
+DEADLINE_WINDOW_DAYS = 7
+
+# Fraction of the expected (time-based) progress below which an objective is at-risk
+AT_RISK_PACE = 0.7
+
+
+def key_results_progress(key_results) -> float:
+    """Average progress of a list of key results (0 when there are none)"""
+    if not key_results:
+        return 0
+    return sum(kr.progress or 0 for kr in key_results) / len(key_results)
+
+
+def compute_status(progress, kr_progress, start_date: date, end_date: date, current_date: Optional[date] = None) -> str:
+    """
+    Calculate objective status from its raw values
+
+    Args:
+        progress: Objective progress (0-100)
+        kr_progress: Average progress of its key results (0-100)
+        start_date: Objective start date
+        end_date: Objective end date
+        current_date: Reference date (defaults to today)
+
+    Returns:
+        str: Status ("on-track", "at-risk", "delayed", "completed")
+    """
+    current_date = current_date or date.today()
+
+    # If objective is completed, return completed
+    if (progress or 0) >= 100:
+        return "completed"
+
+    # Check if objective hasn't started yet
+    if current_date < start_date:
+        return "on-track"
+
+    # Calculate total duration and elapsed time
+    total_duration = (end_date - start_date).days
+    if total_duration <= 0:
+        total_duration = 1  # Avoid division by zero
+
+    elapsed_days = (current_date - start_date).days
+    time_percentage = min(elapsed_days / total_duration, 1.0)
+
+    # Expected progress based on time
+    expected_progress = time_percentage * 100
+
+    # Use the minimum between objective progress and key results progress
+    actual_progress = min(progress or 0, kr_progress or 0)
+
+    # Determine status based on progress vs expected time
+    days_remaining = (end_date - current_date).days
+
+    if days_remaining < 0:
+        # Objective is past due date
+        return "delayed"
+    elif days_remaining <= DEADLINE_WINDOW_DAYS:
+        # Within 7 days of deadline
+        if actual_progress < 90:
+            return "at-risk"
+    elif actual_progress < (expected_progress * AT_RISK_PACE):
+        # Progress is significantly behind expected time
+        return "at-risk"
+    elif actual_progress < (expected_progress * 0.5):
+        # Progress is critically behind
+        return "delayed"
+
+    return "on-track"
+
+
+def next_status_check(progress, kr_progress, start_date: date, end_date: date, current_date: Optional[date] = None) -> Optional[date]:
+    """
+    Calculate the first date after current_date on which the status of an
+    objective can change without any write to it (the time thresholds used
+    by compute_status). Returns None when only a write can change it.
+    """
+    current_date = current_date or date.today()
+
+    if (progress or 0) >= 100:
+        return None
+    if current_date < start_date:
+        return start_date
+
+    days_remaining = (end_date - current_date).days
+    if days_remaining < 0:
+        return None
+    if days_remaining <= DEADLINE_WINDOW_DAYS:
+        # Becomes delayed the day after the deadline
+        return end_date + timedelta(days=1)
+
+    # Entering the deadline window
+    candidates = [end_date - timedelta(days=DEADLINE_WINDOW_DAYS)]
+
+    # Falling behind the expected pace
+    total_duration = max((end_date - start_date).days, 1)
+    actual_progress = float(min(progress or 0, kr_progress or 0))
+    pace_days = int(actual_progress * total_duration / (100 * AT_RISK_PACE)) + 1
+    pace_date = start_date + timedelta(days=pace_days)
+    if pace_date > current_date:
+        candidates.append(pace_date)
+
+    return min(candidates)
+
+
+def calculate_objective_status(objective: Objective, current_date: Optional[date] = None) -> str:
+    """
+    Calculate automatic objective status based on progress and time
+
+    Args:
+        objective: Objective instance with its key results
+        current_date: Reference date (defaults to today)
+
+    Returns:
+        str: Status ("on-track", "at-risk", "delayed", "completed")
+    """
+    return compute_status(
+        objective.progress,
+        key_results_progress(objective.key_results),
+        objective.start_date,
+        objective.end_date,
+        current_date
+    )
+
+
+def refresh_objective_status(objective: Objective, current_date: Optional[date] = None) -> bool:
+    """
+    Recalculate status and next check date of a loaded objective (with its
+    key results) and clear its dirty flag. A status change increments the
+    objective's version (in the UPDATE, so the attribute is expired after
+    the flush and must be refreshed before it is read).
+
+    Returns:
+        bool: True if the status changed
+    """
+    kr_progress = key_results_progress(objective.key_results)
+    new_status = compute_status(objective.progress, kr_progress, objective.start_date, objective.end_date, current_date)
+    objective.next_status_check = next_status_check(
+        objective.progress, kr_progress, objective.start_date, objective.end_date, current_date
+    )
+    objective.status_dirty = False
+
+    if objective.status != new_status:
+        objective.status = new_status
+        objective.updated_at = datetime.utcnow()
+        objective.version = Objective.version + 1
+        return True
+    return False
+
+
+async def load_status_inputs(db: AsyncSession, objective_ids) -> dict:
+    """
+    Load, in a single query, the values compute_status needs for several
+    objectives (dates and average key result progress) and their check-in
+    cadence. Deleted objectives are left out, so a missing id means the
+    objective does not exist.
+
+    Returns:
+        dict: objective_id -> row with start_date, end_date, kr_progress, cadence_days
+    """
+    kr_progress = select(
+        KeyResult.objective_id,
+        func.avg(func.coalesce(KeyResult.progress, 0)).label("kr_progress")
+    ).group_by(KeyResult.objective_id).subquery()
+
+    query = select(
+        Objective.id,
+        Objective.start_date,
+        Objective.end_date,
+        func.coalesce(kr_progress.c.kr_progress, 0).label("kr_progress"),
+        cadence_days_column().label("cadence_days")
+    ).outerjoin(
+        kr_progress, kr_progress.c.objective_id == Objective.id
+    ).outerjoin(
+        Cycle, Objective.cycle_id == Cycle.id
+    ).where(
+        Objective.id.in_(set(objective_ids)),
+        Objective.is_deleted == False
+    )
+    result = await db.execute(query)
+    return {row.id: row for row in result.all()}
+
+
+def progress_update_values(progress, inputs, current_date: Optional[date] = None) -> dict:
+    """
+    Column values for setting a new progress on an objective (a check-in
+    made on current_date), with its status, next check date and next
+    check-in due date recalculated from the loaded inputs.
+    """
+    current_date = current_date or date.today()
+    return {
+        "progress": progress,
+        "status": compute_status(progress, inputs.kr_progress, inputs.start_date, inputs.end_date, current_date),
+        "next_status_check": next_status_check(progress, inputs.kr_progress, inputs.start_date, inputs.end_date, current_date),
+        "status_dirty": False,
+        "next_check_in_due": check_in_due_date(current_date, inputs.cadence_days, progress),
+        "updated_at": datetime.utcnow(),
+    }
+
+
+async def recompute_pending_statuses(db: AsyncSession, current_date: Optional[date] = None, batch_size: int = 500) -> dict:
+    """
+    Recalculate status only for objectives that can have changed: those
+    marked dirty by key result or check-in writes and those whose
+    next_status_check date has been reached.
+
+    Args:
+        db: Database session
+        current_date: Reference date (defaults to today)
+        batch_size: Objectives loaded and committed per batch
+
+    Returns:
+        dict: Number of objectives checked and updated
+    """
+    current_date = current_date or date.today()
+    checked_count = 0
+    updated_count = 0
+
+    while True:
+        query = select(Objective).options(
+            selectinload(Objective.key_results)
+        ).where(
+            Objective.is_deleted == False,
+            or_(
+                Objective.status_dirty == True,
+                Objective.next_status_check <= current_date
+            )
+        ).limit(batch_size)
+        result = await db.execute(query)
+        objectives = result.scalars().all()
+        if not objectives:
+            break
+
+        for objective in objectives:
+            if refresh_objective_status(objective, current_date):
+                updated_count += 1
+        checked_count += len(objectives)
+
+        # Processed rows drop out of the selection, so the next batch starts fresh
+        await db.commit()
+
+    return {"checked_count": checked_count, "updated_count": updated_count}
@@ -0,0 +1,91 @@
+import json
+import time
+from decimal import Decimal
+from typing import Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.models import Organization
+from services.table_versions import get_table_versions
+
+DEFAULT_SETTINGS = {
+    "evaluation_scale_objectives": "1-5",
+    "evaluation_scale_competencies": "1-5",
+    "weight_objectives": 70,
+    "weight_competencies": 30
+}
+
+# Seconds a worker serves its cached settings before checking the version counter again
+SETTINGS_CHECK_INTERVAL_SECONDS = 2
+
+
+def parse_settings(settings) -> dict:
+    """Settings JSON of an organization as a dict (stored as text on Oracle)"""
+    if isinstance(settings, str):
+        return json.loads(settings) if settings else {}
+    return settings or {}
+
+
+class SettingsCache:
+    """
+    In-process copy of the organization settings. Reads within
+    check_interval seconds of the last check do not touch the database;
+    after that the change counter of the organizations table is read (one
+    primary key lookup) and the settings are reloaded only if it moved, so
+    writes made through other workers are seen within check_interval.
+    The settings handlers of this process invalidate it on write.
+    """
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._version: Optional[int] = None
+        self._settings: Optional[dict] = None
+        self._exists = False
+        self._checked_at = float("-inf")
+
+    def invalidate(self):
+        self._version = None
+        self._checked_at = float("-inf")
+
+    async def get(self, db: AsyncSession, check_now: bool = False) -> Optional[dict]:
+        """
+        Organization settings, with defaults for missing keys
+
+        Args:
+            db: Database session
+            check_now: Read the counter even within check_interval (for
+                responses whose ETag comes from the same counter)
+
+        Returns:
+            Settings dict (a copy), or None when there is no organization yet
+        """
+        now = time.monotonic()
+        if check_now or now - self._checked_at >= self.check_interval:
+            versions = await get_table_versions(db, ["organizations"])
+            version = versions["organizations"]
+            if version != self._version:
+                result = await db.execute(select(Organization.settings).limit(1))
+                row = result.first()
+                self._exists = row is not None
+                self._settings = {**DEFAULT_SETTINGS, **parse_settings(row[0] if row else None)}
+                self._version = version
+            self._checked_at = now
+        return dict(self._settings) if self._exists else None
+
+
+_cache = SettingsCache(SETTINGS_CHECK_INTERVAL_SECONDS)
+
+
+def get_settings_cache() -> SettingsCache:
+    """Process-wide organization settings cache"""
+    return _cache
+
+
+async def get_organization_settings(db: AsyncSession) -> dict:
+    """Organization settings (defaults when there is no organization), from the cache"""
+    return await _cache.get(db) or dict(DEFAULT_SETTINGS)
+
+
+async def evaluation_weights(db: AsyncSession) -> Tuple[Decimal, Decimal]:
+    """Objectives and competencies weights from the organization settings"""
+    settings = await get_organization_settings(db)
+    return Decimal(str(settings["weight_objectives"])), Decimal(str(settings["weight_competencies"]))
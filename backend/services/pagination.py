@@ -0,0 +1,39 @@
+import base64
+from datetime import datetime
+from typing import Tuple
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """Opaque keyset cursor pointing after the row with the given sort key"""
+    key = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(key.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Sort key (created_at, id) of a cursor made by encode_cursor
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        key = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, row_id = key.split("|", 1)
+        return datetime.fromisoformat(created_at), row_id
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def after_cursor(created_at_column, id_column, cursor: str):
+    """
+    Filter for the rows after a cursor in newest-first order
+    (created_at desc, id desc). Written without row-value comparison,
+    which Oracle does not support, so the created_at index is still used.
+    """
+    created_at, row_id = decode_cursor(cursor)
+    return or_(
+        created_at_column < created_at,
+        and_(created_at_column == created_at, id_column < row_id)
+    )
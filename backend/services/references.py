@@ -0,0 +1,97 @@
+from typing import Dict, Iterable, Optional, Tuple
+from fastapi import Depends, HTTPException
+from sqlalchemy import select, literal, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.database import get_db
+from models.models import User, Department
+from services.directory import get_directory
+
+
+class ReferenceLoader:
+    """
+    Request-scoped batch of foreign key existence checks. Handlers register
+    every id they reference with add() and then call check() once: ids of
+    users and departments already in the directory are resolved in memory,
+    and all the others, of every table, are looked up together in a single
+    UNION ALL of one IN (...) select per table.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._references: Dict[type, Tuple[str, set]] = {}
+
+    def add(self, model, ids: Iterable[Optional[str]], name: str):
+        """
+        Register ids that must exist in the table of model
+
+        Args:
+            model: Referenced model (its id column is looked up)
+            ids: Referenced ids (None values are ignored)
+            name: Name used in the 404 detail, e.g. "Cycle"
+        """
+        _, pending = self._references.setdefault(model, (name, set()))
+        pending.update(id_ for id_ in ids if id_ is not None)
+
+    async def missing(self) -> Dict[type, set]:
+        """
+        Resolve the registered ids (and forget them)
+
+        Returns:
+            Ids that do not exist, by model (models with none missing are left out)
+        """
+        references, self._references = self._references, {}
+        pending = {model: set(ids) for model, (_, ids) in references.items() if ids}
+        if not pending:
+            return {}
+
+        if User in pending or Department in pending:
+            directory = get_directory()
+            await directory.refresh(self.db)
+            for model, known in ((User, directory.user_positions), (Department, directory.department_positions)):
+                if model in pending:
+                    pending[model] -= known.keys()
+            pending = {model: ids for model, ids in pending.items() if ids}
+            if not pending:
+                return {}
+
+        selects = [
+            select(literal(model.__tablename__).label("table_name"), model.id.label("id")).where(model.id.in_(ids))
+            for model, ids in pending.items()
+        ]
+        result = await self.db.execute(selects[0] if len(selects) == 1 else union_all(*selects))
+        found: Dict[str, set] = {}
+        for table_name, id_ in result.all():
+            found.setdefault(table_name, set()).add(id_)
+
+        if found.keys() & {User.__tablename__, Department.__tablename__}:
+            # Created through another worker since the directory was loaded
+            get_directory().invalidate()
+
+        missing = {}
+        for model, ids in pending.items():
+            not_found = ids - found.get(model.__tablename__, set())
+            if not_found:
+                missing[model] = not_found
+        return missing
+
+    async def check(self, list_ids: bool = False):
+        """
+        Resolve the registered ids, raising 404 for the first table (in the
+        order tables were added) with ids that do not exist
+
+        Args:
+            list_ids: Name the missing ids in the detail (for batch requests)
+        """
+        names = {model: name for model, (name, _) in self._references.items()}
+        missing = await self.missing()
+        for model, name in names.items():
+            if model in missing:
+                detail = f"{name} not found"
+                if list_ids:
+                    detail += f": {', '.join(sorted(missing[model]))}"
+                raise HTTPException(status_code=404, detail=detail)
+
+
+def get_reference_loader(db: AsyncSession = Depends(get_db)) -> ReferenceLoader:
+    """Reference loader of the request, sharing its database session"""
+    return ReferenceLoader(db)
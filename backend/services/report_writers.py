@@ -0,0 +1,327 @@
+import io
+import re
+import zipfile
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List
+from xml.sax.saxutils import escape
+
+
+def render_report(report_format: str, document: dict) -> bytes:
+    """
+    Render a report document as an XLSX or PDF file, with the standard
+    library only. Plain function of plain data, so it can run in a worker
+    process.
+
+    Args:
+        report_format: "xlsx" or "pdf"
+        document: {"title": str, "subtitle": str, "sheets": [{"name": str,
+            "columns": [str], "rows": [[value]]}]} with str, int, float,
+            Decimal, date or None values
+
+    Returns:
+        File contents
+    """
+    if report_format == "xlsx":
+        return write_xlsx(document)
+    if report_format == "pdf":
+        return write_pdf(document)
+    raise ValueError(f"Unsupported report format: {report_format}")
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+
+# --- XLSX (SpreadsheetML in a zip) ---
+
+# Characters not allowed in XML 1.0
+_XML_INVALID = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '{sheets}'
+    '</Types>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+# Style 0: default, 1: bold (headers), 2: number with two decimals
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '<xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '</styleSheet>'
+)
+
+
+def _column_letter(index: int) -> str:
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _xml_text(value: str) -> str:
+    return escape(_XML_INVALID.sub("", value))
+
+
+def _cell(reference: str, value, style: int = 0) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        value = "Sí" if value else "No"
+    if isinstance(value, int):
+        return f'<c r="{reference}"><v>{value}</v></c>'
+    if isinstance(value, (float, Decimal)):
+        return f'<c r="{reference}" s="2"><v>{value}</v></c>'
+    style_attribute = f' s="{style}"' if style else ""
+    return f'<c r="{reference}" t="inlineStr"{style_attribute}><is><t xml:space="preserve">{_xml_text(_text(value))}</t></is></c>'
+
+
+def _worksheet(sheet: dict) -> str:
+    columns = sheet["columns"]
+    rows = [columns] + [list(row) for row in sheet["rows"]]
+    widths = [
+        min(max(len(_text(row[index])) for row in rows) + 2, 60)
+        for index in range(len(columns))
+    ]
+
+    xml = ['<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+           '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+           '<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>'
+           '<cols>']
+    xml += [f'<col min="{index + 1}" max="{index + 1}" width="{width}" customWidth="1"/>' for index, width in enumerate(widths)]
+    xml.append('</cols><sheetData>')
+    for row_number, row in enumerate(rows, start=1):
+        style = 1 if row_number == 1 else 0
+        cells = "".join(
+            _cell(f"{_column_letter(index)}{row_number}", value, style) for index, value in enumerate(row)
+        )
+        xml.append(f'<row r="{row_number}">{cells}</row>')
+    xml.append('</sheetData></worksheet>')
+    return "".join(xml)
+
+
+def _sheet_name(name: str, used: set) -> str:
+    # Excel: at most 31 characters, none of []:*?/\ and unique in the workbook
+    base = re.sub(r"[\[\]:*?/\\]", " ", name).strip()[:31] or "Hoja"
+    candidate, suffix = base, 2
+    while candidate.lower() in used:
+        candidate = f"{base[:28]} {suffix}"
+        suffix += 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def write_xlsx(document: dict) -> bytes:
+    """XLSX workbook with one worksheet per sheet of the document"""
+    sheets = document["sheets"]
+    used_names = set()
+    names = [_sheet_name(sheet["name"], used_names) for sheet in sheets]
+
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as workbook:
+        workbook.writestr("[Content_Types].xml", _CONTENT_TYPES.format(sheets="".join(
+            f'<Override PartName="/xl/worksheets/sheet{index}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for index in range(1, len(sheets) + 1)
+        )))
+        workbook.writestr("_rels/.rels", _ROOT_RELS)
+        workbook.writestr("xl/styles.xml", _STYLES)
+        workbook.writestr("xl/workbook.xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>'
+            + "".join(
+                f'<sheet name="{escape(name, {chr(34): "&quot;"})}" sheetId="{index}" r:id="rId{index}"/>'
+                for index, name in enumerate(names, start=1)
+            )
+            + '</sheets></workbook>'
+        ))
+        workbook.writestr("xl/_rels/workbook.xml.rels", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + "".join(
+                f'<Relationship Id="rId{index}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                f'Target="worksheets/sheet{index}.xml"/>'
+                for index in range(1, len(sheets) + 1)
+            )
+            + f'<Relationship Id="rId{len(sheets) + 1}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+            + '</Relationships>'
+        ))
+        for index, sheet in enumerate(sheets, start=1):
+            workbook.writestr(f"xl/worksheets/sheet{index}.xml", _worksheet(sheet))
+    return output.getvalue()
+
+
+# --- PDF (A4 landscape, built-in Helvetica fonts) ---
+
+PAGE_WIDTH, PAGE_HEIGHT = 842, 595
+MARGIN = 36
+FONT_SIZE = 8
+ROW_HEIGHT = 13
+# Average Helvetica glyph width as a fraction of the font size (for column layout)
+CHAR_WIDTH = 0.52
+
+
+def _pdf_string(value: str) -> str:
+    # Base fonts with WinAnsiEncoding cover the Spanish characters (cp1252)
+    encoded = value.encode("cp1252", errors="replace").decode("latin-1")
+    return "(" + encoded.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def _fit(value: str, width: float, font_size: float) -> str:
+    max_chars = max(int(width / (font_size * CHAR_WIDTH)), 1)
+    value = " ".join(value.split())
+    return value if len(value) <= max_chars else value[:max_chars - 1] + "…"
+
+
+class _PdfPages:
+    """Lays out text lines and tables over as many pages as needed"""
+
+    def __init__(self, title: str):
+        self.title = title
+        self.pages: List[List[str]] = []
+        self.y = 0
+        self._new_page()
+
+    def _new_page(self):
+        self.pages.append([])
+        self.y = PAGE_HEIGHT - MARGIN
+        self.text(MARGIN, self.title, size=9, bold=True)
+        self.y -= 6
+
+    def _ensure(self, height: float):
+        if self.y - height < MARGIN + 12:
+            self._new_page()
+
+    def text(self, x: float, value: str, size: float = FONT_SIZE, bold: bool = False, advance: float = None):
+        font = "F2" if bold else "F1"
+        self.pages[-1].append(f"BT /{font} {size} Tf {x:.1f} {self.y - size:.1f} Td {_pdf_string(value)} Tj ET")
+        self.y -= advance if advance is not None else size + 6
+
+    def heading(self, value: str, size: float = 12):
+        self._ensure(size + 2 * ROW_HEIGHT)
+        self.y -= 4
+        self.text(MARGIN, value, size=size, bold=True)
+
+    def table(self, columns: List[str], rows: List[list]):
+        texts = [[_text(value) for value in row] for row in rows]
+        # Column widths proportional to their longest text (capped), filling the page width
+        weights = [
+            min(max([len(columns[index])] + [len(row[index]) for row in texts]), 40) + 2
+            for index in range(len(columns))
+        ]
+        available = PAGE_WIDTH - 2 * MARGIN
+        widths = [available * weight / sum(weights) for weight in weights]
+        numeric = [
+            all(isinstance(row[index], (int, float, Decimal)) or row[index] is None for row in rows) and bool(rows)
+            for index in range(len(columns))
+        ]
+
+        def line(values: List[str], bold: bool):
+            x = MARGIN
+            for index, value in enumerate(values):
+                cell = _fit(value, widths[index] - 4, FONT_SIZE)
+                offset = widths[index] - 4 - len(cell) * FONT_SIZE * CHAR_WIDTH if numeric[index] and not bold else 0
+                self.pages[-1].append(
+                    f"BT /{'F2' if bold else 'F1'} {FONT_SIZE} Tf {x + max(offset, 0):.1f} {self.y - FONT_SIZE:.1f} Td "
+                    f"{_pdf_string(cell)} Tj ET"
+                )
+                x += widths[index]
+            self.y -= ROW_HEIGHT
+
+        def header():
+            line(columns, bold=True)
+            self.pages[-1].append(
+                f"0.6 G 0.5 w {MARGIN} {self.y + 3:.1f} m {PAGE_WIDTH - MARGIN} {self.y + 3:.1f} l S 0 G"
+            )
+
+        self._ensure(2 * ROW_HEIGHT)
+        header()
+        for row in texts:
+            if self.y - ROW_HEIGHT < MARGIN + 12:
+                self._new_page()
+                header()
+            line(row, bold=False)
+        if not rows:
+            self.text(MARGIN, "Sin datos", advance=ROW_HEIGHT)
+        self.y -= ROW_HEIGHT
+
+
+def write_pdf(document: dict) -> bytes:
+    """PDF with the document title and one table per sheet, paginated"""
+    layout = _PdfPages(document["title"])
+    if document.get("subtitle"):
+        layout.text(MARGIN, document["subtitle"], size=10)
+    for sheet in document["sheets"]:
+        layout.heading(sheet["name"])
+        layout.table(sheet["columns"], sheet["rows"])
+
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Page tree, once the page object numbers are known
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    ]
+    page_numbers = []
+    total_pages = len(layout.pages)
+    for number, commands in enumerate(layout.pages, start=1):
+        commands = commands + [
+            f"BT /F1 7 Tf {PAGE_WIDTH - MARGIN - 40} {MARGIN - 14} Td {_pdf_string(f'{number} / {total_pages}')} Tj ET"
+        ]
+        stream = zlib.compress("\n".join(commands).encode("latin-1"))
+        objects.append((f"<< /Length {len(stream)} /Filter /FlateDecode >>", stream))
+        content_number = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {content_number} 0 R >>"
+        )
+        page_numbers.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{n} 0 R' for n in page_numbers)}] /Count {len(page_numbers)} >>"
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        if isinstance(obj, tuple):
+            dictionary, stream = obj
+            output.write(f"{number} 0 obj\n{dictionary}\nstream\n".encode("latin-1"))
+            output.write(stream)
+            output.write(b"\nendstream\nendobj\n")
+        else:
+            output.write(f"{number} 0 obj\n{obj}\nendobj\n".encode("latin-1"))
+    xref = output.tell()
+    output.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1"))
+    for offset in offsets:
+        output.write(f"{offset:010d} 00000 n \n".encode("latin-1"))
+    output.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1"))
+    return output.getvalue()
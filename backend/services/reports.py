@@ -0,0 +1,361 @@
+import asyncio
+import glob
+import hashlib
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Optional
+from fastapi import HTTPException
+from sqlalchemy import select, func, case, distinct
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.database import AsyncSessionLocal
+from models.models import Cycle, Department, User, Objective, CheckIn
+from services.cycle_snapshots import get_cycle_snapshot
+from services.report_writers import render_report
+from services.table_versions import get_table_versions
+
+logger = logging.getLogger(__name__)
+
+REPORT_FORMATS = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+}
+
+# Tables every report reads (their change counters are the data version)
+REPORT_TABLES = ("cycles", "departments", "users", "objectives", "check_ins")
+
+STATUS_LABELS = {"on-track": "En línea", "at-risk": "En riesgo", "delayed": "Retrasado", "completed": "Completado"}
+
+
+def _decimal(value) -> Optional[Decimal]:
+    # AVG returns float or Decimal depending on the database
+    return Decimal(str(value)).quantize(Decimal("0.01")) if value is not None else None
+
+
+def _status_counts():
+    return [
+        func.sum(case((Objective.status == status, 1), else_=0)).label(status.replace("-", "_"))
+        for status in ("completed", "on-track", "at-risk", "delayed")
+    ]
+
+
+async def _check_in_counts(db: AsyncSession, cycle_id: str, group_column) -> dict:
+    result = await db.execute(
+        select(group_column, func.count(CheckIn.id)).join(
+            Objective, CheckIn.objective_id == Objective.id
+        ).join(
+            User, CheckIn.user_id == User.id
+        ).where(
+            Objective.cycle_id == cycle_id, Objective.is_deleted == False
+        ).group_by(group_column)
+    )
+    return dict(result.all())
+
+
+async def department_performance(db: AsyncSession, cycle: Cycle) -> dict:
+    """Report document comparing departments, and people, in a cycle"""
+    objective_join = (Objective.owner_id == User.id) & (Objective.cycle_id == cycle.id) & (Objective.is_deleted == False)
+
+    departments = await db.execute(
+        select(
+            Department.id, Department.name,
+            func.count(distinct(User.id)).label("people"),
+            func.count(Objective.id).label("objectives"),
+            func.avg(Objective.progress).label("avg_progress"),
+            *_status_counts()
+        ).join(
+            User, User.department_id == Department.id
+        ).outerjoin(
+            Objective, objective_join
+        ).group_by(Department.id, Department.name).order_by(Department.name)
+    )
+    department_check_ins = await _check_in_counts(db, cycle.id, User.department_id)
+
+    people = await db.execute(
+        select(
+            User.id, User.full_name, Department.name.label("department_name"),
+            func.count(Objective.id).label("objectives"),
+            func.avg(Objective.progress).label("avg_progress"),
+            *_status_counts()
+        ).outerjoin(
+            Department, User.department_id == Department.id
+        ).join(
+            Objective, objective_join
+        ).group_by(User.id, User.full_name, Department.name).order_by(Department.name, User.full_name)
+    )
+    user_check_ins = await _check_in_counts(db, cycle.id, User.id)
+
+    return {
+        "title": f"Desempeño por equipo — {cycle.name}",
+        "subtitle": f"Ciclo {cycle.start_date.isoformat()} a {cycle.end_date.isoformat()}",
+        "sheets": [
+            {
+                "name": "Departamentos",
+                "columns": ["Departamento", "Personas", "Objetivos", "Progreso promedio", "Completados",
+                            "En riesgo", "Retrasados", "Check-ins"],
+                "rows": [
+                    [row.name, row.people, row.objectives, _decimal(row.avg_progress), row.completed or 0,
+                     row.at_risk or 0, row.delayed or 0, department_check_ins.get(row.id, 0)]
+                    for row in departments
+                ],
+            },
+            {
+                "name": "Personas",
+                "columns": ["Persona", "Departamento", "Objetivos", "Progreso promedio", "Completados",
+                            "En riesgo", "Retrasados", "Check-ins"],
+                "rows": [
+                    [row.full_name, row.department_name, row.objectives, _decimal(row.avg_progress),
+                     row.completed or 0, row.at_risk or 0, row.delayed or 0, user_check_ins.get(row.id, 0)]
+                    for row in people
+                ],
+            },
+        ],
+    }
+
+
+async def cycle_summary(db: AsyncSession, cycle: Cycle) -> dict:
+    """Report document with the totals of a cycle, by objective type, and its objectives"""
+    in_cycle = (Objective.cycle_id == cycle.id, Objective.is_deleted == False)
+
+    totals_result = await db.execute(
+        select(
+            func.count(Objective.id).label("objectives"),
+            func.avg(Objective.progress).label("avg_progress"),
+            *_status_counts()
+        ).where(*in_cycle)
+    )
+    totals = totals_result.one()
+    check_ins_result = await db.execute(
+        select(func.count(CheckIn.id)).join(Objective, CheckIn.objective_id == Objective.id).where(*in_cycle)
+    )
+
+    by_type = await db.execute(
+        select(
+            Objective.type,
+            func.count(Objective.id).label("objectives"),
+            func.avg(Objective.progress).label("avg_progress"),
+            *_status_counts()
+        ).where(*in_cycle).group_by(Objective.type).order_by(Objective.type)
+    )
+
+    objectives = await db.execute(
+        select(
+            Objective.title, User.full_name, Department.name.label("department_name"), Objective.type,
+            Objective.status, Objective.progress, Objective.end_date
+        ).join(
+            User, Objective.owner_id == User.id
+        ).outerjoin(
+            Department, User.department_id == Department.id
+        ).where(*in_cycle).order_by(Department.name, User.full_name, Objective.title)
+    )
+
+    return {
+        "title": f"Resumen del ciclo — {cycle.name}",
+        "subtitle": f"Ciclo {cycle.start_date.isoformat()} a {cycle.end_date.isoformat()}",
+        "sheets": [
+            {
+                "name": "Resumen",
+                "columns": ["Indicador", "Valor"],
+                "rows": [
+                    ["Objetivos", totals.objectives],
+                    ["Progreso promedio", _decimal(totals.avg_progress)],
+                    ["Completados", totals.completed or 0],
+                    ["En línea", totals.on_track or 0],
+                    ["En riesgo", totals.at_risk or 0],
+                    ["Retrasados", totals.delayed or 0],
+                    ["Check-ins", check_ins_result.scalar_one()],
+                ],
+            },
+            {
+                "name": "Por tipo",
+                "columns": ["Tipo", "Objetivos", "Progreso promedio", "Completados", "En riesgo", "Retrasados"],
+                "rows": [
+                    [row.type, row.objectives, _decimal(row.avg_progress), row.completed or 0,
+                     row.at_risk or 0, row.delayed or 0]
+                    for row in by_type
+                ],
+            },
+            {
+                "name": "Objetivos",
+                "columns": ["Objetivo", "Responsable", "Departamento", "Tipo", "Estado", "Progreso", "Fecha fin"],
+                "rows": [
+                    [row.title, row.full_name, row.department_name, row.type,
+                     STATUS_LABELS.get(row.status, row.status), _decimal(row.progress), row.end_date]
+                    for row in objectives
+                ],
+            },
+        ],
+    }
+
+
+REPORT_TYPES = {
+    "department-performance": department_performance,
+    "cycle-summary": cycle_summary,
+}
+
+
+def _json_value(value):
+    # Numbers stay numbers (spreadsheet cells), dates become ISO text
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+async def report_snapshots(db: AsyncSession, cycle: Cycle) -> dict:
+    """Documents of every report type for a cycle, by snapshot kind, as JSON data"""
+    snapshots = {}
+    for report_type, build in REPORT_TYPES.items():
+        document = await build(db, cycle)
+        for sheet in document["sheets"]:
+            sheet["rows"] = [[_json_value(value) for value in row] for row in sheet["rows"]]
+        snapshots[f"report:{report_type}"] = document
+    return snapshots
+
+
+class ReportRenderer:
+    """
+    Renders reports in a process pool and caches the files on local disk,
+    keyed by report type, cycle, format and data version (the change
+    counters of the tables reports read). A cached file is served until one
+    of those tables changes. Each file's modification time is set to when
+    its data was read, and a new file removes only those of older data (a
+    slow rendering of old data must not remove a newer file being served).
+
+    Data is gathered with aggregate queries on the event loop (or read from
+    the snapshot of a closed cycle, whose files never expire); only the
+    CPU-bound XLSX/PDF rendering runs in the worker processes. Concurrent
+    requests for the same report share one rendering.
+    """
+
+    def __init__(self, cache_dir: str, workers: int):
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    def start(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._pool = self._new_pool()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn: forking a process that runs an event loop and database threads is unsafe
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def stop(self):
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def data_version(self, db: AsyncSession, cycle: Cycle) -> str:
+        if cycle.closed_at:
+            return "closed-" + cycle.closed_at.strftime("%Y%m%d%H%M%S")
+        versions = await get_table_versions(db, REPORT_TABLES)
+        key = "|".join(f"{name}={versions[name]}" for name in sorted(versions))
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+    async def get(self, db: AsyncSession, report_type: str, cycle: Cycle, report_format: str) -> str:
+        """
+        Path of the rendered report, from the cache when it is up to date.
+
+        Args:
+            db: Session used to read the data version
+            report_type: Key of REPORT_TYPES
+            cycle: Cycle the report is about
+            report_format: Key of REPORT_FORMATS
+
+        Returns:
+            Path of the cached file
+        """
+        version = await self.data_version(db, cycle)
+        path = os.path.join(self.cache_dir, f"{report_type}-{cycle.id}-{version}.{report_format}")
+        if os.path.exists(path):
+            return path
+
+        future = self._in_flight.get(path)
+        if future is None:
+            future = asyncio.ensure_future(self._render(report_type, cycle, report_format, path))
+            self._in_flight[path] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(path, None))
+        # Shielded: a cancelled request must not cancel the rendering others wait for
+        return await asyncio.shield(future)
+
+    async def _render(self, report_type: str, cycle: Cycle, report_format: str, path: str) -> str:
+        started = datetime.utcnow()
+        data_read_at = time.time()
+        async with AsyncSessionLocal() as db:
+            document = None
+            if cycle.closed_at:
+                document = await get_cycle_snapshot(db, cycle.id, f"report:{report_type}")
+            if document is None:
+                document = await REPORT_TYPES[report_type](db, cycle)
+
+        content = await self._render_in_pool(report_format, document)
+
+        # Atomic replace, so readers never see a partial file
+        temporary_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temporary_path, "wb") as report_file:
+            report_file.write(content)
+        os.utime(temporary_path, (data_read_at, data_read_at))
+        os.replace(temporary_path, path)
+
+        prefix = os.path.join(self.cache_dir, f"{report_type}-{cycle.id}-")
+        for stale_path in glob.glob(f"{glob.escape(prefix)}*.{report_format}"):
+            try:
+                if stale_path != path and os.path.getmtime(stale_path) < data_read_at:
+                    os.remove(stale_path)
+            except OSError:
+                pass
+
+        logger.info(
+            "Rendered %s report for cycle %s as %s (%s bytes) in %.2fs",
+            report_type, cycle.id, report_format, len(content), (datetime.utcnow() - started).total_seconds()
+        )
+        return path
+
+
+    async def _render_in_pool(self, report_format: str, document: dict) -> bytes:
+        """
+        Raises:
+            HTTPException: 503 if the workers keep dying (the pool was replaced and failed again)
+        """
+        loop = asyncio.get_running_loop()
+        for _ in range(2):
+            pool = self._pool
+            try:
+                return await loop.run_in_executor(pool, render_report, report_format, document)
+            except BrokenProcessPool:
+                # A worker died (killed, out of memory): the pool refuses any further work
+                if self._pool is pool:
+                    logger.warning("Report worker process died, restarting the report workers")
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self._pool = self._new_pool()
+        raise HTTPException(status_code=503, detail="Report rendering is not available, retry later")
+
+
+_renderer: Optional[ReportRenderer] = None
+
+
+def get_report_renderer() -> Optional[ReportRenderer]:
+    """Active report renderer, or None when the app has not started it"""
+    return _renderer
+
+
+def start_report_renderer(cache_dir: str, workers: int):
+    global _renderer
+    _renderer = ReportRenderer(cache_dir, workers)
+    _renderer.start()
+
+
+def stop_report_renderer():
+    global _renderer
+    if _renderer:
+        _renderer.stop()
+        _renderer = None
@@ -0,0 +1,32 @@
+import asyncio
+import logging
+from database.database import AsyncSessionLocal
+from services.objective_status import recompute_pending_statuses
+from services.sync import prune_tombstones
+
+logger = logging.getLogger(__name__)
+
+
+async def run_status_scheduler(interval_seconds: int):
+    """
+    Periodically recalculate objective statuses that are due (dirty or past
+    their next_status_check date) and prune expired sync tombstones. Runs
+    until cancelled.
+    """
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await recompute_pending_statuses(db)
+                await prune_tombstones(db)
+            if result["checked_count"]:
+                logger.info(
+                    "Status scheduler: %s objectives checked, %s updated",
+                    result["checked_count"], result["updated_count"]
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Keep the scheduler alive; the next pass retries the same rows
+            logger.exception("Status scheduler pass failed")
+
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,128 @@
+import json
+import types
+from functools import lru_cache
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Iterable, List, Mapping, Optional, Type, Union, get_args, get_origin
+from fastapi.responses import Response
+from pydantic import BaseModel, EmailStr
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up: the stdlib encoder produces the same bytes
+    orjson = None
+
+
+def _decimal(value) -> str:
+    # Same text pydantic emits for Decimal fields in JSON mode
+    return str(value if isinstance(value, Decimal) else Decimal(str(value)))
+
+
+def _isoformat(value) -> str:
+    return value.isoformat()
+
+
+def _unwrap_optional(annotation):
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _is_model(annotation) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+class RowSerializer:
+    """
+    Builds the JSON output of a response schema straight from trusted
+    database rows (mappings of column values), skipping pydantic validation.
+    Keys follow the field order of the schema and values are rendered as
+    pydantic renders them (Decimal as string, ISO dates), so the encoded
+    bytes are the same as those of the response_model path.
+
+    Nested schema fields (a model or a list of models) take mappings too.
+    Only fields of type str (or EmailStr), int, bool, float, Decimal, date,
+    datetime, lists of str/int/bool and nested schemas are supported.
+    """
+
+    def __init__(self, schema: Type[BaseModel], fields: Optional[Iterable[str]] = None):
+        self.schema = schema
+        self.nested = {}
+        self.has_floats = False
+        self.fields: List[tuple] = []
+
+        selected = set(fields) if fields is not None else None
+        for name, field in schema.model_fields.items():
+            if selected is not None and name not in selected:
+                continue
+            self.fields.append((name, self._converter(name, field.annotation)))
+
+    def _converter(self, name: str, annotation) -> Optional[Callable]:
+        annotation = _unwrap_optional(annotation)
+        if get_origin(annotation) in (list, List):
+            item = _unwrap_optional(get_args(annotation)[0])
+            if item in (str, int, bool):
+                return None
+            if not _is_model(item):
+                raise TypeError(f"Unsupported list field {self.schema.__name__}.{name}")
+            nested = self.nested[name] = RowSerializer(item)
+            self.has_floats = self.has_floats or nested.has_floats
+            return nested.rows
+        if _is_model(annotation):
+            nested = self.nested[name] = RowSerializer(annotation)
+            self.has_floats = self.has_floats or nested.has_floats
+            return nested.row
+        if annotation is Decimal:
+            return _decimal
+        if annotation in (date, datetime):
+            return _isoformat
+        if annotation is float:
+            self.has_floats = True
+            return float
+        if annotation in (str, int, bool, EmailStr, Any):
+            return None
+        raise TypeError(f"Unsupported field type {annotation!r} for {self.schema.__name__}.{name}")
+
+    def row(self, values: Mapping) -> dict:
+        """Output dict of one row; missing fields take their schema default"""
+        output = {}
+        for name, converter in self.fields:
+            if name in values:
+                value = values[name]
+            else:
+                value = self.schema.model_fields[name].get_default(call_default_factory=True)
+            output[name] = converter(value) if converter and value is not None else value
+        return output
+
+    def rows(self, rows: Iterable[Mapping]) -> list:
+        return [self.row(values) for values in rows]
+
+    def encode(self, content) -> bytes:
+        """
+        Encode serialized content like JSONResponse does. orjson is used when
+        available, except for content with floats, whose text it renders
+        differently (e.g. 1e16 instead of 1e+16).
+        """
+        if orjson is not None and not self.has_floats:
+            return orjson.dumps(content)
+        return json.dumps(
+            content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode("utf-8")
+
+    def response(self, content, status_code: int = 200, headers: Optional[dict] = None) -> Response:
+        """Pre-encoded JSON response for already serialized content"""
+        return Response(
+            content=self.encode(content), status_code=status_code, headers=headers, media_type="application/json"
+        )
+
+
+@lru_cache(maxsize=256)
+def _cached_serializer(schema: Type[BaseModel], fields: Optional[frozenset]) -> RowSerializer:
+    return RowSerializer(schema, fields)
+
+
+def serializer_for(schema: Type[BaseModel], fields: Optional[Iterable[str]] = None) -> RowSerializer:
+    """Shared RowSerializer of a schema (and optional field selection)"""
+    return _cached_serializer(schema, frozenset(fields) if fields is not None else None)
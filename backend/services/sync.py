@@ -0,0 +1,195 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import event, inspect, insert, select, delete, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from models.models import User, Department, Cycle, Objective, KeyResult, CheckIn, PDI, SyncTombstone
+from schemas.schemas import (
+    UserRead, DepartmentRead, CycleRead, ObjectiveSummary, KeyResultRead, CheckInSummary, PDISummary
+)
+from services.serialization import serializer_for
+
+# Synced tables: model, schema of the rows sent and schema fields left out (relationships)
+SYNC_TABLES = {
+    "users": (User, UserRead, set()),
+    "departments": (Department, DepartmentRead, set()),
+    "cycles": (Cycle, CycleRead, set()),
+    "objectives": (Objective, ObjectiveSummary, {"key_results"}),
+    "key_results": (KeyResult, KeyResultRead, set()),
+    "check_ins": (CheckIn, CheckInSummary, {"objective", "user"}),
+    "pdis": (PDI, PDISummary, {"actions"}),
+}
+
+# Pseudo-table of the sync passes walking the tombstones of hard-deleted rows
+TOMBSTONES = "tombstones"
+
+# Rows per table (and tombstones) returned by one sync call
+SYNC_PAGE_ROWS = 1000
+
+# Overlap between sync passes: a pass starts this many seconds before the
+# end of the previous one, so rows written by transactions that committed
+# late (or by a worker whose clock is slightly behind) are not missed.
+# Rows in the overlap are sent twice; clients apply changes as upserts.
+SYNC_OVERLAP_SECONDS = 30
+
+# Days tombstones are kept; older sync tokens must resync from scratch
+SYNC_TOMBSTONE_RETENTION_DAYS = 30
+
+
+def _record_tombstones(session: Session, flush_context):
+    # deleted still holds the rows deleted by this flush here
+    tombstones = [
+        {"table_name": inspect(instance).mapper.local_table.name, "row_id": inspect(instance).identity[0]}
+        for instance in session.deleted
+        if inspect(instance).mapper.local_table.name in SYNC_TABLES
+    ]
+    if tombstones:
+        session.connection().execute(insert(SyncTombstone), tombstones)
+
+
+def install_sync_tombstones():
+    """
+    Record a tombstone for every synced row deleted through an ORM session
+    (idempotent). Synced tables must be deleted from with session.delete(),
+    bulk DELETE statements leave no tombstones.
+    """
+    if not event.contains(Session, "after_flush", _record_tombstones):
+        event.listen(Session, "after_flush", _record_tombstones)
+
+
+def _encode_token(state: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_token(token: str) -> dict:
+    """
+    Raises:
+        HTTPException: 400 if the token is malformed, 410 if it is older than the tombstones kept
+    """
+    try:
+        state = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        until = datetime.fromisoformat(state["until"]) if state.get("until") else None
+        # No since: continuation of a first pass
+        since = datetime.fromisoformat(state["since"]) if state.get("since") or until is None else None
+        after = {
+            table: (datetime.fromisoformat(key[0]), key[1]) for table, key in state.get("after", {}).items()
+        }
+        done = set(state.get("done", []))
+    except (ValueError, KeyError, TypeError, AttributeError, IndexError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+    if since is not None and since < datetime.utcnow() - timedelta(days=SYNC_TOMBSTONE_RETENTION_DAYS):
+        raise HTTPException(status_code=410, detail="Sync token expired, sync again without a token")
+    return {"since": since, "until": until, "after": after, "done": done}
+
+
+def _window(changed_at, row_id, since: Optional[datetime], until: datetime, after: Optional[tuple]) -> list:
+    # Ascending keyset on (changed_at, id), written without row-value
+    # comparison (unsupported by Oracle) so the changed_at index is used
+    conditions = [changed_at <= until]
+    if since is not None:
+        conditions.append(changed_at >= since)
+    if after is not None:
+        conditions.append(or_(changed_at > after[0], and_(changed_at == after[0], row_id > after[1])))
+    return conditions
+
+
+async def sync_changes(db: AsyncSession, token: Optional[str] = None) -> dict:
+    """
+    Rows of the synced tables created, updated or deleted since a sync token.
+
+    A sync pass covers the changes between the start of the previous pass
+    (minus SYNC_OVERLAP_SECONDS) and the time it starts, walking every table
+    by (updated_at, id) in pages of SYNC_PAGE_ROWS; while has_more is true the
+    returned token continues the same pass. Without a token the first pass
+    returns every live row (and no deletions).
+
+    Args:
+        db: Database session
+        token: Token returned by the previous call
+
+    Returns:
+        SyncResponse data: changed rows and deleted ids by table, the token for the next call and has_more
+    """
+    if token:
+        state = _decode_token(token)
+    else:
+        state = {"since": None, "until": None, "after": {}, "done": set()}
+    since, after, done = state["since"], state["after"], state["done"]
+    until = state["until"] or datetime.utcnow()
+
+    changes = {}
+    deleted = {}
+    for table, (model, schema, excluded) in SYNC_TABLES.items():
+        if table in done:
+            continue
+        fields = set(schema.model_fields) - excluded
+        columns = [getattr(model, field) for field in fields if field != "updated_at"] + [model.updated_at]
+        if model is Objective:
+            columns.append(Objective.is_deleted)
+        query = select(*columns).where(*_window(model.updated_at, model.id, since, until, after.get(table)))
+        if model is Objective and since is None:
+            query = query.where(or_(Objective.is_deleted == False, Objective.is_deleted.is_(None)))
+        result = await db.execute(query.order_by(model.updated_at, model.id).limit(SYNC_PAGE_ROWS + 1))
+        rows = result.mappings().all()
+
+        if len(rows) > SYNC_PAGE_ROWS:
+            rows = rows[:SYNC_PAGE_ROWS]
+            after[table] = (rows[-1]["updated_at"], rows[-1]["id"])
+        else:
+            done.add(table)
+
+        serializer = serializer_for(schema, fields)
+        table_changes = []
+        for row in rows:
+            if model is Objective and row["is_deleted"]:
+                # Logically deleted: a deletion for clients
+                deleted.setdefault(table, []).append(row["id"])
+                continue
+            item = serializer.row(row)
+            item["updated_at"] = row["updated_at"].isoformat()
+            table_changes.append(item)
+        changes[table] = table_changes
+
+    if since is None:
+        done.add(TOMBSTONES)
+    if TOMBSTONES not in done:
+        result = await db.execute(
+            select(SyncTombstone.id, SyncTombstone.table_name, SyncTombstone.row_id, SyncTombstone.deleted_at)
+            .where(*_window(SyncTombstone.deleted_at, SyncTombstone.id, since, until, after.get(TOMBSTONES)))
+            .order_by(SyncTombstone.deleted_at, SyncTombstone.id)
+            .limit(SYNC_PAGE_ROWS + 1)
+        )
+        tombstones = result.all()
+        if len(tombstones) > SYNC_PAGE_ROWS:
+            tombstones = tombstones[:SYNC_PAGE_ROWS]
+            after[TOMBSTONES] = (tombstones[-1].deleted_at, tombstones[-1].id)
+        else:
+            done.add(TOMBSTONES)
+        for tombstone in tombstones:
+            deleted.setdefault(tombstone.table_name, []).append(tombstone.row_id)
+
+    has_more = not done >= set(SYNC_TABLES) | {TOMBSTONES}
+    if has_more:
+        next_state = {
+            "since": since.isoformat() if since else None,
+            "until": until.isoformat(),
+            "after": {table: [key[0].isoformat(), key[1]] for table, key in after.items()},
+            "done": sorted(done),
+        }
+    else:
+        next_state = {"since": (until - timedelta(seconds=SYNC_OVERLAP_SECONDS)).isoformat()}
+    return {"token": _encode_token(next_state), "has_more": has_more, "changes": changes, "deleted": deleted}
+
+
+async def prune_tombstones(db: AsyncSession) -> int:
+    """Delete the tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS, returning how many"""
+    result = await db.execute(
+        delete(SyncTombstone).where(
+            SyncTombstone.deleted_at < datetime.utcnow() - timedelta(days=SYNC_TOMBSTONE_RETENTION_DAYS)
+        )
+    )
+    await db.commit()
+    return result.rowcount
@@ -0,0 +1,152 @@
+import hashlib
+import logging
+from datetime import date
+from typing import Iterable, Optional
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import event, inspect, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from database.database import get_db
+from models.models import TableVersion
+
+logger = logging.getLogger(__name__)
+
+table_versions = TableVersion.__table__
+
+# Session.info key of the tables written by the session's current transaction
+CHANGED_TABLES_KEY = "changed_tables"
+
+
+def bump_table_versions(connection, table_names: Iterable[str]):
+    """Increment the change counter of the given tables in the connection's transaction"""
+    names = sorted(set(table_names) - {table_versions.name})
+    if not names:
+        return
+
+    result = connection.execute(
+        update(table_versions)
+        .where(table_versions.c.table_name.in_(names))
+        .values(version=table_versions.c.version + 1)
+    )
+    if result.rowcount < len(names):
+        # Counter rows are created by the migration; databases built with create_all get them here
+        existing = set(connection.execute(
+            select(table_versions.c.table_name).where(table_versions.c.table_name.in_(names))
+        ).scalars())
+        connection.execute(
+            insert(table_versions),
+            [{"table_name": name, "version": 1} for name in names if name not in existing]
+        )
+
+
+def _table_name(instance) -> str:
+    return inspect(instance).mapper.local_table.name
+
+
+def _after_flush(session: Session, flush_context):
+    # new/dirty/deleted still hold the pre-flush state here
+    changed = {_table_name(instance) for instance in session.new}
+    changed |= {_table_name(instance) for instance in session.deleted}
+    changed |= {
+        _table_name(instance) for instance in session.dirty
+        if session.is_modified(instance, include_collections=False)
+    }
+    session.info.setdefault(CHANGED_TABLES_KEY, set()).update(changed)
+
+
+def _do_orm_execute(orm_execute_state):
+    # Bulk INSERT/UPDATE/DELETE statements bypass the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        session = orm_execute_state.session
+        session.info.setdefault(CHANGED_TABLES_KEY, set()).add(orm_execute_state.statement.table.name)
+
+
+def _after_commit(session: Session):
+    # The counters are incremented in a transaction of their own, after the
+    # write commits: a counter row is locked for one short UPDATE instead of
+    # for the whole write transaction, which would serialize every writer
+    # of the table. Until then readers may revalidate against the previous
+    # counter, a window of one round trip.
+    changed = session.info.pop(CHANGED_TABLES_KEY, None)
+    if not changed:
+        return
+    try:
+        with session.get_bind().begin() as connection:
+            bump_table_versions(connection, changed)
+    except Exception:
+        logger.exception("Could not increment the change counters of %s", ", ".join(sorted(changed)))
+
+
+def _after_transaction_end(session: Session, transaction):
+    # A rolled back transaction changed nothing
+    if transaction.parent is None:
+        session.info.pop(CHANGED_TABLES_KEY, None)
+
+
+def install_table_versioning():
+    """Keep table_versions up to date for every ORM session (idempotent)"""
+    if not event.contains(Session, "after_flush", _after_flush):
+        event.listen(Session, "after_flush", _after_flush)
+        event.listen(Session, "do_orm_execute", _do_orm_execute)
+        event.listen(Session, "after_commit", _after_commit)
+        event.listen(Session, "after_transaction_end", _after_transaction_end)
+
+
+async def get_table_versions(db: AsyncSession, table_names: Iterable[str]) -> dict:
+    """Current change counter of each table (0 for tables never written)"""
+    names = set(table_names)
+    result = await db.execute(
+        select(TableVersion.table_name, TableVersion.version).where(TableVersion.table_name.in_(names))
+    )
+    versions = dict(result.all())
+    return {name: versions.get(name, 0) for name in names}
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def cache_headers(etag: str) -> dict:
+    # no-cache: browsers keep the response but revalidate it on every request
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def conditional_get(*table_names: str, daily: bool = False):
+    """
+    Dependency for read endpoints whose response only depends on the given
+    tables (and the request URL). It computes a weak ETag from their change
+    counters and answers 304 Not Modified, before any row is loaded, when
+    the request's If-None-Match matches. Otherwise it sets the ETag on the
+    response and returns it (endpoints returning a Response themselves pass
+    cache_headers(etag) to it).
+
+    daily=True also varies the ETag with the current date, for responses
+    computed against today (statuses, due check-ins).
+
+    Versions are read before the data, and writes increment them after they
+    commit, so a write committed in between can only make the ETag older
+    than the body (an extra 200, never a stale 304 once the write has been
+    answered).
+    """
+    async def check(request: Request, response: Response, db: AsyncSession = Depends(get_db)) -> str:
+        versions = await get_table_versions(db, table_names)
+        key = [request.url.path, request.url.query]
+        key += [f"{name}={versions[name]}" for name in sorted(versions)]
+        if daily:
+            key.append(date.today().isoformat())
+        etag = 'W/"%s"' % hashlib.sha1("|".join(key).encode("utf-8")).hexdigest()[:20]
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers=cache_headers(etag))
+        response.headers.update(cache_headers(etag))
+        return etag
+
+    return check
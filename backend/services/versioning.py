@@ -0,0 +1,65 @@
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """
+    Version required by an If-Match header: the entity's version field,
+    plain or as an entity tag ("3", W/"3"). None when there is no header
+    or it is "*" (any version).
+
+    Raises:
+        HTTPException: 400 if the header is not a version
+    """
+    if not if_match or if_match.strip() == "*":
+        return None
+    value = if_match.strip().removeprefix("W/").strip('"')
+    try:
+        return int(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="If-Match must be the version of the entity")
+
+
+async def versioned_update(db: AsyncSession, model, row_id: str, values: dict, expected_version: Optional[int],
+                           name: str, *criteria, returning=()):
+    """
+    Update one row and increment its version in a single
+    UPDATE ... WHERE id = ? [AND version = ?] RETURNING statement, without
+    reading it first. Only when no row matched is it looked up, to tell a
+    missing row (404) from a newer version (412).
+
+    Args:
+        db: Database session
+        model: Model with id and version columns
+        row_id: Id of the row
+        values: Column values to set
+        expected_version: Version the client edited (from If-Match), None for an unconditional update
+        name: Name used in error details, e.g. "Objective"
+        criteria: Extra conditions the row must meet (e.g. not deleted)
+        returning: Extra columns to return
+
+    Returns:
+        Row with the new version (and the returning columns)
+
+    Raises:
+        HTTPException: 404 if the row does not exist, 412 if its version is not expected_version
+    """
+    query = update(model).where(model.id == row_id, *criteria)
+    if expected_version is not None:
+        query = query.where(model.version == expected_version)
+    result = await db.execute(
+        query.values(**values, version=model.version + 1).returning(model.version, *returning)
+    )
+    row = result.one_or_none()
+    if row is None:
+        current = await db.execute(select(model.version).where(model.id == row_id, *criteria))
+        current_version = current.scalar_one_or_none()
+        if current_version is None:
+            raise HTTPException(status_code=404, detail=f"{name} not found")
+        raise HTTPException(
+            status_code=412,
+            detail=f"{name} was modified by someone else (version {current_version}), reload it and retry"
+        )
+    return row
@@ -0,0 +1,77 @@
+import os
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+TEST_DIR = tempfile.mkdtemp(prefix="oks-tests-")
+os.environ["USE_SQLITE"] = "true"
+os.environ["STATUS_SCHEDULER_ENABLED"] = "false"
+os.environ["CHECK_IN_WRITE_BUFFER_ENABLED"] = "false"
+os.environ["REPORT_CACHE_DIR"] = os.path.join(TEST_DIR, "report_cache")
+os.environ["REPORT_WORKERS"] = "1"
+
+# The SQLite DATABASE_URL is relative: the engine resolves it against the
+# working directory when it is created, on import
+_cwd = os.getcwd()
+os.chdir(TEST_DIR)
+try:
+    from models.models import Base, Organization, Department, User, Cycle, Objective
+    from main import app
+finally:
+    os.chdir(_cwd)
+
+sync_engine = create_engine(f"sqlite:///{os.path.join(TEST_DIR, 'oks_system.db')}")
+Base.metadata.create_all(sync_engine)
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def db_session():
+    """Synchronous session on the test database (its writes go through the same ORM hooks)"""
+    with Session(sync_engine, expire_on_commit=False) as session:
+        yield session
+
+
+@pytest.fixture(scope="session")
+def seed(db_session):
+    organization = Organization(name="Org", settings={})
+    db_session.add(organization)
+    db_session.flush()
+    department = Department(organization_id=organization.id, name="Ventas")
+    db_session.add(department)
+    db_session.flush()
+    user = User(department_id=department.id, email="ana@example.com", full_name="Ana", role="Analista")
+    today = date.today()
+    cycle = Cycle(name="Q", start_date=today - timedelta(days=30), end_date=today + timedelta(days=60), is_active=True)
+    db_session.add_all([user, cycle])
+    db_session.flush()
+    objective = Objective(
+        cycle_id=cycle.id, owner_id=user.id, title="Objetivo", type="strategic", weight=Decimal("100"),
+        start_date=cycle.start_date, end_date=cycle.end_date, progress=Decimal("0"), is_deleted=False
+    )
+    db_session.add(objective)
+    db_session.commit()
+    return {"organization": organization.id, "department": department.id, "user": user.id, "cycle": cycle.id, "objective": objective.id}
+
+
+@pytest.fixture
+def objective(db_session, seed):
+    """A new objective of the seeded user and cycle, at version 1 with no progress"""
+    today = date.today()
+    new_objective = Objective(
+        cycle_id=seed["cycle"], owner_id=seed["user"], title="Objetivo", type="operational", weight=Decimal("50"),
+        start_date=today - timedelta(days=10), end_date=today + timedelta(days=30), progress=Decimal("0"),
+        is_deleted=False
+    )
+    db_session.add(new_objective)
+    db_session.commit()
+    return new_objective.id
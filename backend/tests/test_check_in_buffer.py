@@ -0,0 +1,53 @@
+import asyncio
+import os
+from decimal import Decimal
+from sqlalchemy.exc import IntegrityError
+from services.check_in_buffer import CheckInWriteBuffer, start_check_in_buffer, stop_check_in_buffer
+
+
+def _check_in(objective_id, user_id, progress):
+    return {"objective_id": objective_id, "user_id": user_id, "progress": Decimal(progress),
+            "previous_progress": Decimal("0"), "comment": None, "blockers": None}
+
+
+def test_rejected_check_in_fails_alone(client, objective, seed, tmp_path):
+    async def submit_group():
+        check_in_buffer = CheckInWriteBuffer(flush_ms=50, max_rows=10, log_dir=str(tmp_path))
+        await check_in_buffer.start()
+        try:
+            # user_id is NOT NULL: only that check-in violates a constraint
+            check_ins = [_check_in(objective, seed["user"], progress) for progress in ("10", "20", "30")]
+            check_ins.insert(1, _check_in(objective, None, "15"))
+            return await asyncio.gather(*map(check_in_buffer.submit, check_ins), return_exceptions=True)
+        finally:
+            await check_in_buffer.stop()
+
+    results = client.portal.call(submit_group)
+
+    assert isinstance(results[1], IntegrityError)
+    written = [result for index, result in enumerate(results) if index != 1]
+    assert all(isinstance(result, dict) for result in written)
+
+    stored = client.get("/api/check-ins/", params={"objective_id": objective}).json()
+    assert {check_in["id"] for check_in in stored} == {result["id"] for result in written}
+    assert float(client.get(f"/api/objectives/{objective}").json()["progress"]) == 30
+    # Nothing left to replay
+    assert os.listdir(tmp_path) == []
+
+
+def test_buffered_response_matches_synchronous_one(client, objective, seed, tmp_path):
+    check_in = {"objective_id": objective, "user_id": seed["user"], "progress": 25, "previous_progress": 0}
+    synchronous = client.post("/api/check-ins/", json=check_in)
+    assert synchronous.status_code == 201
+
+    client.portal.call(start_check_in_buffer, 50, 10, str(tmp_path))
+    try:
+        buffered = client.post("/api/check-ins/", json={**check_in, "progress": 35})
+    finally:
+        client.portal.call(stop_check_in_buffer)
+
+    assert buffered.status_code == 201
+    assert buffered.json().keys() == synchronous.json().keys()
+    assert buffered.json()["objective"]["id"] == objective
+    assert buffered.json()["user"]["id"] == seed["user"]
+    assert float(buffered.json()["objective"]["progress"]) == 35
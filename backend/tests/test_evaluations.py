@@ -0,0 +1,15 @@
+from models.models import Evaluation, User
+
+
+def test_update_does_not_set_scores(client, db_session, seed):
+    user = User(department_id=seed["department"], email="evaluada@example.com", full_name="Eva", role="Analista")
+    db_session.add(user)
+    db_session.flush()
+    evaluation = Evaluation(user_id=user.id, cycle_id=seed["cycle"], period="2026", phase="self-evaluation")
+    db_session.add(evaluation)
+    db_session.commit()
+
+    response = client.put(f"/api/evaluations/{evaluation.id}", json={"phase": "completed", "final_score": "99.5"})
+    assert response.status_code == 200
+    assert response.json()["phase"] == "completed"
+    assert response.json()["final_score"] is None
@@ -0,0 +1,20 @@
+import os
+import signal
+import pytest
+from services.reports import get_report_renderer
+
+
+@pytest.mark.skipif(os.name != "posix", reason="kills a worker process")
+def test_reports_survive_a_dead_worker(client, objective, seed):
+    url = f"/api/reports/cycle-summary?format=pdf&cycle_id={seed['cycle']}"
+    assert client.get(url).status_code == 200
+
+    for pid in list(get_report_renderer()._pool._processes):
+        os.kill(pid, signal.SIGKILL)
+    # A write makes the cached file stale, so the next request renders again
+    check_in = {"objective_id": objective, "user_id": seed["user"], "progress": 50, "previous_progress": 0}
+    assert client.post("/api/check-ins/", json=check_in).status_code == 201
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.content.startswith(b"%PDF")
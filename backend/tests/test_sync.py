@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+from services.sync import SYNC_TOMBSTONE_RETENTION_DAYS, _encode_token
+
+
+def _sync(client, token=None):
+    """Follow has_more to the end of a sync pass, merging its pages"""
+    changes, deleted = {}, {}
+    while True:
+        response = client.get("/api/sync", params={"since": token} if token else {})
+        assert response.status_code == 200
+        page = response.json()
+        for table, rows in page["changes"].items():
+            changes.setdefault(table, []).extend(rows)
+        for table, ids in page["deleted"].items():
+            deleted.setdefault(table, []).extend(ids)
+        token = page["token"]
+        if not page["has_more"]:
+            return changes, deleted, token
+
+
+def test_deleted_pdi_and_cycle_are_reported(client, seed):
+    pdi = client.post("/api/pdis/", json={"user_id": seed["user"], "cycle_id": seed["cycle"], "period": "2026",
+                                          "actions": [{"type": "course", "description": "Curso"}]})
+    assert pdi.status_code == 201
+    cycle = client.post("/api/cycles/", json={"name": "Vacío", "start_date": "2026-01-01", "end_date": "2026-03-31"})
+    assert cycle.status_code == 201
+    _, _, token = _sync(client)
+
+    assert client.delete(f"/api/pdis/{pdi.json()['id']}").status_code == 204
+    assert client.delete(f"/api/cycles/{cycle.json()['id']}").status_code == 204
+    assert client.get(f"/api/pdis/{pdi.json()['id']}").status_code == 404
+
+    _, deleted, _ = _sync(client, token)
+    assert pdi.json()["id"] in deleted["pdis"]
+    assert cycle.json()["id"] in deleted["cycles"]
+
+
+def test_cycle_in_use_is_not_deleted(client, seed):
+    assert client.delete(f"/api/cycles/{seed['cycle']}").status_code == 409
+    assert client.get(f"/api/cycles/{seed['cycle']}").status_code == 200
+
+
+def test_sync_pages_cover_every_row_once(client, seed, objective, monkeypatch):
+    monkeypatch.setattr("services.sync.SYNC_PAGE_ROWS", 2)
+    for progress in (10, 20, 30):
+        check_in = {"objective_id": objective, "user_id": seed["user"], "progress": progress, "previous_progress": 0}
+        assert client.post("/api/check-ins/", json=check_in).status_code == 201
+
+    pages = 0
+    seen = {}
+    token = None
+    while True:
+        page = client.get("/api/sync", params={"since": token} if token else {}).json()
+        pages += 1
+        for table, rows in page["changes"].items():
+            assert len(rows) <= 2
+            seen.setdefault(table, []).extend(row["id"] for row in rows)
+        token = page["token"]
+        if not page["has_more"]:
+            break
+
+    assert pages > 1
+    for table, ids in seen.items():
+        assert len(ids) == len(set(ids)), table
+    stored = client.get("/api/check-ins/", params={"objective_id": objective}).json()
+    assert {check_in["id"] for check_in in stored} <= set(seen["check_ins"])
+    assert objective in seen["objectives"]
+
+
+def test_sync_after_token_returns_changes(client, objective):
+    _, _, token = _sync(client)
+
+    updated = client.put(f"/api/objectives/{objective}", json={"title": "Cambiado"})
+    assert updated.status_code == 200
+
+    changes, _, _ = _sync(client, token)
+    assert objective in {row["id"] for row in changes["objectives"]}
+
+
+def test_deleted_objective_is_reported(client, objective):
+    _, _, token = _sync(client)
+    assert client.delete(f"/api/objectives/{objective}").status_code == 204
+
+    changes, deleted, _ = _sync(client, token)
+    assert objective in deleted["objectives"]
+    assert objective not in {row["id"] for row in changes["objectives"]}
+
+
+def test_invalid_sync_token(client):
+    assert client.get("/api/sync", params={"since": "not-a-token"}).status_code == 400
+
+
+def test_expired_sync_token(client):
+    since = datetime.utcnow() - timedelta(days=SYNC_TOMBSTONE_RETENTION_DAYS + 1)
+    token = _encode_token({"since": since.isoformat(), "until": datetime.utcnow().isoformat()})
+    assert client.get("/api/sync", params={"since": token}).status_code == 410
@@ -0,0 +1,91 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+import pytest
+from models.models import Department, User, Cycle, Objective, KeyResult, CheckIn, PDI, Competency, Evaluation
+
+
+def _unique():
+    return uuid.uuid4().hex[:8]
+
+
+# Read endpoint and a row of a table its ETag depends on
+WRITES = {
+    "departments": ("/api/users/departments/", lambda ids: Department(
+        organization_id=ids["organization"], name=f"Dept {_unique()}")),
+    "users": ("/api/users/", lambda ids: User(
+        department_id=ids["department"], email=f"{_unique()}@example.com", full_name="Luis", role="Analista")),
+    "cycles": ("/api/cycles/", lambda ids: Cycle(
+        name=f"Q {_unique()}", start_date=date(2026, 1, 1), end_date=date(2026, 3, 31))),
+    "objectives": ("/api/objectives/", lambda ids: Objective(
+        cycle_id=ids["cycle"], owner_id=ids["user"], title="Nuevo", type="operational", weight=Decimal("50"),
+        start_date=date(2026, 1, 1), end_date=date(2026, 3, 31), is_deleted=False)),
+    "key_results": ("/api/objectives/", lambda ids: KeyResult(
+        objective_id=ids["objective"], title="KR", target=Decimal("100"), unit="%")),
+    "check_ins": ("/api/check-ins/", lambda ids: CheckIn(
+        objective_id=ids["objective"], user_id=ids["user"], progress=Decimal("10"), previous_progress=Decimal("0"))),
+    "pdis": ("/api/pdis/", lambda ids: PDI(user_id=ids["user"], cycle_id=ids["cycle"], period="2026")),
+    "competencies": ("/api/competencies/", lambda ids: Competency(name=f"Comp {_unique()}", category="core")),
+    "evaluations": ("/api/evaluations/", lambda ids: Evaluation(
+        user_id=ids["user"], cycle_id=ids["cycle"], period="2026", phase="self-evaluation")),
+}
+
+
+def _get(client, url, etag=None):
+    return client.get(url, headers={"If-None-Match": etag} if etag else {})
+
+
+def test_unchanged_etag_gets_304(client, seed):
+    response = _get(client, "/api/objectives/")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    revalidated = _get(client, "/api/objectives/", etag)
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+    assert revalidated.content == b""
+
+
+def test_etag_depends_on_url(client, seed):
+    etag = _get(client, "/api/objectives/").headers["etag"]
+    assert _get(client, f"/api/objectives/?owner_id={seed['user']}", etag).status_code == 200
+
+
+@pytest.mark.parametrize("table", sorted(WRITES))
+def test_write_to_table_changes_etag(client, db_session, seed, table):
+    url, make_row = WRITES[table]
+    stale_etag = _get(client, url).headers["etag"]
+
+    db_session.add(make_row(seed))
+    db_session.commit()
+
+    response = _get(client, url, stale_etag)
+    assert response.status_code == 200
+    assert response.headers["etag"] != stale_etag
+    assert _get(client, url, response.headers["etag"]).status_code == 304
+
+
+def test_bulk_update_changes_etag(client, seed):
+    # versioned_update issues an UPDATE statement, not a flush of loaded objects
+    url = f"/api/objectives/{seed['objective']}"
+    stale_etag = _get(client, url).headers["etag"]
+
+    assert client.put(url, json={"title": "Renombrado"}).status_code == 200
+
+    response = _get(client, url, stale_etag)
+    assert response.status_code == 200
+    assert response.json()["title"] == "Renombrado"
+    assert _get(client, url, response.headers["etag"]).status_code == 304
+
+
+def test_settings_update_changes_etag(client, seed):
+    response = _get(client, "/api/settings")
+    stale_etag = response.headers["etag"]
+
+    settings = {**response.json(), "weight_objectives": 60, "weight_competencies": 40}
+    assert client.put("/api/settings", json=settings).status_code == 200
+
+    response = _get(client, "/api/settings", stale_etag)
+    assert response.status_code == 200
+    assert response.json()["weight_objectives"] == 60
+    assert _get(client, "/api/settings", response.headers["etag"]).status_code == 304
@@ -0,0 +1,55 @@
+def test_check_in_makes_objective_edits_stale(client, objective):
+    form = client.get(f"/api/objectives/{objective}").json()
+    assert form["version"] == 1
+
+    check_in = {"objective_id": objective, "user_id": form["owner_id"], "progress": 40, "previous_progress": 0}
+    assert client.post("/api/check-ins/", json=check_in).status_code == 201
+    assert client.get(f"/api/objectives/{objective}").json()["version"] == 2
+
+    # Saving the form loaded before the check-in must not reset its progress
+    stale_form = {field: form[field] for field in ("title", "description", "type", "progress", "weight")}
+    response = client.put(f"/api/objectives/{objective}", json=stale_form, headers={"If-Match": '"1"'})
+    assert response.status_code == 412
+
+    assert float(client.get(f"/api/objectives/{objective}").json()["progress"]) == 40
+
+
+def test_objective_update_requires_current_version(client, objective):
+    url = f"/api/objectives/{objective}"
+    version = client.get(url).json()["version"]
+
+    updated = client.put(url, json={"title": "Primero"}, headers={"If-Match": f'"{version}"'})
+    assert updated.status_code == 200
+    assert updated.json()["version"] > version
+
+    stale = client.put(url, json={"title": "Segundo"}, headers={"If-Match": f'"{version}"'})
+    assert stale.status_code == 412
+    assert client.get(url).json()["title"] == "Primero"
+
+    assert client.put(url, json={"title": "Tercero"}, headers={"If-Match": "*"}).status_code == 200
+    assert client.put(url, json={"title": "x"}, headers={"If-Match": '"uno"'}).status_code == 400
+    assert client.put("/api/objectives/nope", json={"title": "x"}, headers={"If-Match": '"1"'}).status_code == 404
+
+
+def test_pdi_update_with_stale_version_gets_412(client, seed):
+    pdi = client.post("/api/pdis/", json={"user_id": seed["user"], "cycle_id": seed["cycle"], "period": "2026"}).json()
+    url = f"/api/pdis/{pdi['id']}"
+
+    first = client.put(url, json={"strengths": "Comunicación"}, headers={"If-Match": f'"{pdi["version"]}"'})
+    assert first.status_code == 200
+    stale = client.put(url, json={"strengths": "Otra"}, headers={"If-Match": f'"{pdi["version"]}"'})
+    assert stale.status_code == 412
+    assert client.get(url).json()["strengths"] == "Comunicación"
+
+
+def test_check_in_update_with_stale_version_gets_412(client, objective, seed):
+    check_in = client.post("/api/check-ins/", json={
+        "objective_id": objective, "user_id": seed["user"], "progress": 10, "previous_progress": 0
+    }).json()
+    url = f"/api/check-ins/{check_in['id']}"
+
+    first = client.put(url, json={"comment": "Primero"}, headers={"If-Match": f'"{check_in["version"]}"'})
+    assert first.status_code == 200
+    stale = client.put(url, json={"comment": "Segundo"}, headers={"If-Match": f'"{check_in["version"]}"'})
+    assert stale.status_code == 412
+    assert client.get(url).json()["comment"] == "Primero"
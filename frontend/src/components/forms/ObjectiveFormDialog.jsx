@@ -258,7 +258,8 @@ export const ObjectiveFormDialog = ({
       delete data.endDate;
 
       if (objective) {
-        await objectivesApi.update(objective.id, data);
+        // Solo se guarda si nadie lo modificó desde que se cargó (si no, error 412)
+        await objectivesApi.update(objective.id, data, objective.version);
         toast({
           title: "Objetivo actualizado",
           description: "El objetivo se ha actualizado correctamente.",
@@ -274,6 +275,17 @@ export const ObjectiveFormDialog = ({
       onOpenChange(false);
       if (onSuccess) onSuccess();
     } catch (error) {
+      if (error.status === 412) {
+        // Otra persona (o un check-in) modificó el objetivo: recargar antes de editar de nuevo
+        toast({
+          title: "El objetivo ha cambiado",
+          description: "Otra persona lo modificó mientras lo editabas. Se han recargado los datos; vuelve a abrirlo para aplicar tus cambios.",
+          variant: "destructive",
+        });
+        onOpenChange(false);
+        if (onSuccess) onSuccess();
+        return;
+      }
       console.error("Error saving objective:", error);
       toast({
         title: "Error",
@@ -7,11 +7,11 @@ async function request(endpoint, options = {}) {
   const url = `${API_BASE_URL}${endpoint}`;
   
   const config = {
+    ...options,
     headers: {
       'Content-Type': 'application/json',
       ...options.headers,
     },
-    ...options,
   };
   
   console.log(`🌐 API Request: ${options.method || 'GET'} ${url}`);
@@ -26,7 +26,10 @@ async function request(endpoint, options = {}) {
   if (!response.ok) {
     const error = await response.json().catch(() => ({ detail: response.statusText }));
     console.error(`🔴 API Error: ${endpoint} - ${error.detail || `HTTP error! status: ${response.status}`}`);
-    throw new Error(error.detail || `HTTP error! status: ${response.status}`);
+    const apiError = new Error(error.detail || `HTTP error! status: ${response.status}`);
+    // Estado HTTP para que quien llama distinga errores (p. ej. 412: versión desactualizada)
+    apiError.status = response.status;
+    throw apiError;
   }
 
     // Si la respuesta está vacía (status 204), retornar null
@@ -44,6 +47,13 @@ async function request(endpoint, options = {}) {
   }
 }
 
+/**
+ * Cabecera If-Match para actualizaciones condicionales (sin versión: incondicional)
+ */
+function ifMatch(version) {
+  return version != null ? { headers: { 'If-Match': `"${version}"` } } : {};
+}
+
 // ========== Users API ==========
 export const usersApi = {
   getAll: (params = {}) => {
@@ -66,7 +76,8 @@ export const objectivesApi = {
   },
   getById: (id) => request(`/api/objectives/${id}`),
   create: (data) => request('/api/objectives', { method: 'POST', body: data }),
-  update: (id, data) => request(`/api/objectives/${id}`, { method: 'PUT', body: data }),
+  // Con version (campo version de la entidad) solo actualiza esa versión; si cambió, error 412
+  update: (id, data, version) => request(`/api/objectives/${id}`, { method: 'PUT', body: data, ...ifMatch(version) }),
   delete: (id) => request(`/api/objectives/${id}`, { method: 'DELETE' }),
 };
 
@@ -76,9 +87,21 @@ export const checkInsApi = {
     const queryParams = new URLSearchParams(params);
     return request(`/api/check-ins?${queryParams}`);
   },
+  // Check-ins con título/estado del objetivo y nombre del usuario, paginados: { items, total }
+  getFeed: (params = {}) => {
+    const queryParams = new URLSearchParams(params);
+    return request(`/api/check-ins/feed?${queryParams}`);
+  },
+  // Check-ins por usuario y semana ISO, en formato disperso por columnas:
+  // celda i = (user_index[i], week_index[i]) -> counts[i]
+  getHeatmap: (params = {}) => {
+    const queryParams = new URLSearchParams(params);
+    return request(`/api/check-ins/heatmap?${queryParams}`);
+  },
   getById: (id) => request(`/api/check-ins/${id}`),
   create: (data) => request('/api/check-ins', { method: 'POST', body: data }),
-  update: (id, data) => request(`/api/check-ins/${id}`, { method: 'PUT', body: data }),
+  // Con version (campo version de la entidad) solo actualiza esa versión; si cambió, error 412
+  update: (id, data, version) => request(`/api/check-ins/${id}`, { method: 'PUT', body: data, ...ifMatch(version) }),
   delete: (id) => request(`/api/check-ins/${id}`, { method: 'DELETE' }),
 };
 
@@ -101,6 +124,12 @@ getAll: (params = {}) => {
     const queryString = queryParams.toString();
     return request(`/api/competencies/${queryString ? '?' + queryString : ''}`);
   },
+  // Brechas por competencia x departamento (group_by=department) o x equipo (group_by=manager):
+  // celda i = (competency_index[i], group_index[i]) -> self_gap[i], leader_gap[i], ...
+  getGaps: (params = {}) => {
+    const queryParams = new URLSearchParams(params);
+    return request(`/api/competencies/gaps?${queryParams}`);
+  },
   getById: (id) => request(`/api/competencies/${id}`),
   create: (data) => request('/api/competencies', { method: 'POST', body: data }),
   update: (id, data) => request(`/api/competencies/${id}`, { method: 'PUT', body: data }),
@@ -115,7 +144,8 @@ export const pdisApi = {
   },
   getById: (id) => request(`/api/pdis/${id}`),
   create: (data) => request('/api/pdis', { method: 'POST', body: data }),
-  update: (id, data) => request(`/api/pdis/${id}`, { method: 'PUT', body: data }),
+  // Con version (campo version de la entidad) solo actualiza esa versión; si cambió, error 412
+  update: (id, data, version) => request(`/api/pdis/${id}`, { method: 'PUT', body: data, ...ifMatch(version) }),
   delete: (id) => request(`/api/pdis/${id}`, { method: 'DELETE' }),
 };
 
@@ -146,6 +176,28 @@ export const dashboardApi = {
     const params = cycleId ? `?cycle_id=${cycleId}` : '';
     return request(`/api/dashboard/monthly-progress${params}`);
   },
+  getTrends: (params = {}) => {
+    const queryParams = new URLSearchParams(params);
+    return request(`/api/dashboard/trends?${queryParams}`);
+  },
+};
+
+// ========== Exports API ==========
+export const exportsApi = {
+  // URL de descarga directa: el navegador guarda el archivo a medida que llega
+  getUrl: (type, params = {}) => {
+    const queryParams = new URLSearchParams(params);
+    return `${API_BASE_URL}/api/exports/${type}?${queryParams}`;
+  },
+};
+
+// ========== Reports API ==========
+export const reportsApi = {
+  // Archivo XLSX/PDF generado (y cacheado) en el servidor
+  getUrl: (type, params = {}) => {
+    const queryParams = new URLSearchParams(params);
+    return `${API_BASE_URL}/api/reports/${type}?${queryParams}`;
+  },
 };
 
 // ========== Settings API ==========
@@ -154,4 +206,34 @@ export const settingsApi = {
   update: (data) => request('/api/settings', { method: 'PUT', body: data }),
 };
 
+// ========== Sync API ==========
+// Cambios desde el último token: { token, has_more, changes: {tabla: [filas]}, deleted: {tabla: [ids]} }.
+// Sin token devuelve todo; mientras has_more sea true hay que volver a llamar con el nuevo token.
+// 410: token vencido, sincronizar de nuevo sin token.
+export const syncApi = {
+  get: (since) => request(`/api/sync${since ? `?since=${encodeURIComponent(since)}` : ''}`),
+};
+
+// ========== Batch API ==========
+// Varias peticiones en un solo viaje de ida y vuelta (máximo 20 por lote)
+export const batchApi = {
+  run: (requests) => request('/api/batch', { method: 'POST', body: { requests } }),
+  // GETs en lote con resultados en la forma de Promise.allSettled
+  getAllSettled: async (endpoints) => {
+    const { responses } = await batchApi.run(endpoints.map((url) => ({ url })));
+    return responses.map((response) => (
+      response.status >= 200 && response.status < 300
+        ? { status: 'fulfilled', value: response.body }
+        : { status: 'rejected', reason: new Error(response.body?.detail || `HTTP error! status: ${response.status}`) }
+    ));
+  },
+  // GETs en lote que fallan si alguno falla, como Promise.all
+  getAll: async (endpoints) => {
+    const results = await batchApi.getAllSettled(endpoints);
+    const rejected = results.find((result) => result.status === 'rejected');
+    if (rejected) throw rejected.reason;
+    return results.map((result) => result.value);
+  },
+};
+
 
@@ -4,7 +4,7 @@ import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Textarea } from "@/components/ui/textarea";
 import { Progress } from "@/components/ui/progress";
-import { checkInsApi, objectivesApi, usersApi } from "@/lib/api";
+import { batchApi, checkInsApi } from "@/lib/api";
 import { useToast } from "@/hooks/UseToast"; // Corregido: minúsculas por convención shadcn
 import {
   Search,
@@ -39,6 +39,7 @@ import {
 export const CheckIns = () => {
   // Estados de datos
   const [checkIns, setCheckIns] = useState([]);
+  const [totalCheckIns, setTotalCheckIns] = useState(0);
   const [objectives, setObjectives] = useState([]);
   const [users, setUsers] = useState([]);
 
@@ -62,14 +63,10 @@ export const CheckIns = () => {
   const loadData = async () => {
     setIsLoading(true);
     try {
-      const [checkInsData, objectivesData, usersData] = await Promise.all([
-        checkInsApi.getAll(),
-        objectivesApi.getAll(),
-        usersApi.getAll(),
-      ]);
-      setCheckIns(checkInsData);
-      setObjectives(objectivesData);
-      setUsers(usersData);
+      // El feed ya trae el título del objetivo y el nombre del usuario
+      const feed = await checkInsApi.getFeed({ limit: 50 });
+      setCheckIns(feed.items);
+      setTotalCheckIns(feed.total);
     } catch (error) {
       toast({
         title: "Error de conexión",
@@ -81,6 +78,30 @@ export const CheckIns = () => {
     }
   };
 
+  // Objetivos y usuarios solo se necesitan para el formulario de nuevo check-in
+  const loadFormOptions = async () => {
+    if (objectives.length && users.length) return;
+    try {
+      const [objectivesData, usersData] = await batchApi.getAll([
+        '/api/objectives',
+        '/api/users',
+      ]);
+      setObjectives(objectivesData);
+      setUsers(usersData);
+    } catch (error) {
+      toast({
+        title: "Error de conexión",
+        description: "No se pudieron cargar objetivos y usuarios.",
+        variant: "destructive",
+      });
+    }
+  };
+
+  const handleDialogOpenChange = (open) => {
+    setIsDialogOpen(open);
+    if (open) loadFormOptions();
+  };
+
   useEffect(() => {
     loadData();
   }, []);
@@ -127,7 +148,7 @@ export const CheckIns = () => {
 
   const filteredCheckIns = useMemo(() => {
     return checkIns.filter((ci) =>
-      ci.objective?.title?.toLowerCase().includes(searchQuery.toLowerCase()) ||
+      ci.objective_title?.toLowerCase().includes(searchQuery.toLowerCase()) ||
       ci.comment?.toLowerCase().includes(searchQuery.toLowerCase())
     );
   }, [searchQuery, checkIns]);
@@ -142,7 +163,7 @@ export const CheckIns = () => {
       <div className="space-y-6">
         {/* Summary Cards */}
         <div className="grid grid-cols-1 md:grid-cols-4 gap-4">
-          <CardSummary icon={<Clock className="text-warning" />} value={filteredCheckIns.length} label="Total Check-ins" bgColor="bg-warning/10" />
+          <CardSummary icon={<Clock className="text-warning" />} value={searchQuery ? filteredCheckIns.length : totalCheckIns} label="Total Check-ins" bgColor="bg-warning/10" />
           <CardSummary icon={<CheckCircle2 className="text-success" />} value={checkIns.length} label="Esta semana" bgColor="bg-success/10" />
           <CardSummary icon={<AlertTriangle className="text-destructive" />} value={checkIns.filter(ci => ci.blockers).length} label="Con bloqueos" bgColor="bg-destructive/10" />
           <CardSummary icon={<TrendingUp className="text-primary" />} value={`${Math.round(checkIns.reduce((sum, ci) => sum + parseFloat(ci.progress), 0) / checkIns.length || 0)}%`} label="Avance promedio" bgColor="bg-primary/10" />
@@ -165,7 +186,7 @@ export const CheckIns = () => {
             </Button>
           </div>
 
-          <Dialog open={isDialogOpen} onOpenChange={setIsDialogOpen}>
+          <Dialog open={isDialogOpen} onOpenChange={handleDialogOpenChange}>
             <DialogTrigger asChild>
               <Button size="sm" className="gap-2 gradient-primary border-0">
                 <Plus className="w-4 h-4" /> Nuevo Check-in
@@ -289,7 +310,7 @@ const CardSummary = ({ icon, value, label, bgColor }) => (
 );
 
 const CheckInItem = ({ checkIn, index, total }) => {
-  const progressDiff = checkIn.progress - (checkIn.previousProgress || 0);
+  const progressDiff = checkIn.progress - (checkIn.previous_progress || 0);
   return (
     <div className={cn("p-5 hover:bg-muted/30 transition-colors animate-fade-in", `stagger-${Math.min(index + 1, 5)}`)}>
       <div className="flex items-start gap-4">
@@ -300,10 +321,10 @@ const CheckInItem = ({ checkIn, index, total }) => {
         <div className="flex-1 min-w-0">
           <div className="flex items-start justify-between mb-2">
             <div>
-              <h4 className="font-medium">{checkIn.objectiveTitle}</h4>
+              <h4 className="font-medium">{checkIn.objective_title}</h4>
               <div className="flex gap-3 text-xs text-muted-foreground mt-1">
-                <span className="flex items-center gap-1"><User className="w-3 h-3"/> {checkIn.userName}</span>
-                <span className="flex items-center gap-1"><Calendar className="w-3 h-3"/> {checkIn.createdAt}</span>
+                <span className="flex items-center gap-1"><User className="w-3 h-3"/> {checkIn.user_name}</span>
+                <span className="flex items-center gap-1"><Calendar className="w-3 h-3"/> {checkIn.created_at}</span>
               </div>
             </div>
             <div className="text-right">
@@ -3,7 +3,7 @@ import { AppLayout } from "@/components/layout/AppLayout";
 import { Button } from "@/components/ui/button";
 import { ProgressChart } from "@/components/dashboard/ProgressChart";
 import { DepartmentChart } from "@/components/dashboard/DepartmentChart";
-import { dashboardApi } from "@/lib/api";
+import { dashboardApi, exportsApi, reportsApi } from "@/lib/api";
 import { useToast } from "@/hooks/UseToast";
 import {
   Download,
@@ -96,15 +96,27 @@ export const Reports = () => {
         <div className="space-y-6">
           {/* Export Actions */}
           <div className="flex flex-wrap items-center gap-3">
-            <Button variant="outline" className="gap-2">
+            <Button
+              variant="outline"
+              className="gap-2"
+              onClick={() => { window.location.href = reportsApi.getUrl("department-performance", { format: "xlsx" }); }}
+            >
               <FileSpreadsheet className="w-4 h-4" />
               Exportar Excel
             </Button>
-            <Button variant="outline" className="gap-2">
+            <Button
+              variant="outline"
+              className="gap-2"
+              onClick={() => { window.location.href = reportsApi.getUrl("cycle-summary", { format: "pdf" }); }}
+            >
               <FileText className="w-4 h-4" />
               Exportar PDF
             </Button>
-            <Button variant="outline" className="gap-2">
+            <Button
+              variant="outline"
+              className="gap-2"
+              onClick={() => { window.location.href = exportsApi.getUrl("objectives", { format: "csv" }); }}
+            >
               <Download className="w-4 h-4" />
               Descargar Dataset
             </Button>
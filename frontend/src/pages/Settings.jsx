@@ -29,7 +29,7 @@ import {
 } from "lucide-react";
 import { cn } from "@/lib/utils";
 import { CompetencyFormDialog } from "@/components/forms/CompetencyFormDialog";
-import { competenciesApi, cyclesApi, settingsApi } from "@/lib/api";
+import { batchApi, competenciesApi, cyclesApi, settingsApi } from "@/lib/api";
 import Swal from "sweetalert2";
 
 const evaluationScales = [
@@ -254,11 +254,11 @@ export const Settings = () => {
         setLoading(true);
         console.log('🔄 Iniciando carga de datos...');
         
-        // Load all data in parallel for better performance
-        const [competenciesData, cyclesData, settingsData] = await Promise.allSettled([
-          competenciesApi.getAll(),
-          cyclesApi.getAll(),
-          settingsApi.get()
+        // Load all data in a single batch request
+        const [competenciesData, cyclesData, settingsData] = await batchApi.getAllSettled([
+          '/api/competencies/',
+          '/api/cycles',
+          '/api/settings'
         ]);
         
         // Handle competencies